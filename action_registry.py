@@ -0,0 +1,171 @@
+"""Table-driven actions for the deterministic Playwright executor.
+
+Actions are declared in a JSON config (``EXECUTOR_ACTIONS_CONFIG``, by default
+``executor_actions.json``). Each one names a handler strategy plus its options,
+and refers to elements by logical name (``login_button``, ``cart_link``). The
+names are resolved through per-site selector maps chosen by the page's host,
+so supporting another app means adding a site entry rather than code.
+Handlers are looked up by action name or alias in a dict. After a handler
+runs, the action's ``waits`` (see ``wait_strategies``) decide when it has
+taken effect.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+
+from wait_strategies import validate as validate_waits
+from wait_strategies import waiting
+
+EXECUTOR_ACTIONS_CONFIG = os.getenv(
+    "EXECUTOR_ACTIONS_CONFIG", str(Path(__file__).resolve().parent / "executor_actions.json")
+)
+
+
+class SiteSelectors:
+    """Selector map for one site, layered over the ``default`` site."""
+
+    def __init__(self, selectors: dict, items: dict):
+        self.selectors = selectors
+        self.items = items
+
+    def has(self, name: str) -> bool:
+        return name in self.selectors
+
+    def get(self, name: str) -> str:
+        try:
+            return self.selectors[name]
+        except KeyError:
+            raise KeyError(f"No selector configured for '{name}'") from None
+
+    def item(self, item_name: str, kind: str) -> str | None:
+        """Selector performing ``kind`` (e.g. ``add``) on the item matching ``item_name``."""
+        item_name = item_name.lower()
+        for key, selectors in self.items.items():
+            if key in item_name and kind in selectors:
+                return selectors[kind]
+        return None
+
+
+# -- handler strategies ------------------------------------------------------
+# Each takes (page, spec, context, site) where ``spec`` is the action's config.
+
+
+def _goto(page, spec, context, site):
+    page.goto(context.get(spec.get("url_param", "url"), ""), wait_until=spec.get("wait_until", "load"))
+
+
+def _fill_and_submit(page, spec, context, site):
+    for selector_name, param in spec["fields"].items():
+        page.fill(site.get(selector_name), context.get(param, ""))
+    page.click(site.get(spec["submit"]))
+
+
+def _click(page, spec, context, site):
+    page.click(site.get(spec["target"]))
+
+
+def _fill(page, spec, context, site):
+    page.fill(site.get(spec["target"]), context.get(spec.get("value_param", "value"), ""))
+
+
+def _click_item(page, spec, context, site):
+    item_name = context.get(spec.get("item_param", "item_name"), "")
+    selector = site.item(item_name, spec["item_selector"]) if item_name else None
+    if selector:
+        page.click(selector)
+    elif spec.get("fallback"):
+        page.locator(site.get(spec["fallback"])).first.click()
+    else:
+        raise ValueError(f"No '{spec['item_selector']}' selector for item '{item_name}'")
+
+
+def _assert_texts(page, spec, context, site):
+    found = page.locator(site.get(spec["target"])).all_text_contents()
+    where = spec.get("description", spec["target"])
+    minimum = context.get(spec.get("min_param", "min_items"), 0)
+    assert len(found) >= minimum, (
+        f"Expected at least {minimum} item(s) in {where}, found {len(found)}"
+    )
+    for expected in context.get(spec.get("expected_param", "expected"), []):
+        assert any(
+            expected.lower() in text.lower() for text in found
+        ), f"'{expected}' not found in {where}"
+
+
+HANDLERS = {
+    "goto": _goto,
+    "fill_and_submit": _fill_and_submit,
+    "click": _click,
+    "fill": _fill,
+    "click_item": _click_item,
+    "assert_texts": _assert_texts,
+}
+
+
+class ActionRegistry:
+    """Maps action names and aliases to their config and handler."""
+
+    def __init__(self, config: dict):
+        self._actions = {}
+        for name, spec in config.get("actions", {}).items():
+            if spec["handler"] not in HANDLERS:
+                raise ValueError(f"Action '{name}' uses unknown handler '{spec['handler']}'")
+            validate_waits(spec.get("waits", []), name)
+            for key in [name, *spec.get("aliases", [])]:
+                self._actions[key] = spec
+
+        sites = config.get("sites", {})
+        default = sites.get("default", {})
+        self._sites = {
+            host: SiteSelectors(
+                {**default.get("selectors", {}), **site.get("selectors", {})},
+                {**default.get("items", {}), **site.get("items", {})},
+            )
+            for host, site in sites.items()
+        }
+        self._default_site = self._sites.get("default", SiteSelectors({}, {}))
+
+    @classmethod
+    def from_file(cls, path: str) -> "ActionRegistry":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __contains__(self, action: str) -> bool:
+        return action in self._actions
+
+    def site_for(self, url: str) -> SiteSelectors:
+        """Selectors for the site serving ``url`` (matched on the host suffix)."""
+        host = (urlparse(url or "").hostname or "").lower()
+        for site_host, site in self._sites.items():
+            if site_host != "default" and (host == site_host or host.endswith("." + site_host)):
+                return site
+        return self._default_site
+
+    def run(self, page, action: str, context: dict, timeout_ms: int | None = None) -> list[dict]:
+        """Perform ``action`` on ``page`` and return how long each of its waits took.
+
+        ``timeout_ms`` caps the action's waits. Raises for unknown actions,
+        failed checks and waits that time out.
+        """
+        spec = self._actions.get(action)
+        if spec is None:
+            raise ValueError(f"Unknown action '{action}'")
+        site = self.site_for(context.get(spec.get("url_param", "url")) if spec["handler"] == "goto" else page.url)
+        with waiting(page, spec.get("waits", []), site, max_timeout_ms=timeout_ms) as timings:
+            HANDLERS[spec["handler"]](page, spec, context, site)
+        return timings
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ActionRegistry:
+    """Return the registry loaded from ``EXECUTOR_ACTIONS_CONFIG`` (once per process)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ActionRegistry.from_file(EXECUTOR_ACTIONS_CONFIG)
+        return _registry
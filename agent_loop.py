@@ -0,0 +1,72 @@
+"""A long-lived asyncio event loop running in a background thread.
+
+Synchronous code submits coroutines and gets ``concurrent.futures.Future``
+objects back, so every caller shares one loop (and whatever clients and
+browsers live on it) instead of creating and tearing down a loop per call.
+"""
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+
+
+class BackgroundLoop:
+    """Owns an event loop thread that is started lazily on first use."""
+
+    def __init__(self, name: str = "jirai-async-loop"):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._on_start = []
+        self._on_stop = []
+        atexit.register(self.stop)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self._ensure_started()
+        return self._loop
+
+    def on_start(self, coro_fn):
+        """Schedule ``coro_fn()`` on the loop as soon as it starts."""
+        self._on_start.append(coro_fn)
+
+    def on_stop(self, coro_fn):
+        """Await ``coro_fn()`` on the loop before it is stopped."""
+        self._on_stop.append(coro_fn)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._run, args=(self._loop,), name=self.name, daemon=True
+            )
+            self._thread.start()
+            for coro_fn in self._on_start:
+                asyncio.run_coroutine_threadsafe(coro_fn(), self._loop)
+
+    @staticmethod
+    def _run(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Run ``coro`` on the background loop and return a thread-safe future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self, timeout: float = 30):
+        """Run the shutdown hooks, then stop the loop and join its thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if not (thread and thread.is_alive()):
+                return
+            for coro_fn in self._on_stop:
+                try:
+                    asyncio.run_coroutine_threadsafe(coro_fn(), loop).result(timeout)
+                except Exception as e:
+                    print(f"[Loop] ⚠️ Shutdown hook failed: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,154 @@
+"""Asyncio front end for the Jira operations used by the workflows.
+
+Every call runs the existing blocking helper on a worker thread with
+``asyncio.to_thread``, drawing a client from the shared pool, so independent
+writes (assigning, commenting, labelling, transitioning) can be awaited
+together. The active issue cache scope is carried into the worker threads.
+Synchronous callers use ``run_concurrently()`` to await a batch of them.
+"""
+import asyncio
+import os
+
+import issue_cache
+import subtask_manager
+from jira_reader import connect_to_jira
+
+QA_ACCOUNT_ID = os.getenv(
+    "JIRA_QA_ACCOUNT_ID", "70121:2fb0d5c3-a6a9-445b-a741-f0a2caf987fe"
+)
+
+
+def mention_doc(account_id: str, text: str) -> dict:
+    """Atlassian document with a mention of ``account_id`` followed by ``text``."""
+    return {
+        "type": "doc",
+        "version": 1,
+        "content": [
+            {
+                "type": "paragraph",
+                "content": [
+                    {
+                        "type": "mention",
+                        "attrs": {"id": account_id, "text": "<@QA>"},
+                    },
+                    {"type": "text", "text": text},
+                ],
+            }
+        ],
+    }
+
+
+# Comment property carrying the outbox marker of a comment, so a redelivered
+# write can tell it was already posted
+OUTBOX_MARKER_PROPERTY = "jirai.outbox"
+
+
+def _rest(jira, method: str, path: str, payload: dict | None = None, api: str = "3", params=None):
+    options = {"json": payload} if payload is not None else {}
+    if params:
+        options["params"] = params
+    resp = getattr(jira._session, method)(
+        f"{jira._options['server']}/rest/api/{api}/{path}", **options
+    )
+    resp.raise_for_status()
+    return resp
+
+
+def _with_client(fn, *args):
+    """Call ``fn(jira, *args)`` with a client checked out of the pool for this thread."""
+    with connect_to_jira() as jira:
+        return fn(jira, *args)
+
+
+def _add_comment(jira, key: str, body: str):
+    return jira.add_comment(key, body)
+
+
+def _marker_properties(marker: str | None) -> dict:
+    if not marker:
+        return {}
+    return {"properties": [{"key": OUTBOX_MARKER_PROPERTY, "value": {"marker": marker}}]}
+
+
+def _has_marked_comment(jira, key: str, marker: str) -> bool:
+    resp = _rest(
+        jira,
+        "get",
+        f"issue/{key}/comment",
+        api="2",
+        params={"orderBy": "-created", "maxResults": 100, "expand": "properties"},
+    )
+    for comment in resp.json().get("comments", []):
+        for prop in comment.get("properties") or []:
+            if (
+                prop.get("key") == OUTBOX_MARKER_PROPERTY
+                and (prop.get("value") or {}).get("marker") == marker
+            ):
+                return True
+    return False
+
+
+async def get_issue(key: str, fields=None):
+    return await asyncio.to_thread(_with_client, issue_cache.get_issue, key, fields)
+
+
+async def add_comment(key: str, body: str, marker: str | None = None):
+    """Post a wiki-markup comment, tagged with ``marker`` if given."""
+    if marker is None:
+        return await asyncio.to_thread(_with_client, _add_comment, key, body)
+    await asyncio.to_thread(
+        _with_client,
+        _rest,
+        "post",
+        f"issue/{key}/comment",
+        {"body": body, **_marker_properties(marker)},
+        "2",
+    )
+
+
+async def post_mention(
+    key: str, text: str, account_id: str = QA_ACCOUNT_ID, marker: str | None = None
+):
+    await asyncio.to_thread(
+        _with_client,
+        _rest,
+        "post",
+        f"issue/{key}/comment",
+        {"body": mention_doc(account_id, text), **_marker_properties(marker)},
+    )
+    print(f"[JIRA] ✅ QA mention posted to {key}")
+
+
+async def assign(key: str, account_id: str = QA_ACCOUNT_ID):
+    await asyncio.to_thread(
+        _with_client,
+        _rest,
+        "put",
+        f"issue/{key}/assignee",
+        {"accountId": account_id},
+    )
+    print(f"[JIRA] 👤 Assigned {key} to QA user.")
+
+
+async def has_marked_comment(key: str, marker: str) -> bool:
+    """Whether one of the latest comments on ``key`` carries ``marker``."""
+    return await asyncio.to_thread(_with_client, _has_marked_comment, key, marker)
+
+
+async def update_labels(key: str, add=(), remove=()):
+    return await asyncio.to_thread(
+        subtask_manager.update_labels, key, add=add, remove=remove
+    )
+
+
+async def transition_to_done(key: str):
+    return await asyncio.to_thread(subtask_manager.transition_subtask_to_done, key)
+
+
+def run_concurrently(*aws, return_exceptions: bool = False) -> list:
+    """Await ``aws`` together from synchronous code and return their results."""
+
+    async def gather():
+        return await asyncio.gather(*aws, return_exceptions=return_exceptions)
+
+    return asyncio.run(gather())
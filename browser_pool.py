@@ -0,0 +1,126 @@
+"""Pool of warm browser-use browsers shared by agent runs on one event loop.
+
+Launching Chromium dominates short scenarios, so browsers are launched once and
+checked out per scenario. Every checkout gets a fresh browser context (its own
+cookies and storage), and a browser is recycled after ``max_uses`` checkouts,
+after a run in it timed out or was cancelled, or as soon as it is found
+disconnected.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+try:
+    from browser_use import Browser, BrowserConfig
+    from browser_use.browser.context import BrowserContextConfig
+except Exception:  # pragma: no cover - allow import without browser-use
+    Browser = BrowserConfig = BrowserContextConfig = None
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "3"))
+BROWSER_POOL_MAX_USES = int(os.getenv("BROWSER_POOL_MAX_USES", "20"))
+BROWSER_USE_HEADLESS = os.getenv("BROWSER_USE_HEADLESS", "true").lower() == "true"
+BROWSER_USE_VIEWPORT = {
+    "width": int(os.getenv("BROWSER_USE_VIEWPORT_WIDTH", "1920")),
+    "height": int(os.getenv("BROWSER_USE_VIEWPORT_HEIGHT", "1080")),
+}
+
+
+class PooledBrowser:
+    """A launched browser and the number of scenarios it has served."""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.uses = 0
+
+    def is_alive(self) -> bool:
+        playwright_browser = getattr(self.browser, "playwright_browser", None)
+        if playwright_browser is None:
+            return True  # not started yet, browser-use launches it on first use
+        try:
+            return playwright_browser.is_connected()
+        except Exception:
+            return False
+
+
+class BrowserPool:
+    """Bounded pool of browsers; must be used from a single event loop."""
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE, max_uses: int = BROWSER_POOL_MAX_USES):
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self._idle: list[PooledBrowser] = []
+        self._slots = None
+        self._closed = False
+
+    def _new_browser(self) -> PooledBrowser:
+        if Browser is None:
+            raise RuntimeError("browser-use package not installed")
+        return PooledBrowser(Browser(config=BrowserConfig(headless=BROWSER_USE_HEADLESS)))
+
+    async def warm(self, count: int | None = None):
+        """Pre-launch up to ``count`` idle browsers (defaults to the pool size)."""
+        target = min(self.size, count or self.size)
+        while len(self._idle) < target:
+            pooled = self._new_browser()
+            # Launch Chromium now rather than on the first scenario
+            await pooled.browser.get_playwright_browser()
+            self._idle.append(pooled)
+
+    async def _discard(self, pooled: PooledBrowser):
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            print(f"[BrowserPool] ⚠️ Error closing browser: {e}")
+
+    async def checkout(self) -> PooledBrowser:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        await self._slots.acquire()
+        while self._idle:
+            pooled = self._idle.pop()
+            if pooled.is_alive():
+                return pooled
+            await self._discard(pooled)
+        try:
+            return self._new_browser()
+        except Exception:
+            self._slots.release()
+            raise
+
+    async def checkin(self, pooled: PooledBrowser):
+        pooled.uses += 1
+        try:
+            if self._closed or pooled.uses >= self.max_uses or not pooled.is_alive():
+                await self._discard(pooled)
+            else:
+                self._idle.append(pooled)
+        finally:
+            self._slots.release()
+
+    @asynccontextmanager
+    async def context(self):
+        """Yield ``(browser, context)`` with a fresh, isolated browser context."""
+        pooled = await self.checkout()
+        browser_context = None
+        try:
+            config = BrowserContextConfig(browser_window_size=BROWSER_USE_VIEWPORT)
+            browser_context = await pooled.browser.new_context(config=config)
+            yield pooled.browser, browser_context
+        except (TimeoutError, asyncio.CancelledError):
+            # A run cut off mid-action may leave the browser hung; relaunch it
+            pooled.uses = self.max_uses
+            raise
+        finally:
+            if browser_context is not None:
+                try:
+                    await browser_context.close()
+                except Exception as e:
+                    print(f"[BrowserPool] ⚠️ Error closing context: {e}")
+            await self.checkin(pooled)
+
+    async def close(self):
+        """Close every idle browser; browsers in use are closed when checked in."""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for pooled in idle:
+            await self._discard(pooled)
@@ -1,20 +1,81 @@
 import asyncio
+import concurrent.futures
+import contextvars
+import json
+import os
+import re
 import time
-import nest_asyncio
 from pydantic import BaseModel
 from browser_use import Agent, Controller
 from langchain_openai import ChatOpenAI
 from openai import RateLimitError
+from agent_loop import BackgroundLoop
+from browser_pool import BrowserPool
+from rate_limiter import langchain_rate_limiter, openai_limiter, retry_delay
 import logging
-import io
 import sys
 
-nest_asyncio.apply()
-
 # Configure logging for better debugging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Browsers launched as soon as the agent loop starts
+BROWSER_POOL_PREWARM = int(os.getenv("BROWSER_POOL_PREWARM", "1"))
+# Wall-clock budget for one scenario including retries, and the cap per attempt
+SCENARIO_TIMEOUT_SECONDS = float(os.getenv("SCENARIO_TIMEOUT_SECONDS", "600"))
+AGENT_ATTEMPT_TIMEOUT_SECONDS = float(os.getenv("AGENT_ATTEMPT_TIMEOUT_SECONDS", "300"))
+# Attempts are not started with less time left than this
+MIN_ATTEMPT_SECONDS = 10
+CANCEL_GRACE_SECONDS = 15
+
+# One background loop owns the LLM client and the warm browsers for every run
+agent_loop = BackgroundLoop(name="browser-use-loop")
+_shared = {}
+
+
+def _new_llm():
+    # Standard LLM configuration, throttled by the process-wide OpenAI budget
+    options = {}
+    rate_limiter = langchain_rate_limiter()
+    if rate_limiter is not None:
+        options["rate_limiter"] = rate_limiter
+    return ChatOpenAI(
+        model="gpt-4o", temperature=0, max_tokens=4000, request_timeout=60, **options
+    )
+
+
+def _shared_llm():
+    # Only call on agent_loop: the client's HTTP connections bind to that loop
+    if "llm" not in _shared:
+        _shared["llm"] = _new_llm()
+    return _shared["llm"]
+
+
+def _shared_browser_pool() -> BrowserPool:
+    if "browser_pool" not in _shared:
+        _shared["browser_pool"] = BrowserPool()
+    return _shared["browser_pool"]
+
+
+async def _prewarm_browsers():
+    if BROWSER_POOL_PREWARM <= 0:
+        return
+    try:
+        await _shared_browser_pool().warm(BROWSER_POOL_PREWARM)
+        logger.info(f"[BrowserUse] Pre-launched {BROWSER_POOL_PREWARM} browser(s)")
+    except Exception as e:
+        logger.warning(f"[BrowserUse] Could not pre-launch browsers: {e}")
+
+
+async def _close_shared_browsers():
+    pool = _shared.pop("browser_pool", None)
+    if pool:
+        await pool.close()
+
+
+agent_loop.on_start(_prewarm_browsers)
+agent_loop.on_stop(_close_shared_browsers)
+
 
 class StepResult(BaseModel):
     step: str
@@ -28,83 +89,71 @@ class ScenarioResult(BaseModel):
     final_result: str | None = None
     execution_time: float | None = None
     success: bool = False
+    # Replayable actions of a successful agent run (see ``trace_from_history``)
+    trace: list[dict] | None = None
 
 
-class LogCapture:
-    """Capture logs during agent execution"""
+# Identifies the agent run a log record belongs to, so concurrent runs on the
+# shared loop only see their own records
+_current_run: contextvars.ContextVar[object | None] = contextvars.ContextVar(
+    "browser_use_run", default=None
+)
 
-    def __init__(self):
-        self.captured_logs = []
-        self.original_handlers = {}
-        self.string_io = io.StringIO()
-        self.handler = logging.StreamHandler(self.string_io)
-        # Capture logs at INFO level and above
-        self.handler.setLevel(logging.INFO)
+# Cap on step results kept per run; older passed steps are dropped first
+MAX_STEP_RESULTS = int(os.getenv("MAX_STEP_RESULTS", "200"))
 
-        # Create a custom formatter to ensure we get all the info
-        formatter = logging.Formatter("%(levelname)s     [%(name)s] %(message)s")
-        self.handler.setFormatter(formatter)
 
-    def __enter__(self):
-        # Get the root logger and all browser_use related loggers
-        loggers_to_capture = [
-            "",  # Root logger
-            "agent",
-            "controller",
-            "browser",
-            "browser_use",
-            "browser_use_runner_lib",
-        ]
+class AgentLogParser:
+    """Incrementally turn agent log lines into step results.
 
-        for logger_name in loggers_to_capture:
-            log = logging.getLogger(logger_name)
-            # Store original handlers
-            self.original_handlers[logger_name] = log.handlers.copy()
-            # Add our capturing handler
-            log.addHandler(self.handler)
-            # Capture at INFO level by default
-            if log.level > logging.INFO:
-                log.setLevel(logging.INFO)
-
-        return self
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        # Restore original handlers and levels
-        for logger_name in self.original_handlers.keys():
-            log = logging.getLogger(logger_name)
-            log.removeHandler(self.handler)
-
-        # Get all captured logs
-        self.captured_logs = self.string_io.getvalue().split("\n")
-
-    def get_logs(self):
-        return self.captured_logs
+    Lines are parsed as they arrive, so results are available while the agent is
+    still running and memory stays bounded however long the run is.
+    """
 
+    def __init__(self, scenario: str, on_step=None, max_results: int = MAX_STEP_RESULTS):
+        self.scenario = scenario
+        self.on_step = on_step
+        self.max_results = max_results
+        self.results: list[StepResult] = []
+        self.final_result = None
+        self.current_step = None
+        self.step_counter = 1
+        self.task_completed_successfully = False
+        self.task_failed = False
+        self.lines_seen = 0
+        self.passed_count = 0
+        self.failed_count = 0
+        self.verification_passed = False
 
-def parse_agent_logs(
-    logs: list[str], scenario: str
-) -> tuple[list[StepResult], str, bool]:
-    """Parse agent execution logs to extract detailed steps, final result, and success status"""
-    results = []
-    final_result = None
-    current_step = None
-    step_counter = 1
-    task_completed_successfully = False
-    task_failed = False
-
-    # Log the amount of information captured for troubleshooting
-    logger.info(f"[PARSE] Processing {len(logs)} log lines for scenario: {scenario}")
+    def _add(self, result: StepResult):
+        self.results.append(result)
+        if result.status == "passed":
+            self.passed_count += 1
+            if "Verification:" in result.step:
+                self.verification_passed = True
+        elif result.status == "failed":
+            self.failed_count += 1
+        if len(self.results) > self.max_results:
+            drop = next(
+                (i for i, r in enumerate(self.results) if r.status == "passed"), 0
+            )
+            del self.results[drop]
+        if self.on_step:
+            try:
+                self.on_step(self.scenario, result)
+            except Exception as e:
+                logger.warning(f"[PARSE] on_step callback failed: {e}")
 
-    for log_line in logs:
+    def feed(self, log_line: str):
+        """Parse one log line."""
         if not log_line.strip():
-            continue
+            return
+        self.lines_seen += 1
 
         # PRIORITY 1: Check for definitive task completion indicators
         if "✅ Task completed successfully" in log_line:
-            task_completed_successfully = True
-            results.append(
-                StepResult(step="Task completion", status="passed", error=None)
-            )
+            self.task_completed_successfully = True
+            self._add(StepResult(step="Task completion", status="passed", error=None))
             logger.info(f"[PARSE] Found successful task completion indicator")
 
         elif (
@@ -113,8 +162,8 @@ def parse_agent_logs(
             or "❌ Task completed without success" in log_line
             or "Task completed without success" in log_line
         ):
-            task_failed = True
-            results.append(
+            self.task_failed = True
+            self._add(
                 StepResult(
                     step="Task completion",
                     status="failed",
@@ -127,10 +176,10 @@ def parse_agent_logs(
         elif "📍 Step" in log_line and "Evaluating page" in log_line:
             try:
                 step_num = log_line.split("📍 Step ")[1].split(":")[0]
-                current_step = f"Step {step_num}"
+                self.current_step = f"Step {step_num}"
             except:
-                current_step = f"Step {step_counter}"
-                step_counter += 1
+                self.current_step = f"Step {self.step_counter}"
+                self.step_counter += 1
 
         elif "📍 Step" in log_line and "Ran" in log_line:
             try:
@@ -138,8 +187,8 @@ def parse_agent_logs(
                     action_count = (
                         log_line.split("✅ ")[1].split()[0] if "✅" in log_line else "1"
                     )
-                    step_name = current_step or f"Step {step_counter}"
-                    results.append(
+                    step_name = self.current_step or f"Step {self.step_counter}"
+                    self._add(
                         StepResult(
                             step=f"{step_name}: Executed {action_count} action(s)",
                             status="passed",
@@ -147,8 +196,8 @@ def parse_agent_logs(
                         )
                     )
                 elif "❌" in log_line:
-                    step_name = current_step or f"Step {step_counter}"
-                    results.append(
+                    step_name = self.current_step or f"Step {self.step_counter}"
+                    self._add(
                         StepResult(
                             step=f"{step_name}: Failed execution",
                             status="failed",
@@ -160,13 +209,13 @@ def parse_agent_logs(
 
         # Extract specific actions
         elif "🔗" in log_line and ("Navigated to" in log_line or "Opened" in log_line):
-            results.append(
+            self._add(
                 StepResult(step="Navigation: Open page", status="passed", error=None)
             )
 
         elif "⌨️  Input" in log_line:
             if "standard_user" in log_line:
-                results.append(
+                self._add(
                     StepResult(
                         step="Authentication: Enter username",
                         status="passed",
@@ -174,7 +223,7 @@ def parse_agent_logs(
                     )
                 )
             elif "secret_sauce" in log_line:
-                results.append(
+                self._add(
                     StepResult(
                         step="Authentication: Enter password",
                         status="passed",
@@ -182,13 +231,13 @@ def parse_agent_logs(
                     )
                 )
             else:
-                results.append(
+                self._add(
                     StepResult(step="Input: Enter text", status="passed", error=None)
                 )
 
         elif "🖱️  Clicked" in log_line:
             if "Add to cart" in log_line:
-                results.append(
+                self._add(
                     StepResult(
                         step="Shopping: Add product to cart",
                         status="passed",
@@ -196,19 +245,19 @@ def parse_agent_logs(
                     )
                 )
             elif "button with index 1:" in log_line:
-                results.append(
+                self._add(
                     StepResult(
                         step="Navigation: Access cart", status="passed", error=None
                     )
                 )
             elif "LOGIN" in log_line.upper():
-                results.append(
+                self._add(
                     StepResult(
                         step="Authentication: Submit login", status="passed", error=None
                     )
                 )
             else:
-                results.append(
+                self._add(
                     StepResult(
                         step="Interaction: Click element", status="passed", error=None
                     )
@@ -221,7 +270,7 @@ def parse_agent_logs(
                 if "👍 Eval: Success - " in log_line
                 else "Success evaluation"
             )
-            results.append(
+            self._add(
                 StepResult(
                     step=f"Verification: {description}", status="passed", error=None
                 )
@@ -235,8 +284,8 @@ def parse_agent_logs(
                 description = log_line.split("❌ Eval: Failed - ")[1]
 
             # Only count as failure if task didn't ultimately succeed
-            if not task_completed_successfully:
-                results.append(
+            if not self.task_completed_successfully:
+                self._add(
                     StepResult(
                         step=f"Verification: {description}",
                         status="failed",
@@ -246,120 +295,614 @@ def parse_agent_logs(
 
         # Extract final result
         elif "📄 Result:" in log_line:
-            final_result = log_line.split("📄 Result: ")[1].strip()
+            self.final_result = log_line.split("📄 Result: ")[1].strip()
 
-    # DETERMINE SUCCESS: Priority order matters!
-    overall_success = False
+    def finish(self) -> tuple[list[StepResult], str, bool]:
+        """Return ``(results, final_result, success)`` for everything fed so far."""
+        results = list(self.results)
+        final_result = self.final_result
 
-    # 1. Explicit task completion (highest priority)
-    if task_completed_successfully:
-        overall_success = True
-        logger.info(f"[PARSE] Overall success: TRUE (explicit task completion found)")
-    elif task_failed:
+        # Log the amount of information captured for troubleshooting
+        logger.info(
+            f"[PARSE] Processed {self.lines_seen} log lines for scenario: {self.scenario}"
+        )
+
+        # DETERMINE SUCCESS: Priority order matters!
         overall_success = False
-        logger.info(f"[PARSE] Overall success: FALSE (explicit task failure found)")
-    # 2. Final result analysis
-    elif final_result:
-        success_indicators = [
-            "successfully",
-            "completed",
-            "verified",
-            "added",
-            "confirmed",
-            "success",
-            "accomplished",
-        ]
-        if any(indicator in final_result.lower() for indicator in success_indicators):
+
+        # 1. Explicit task completion (highest priority)
+        if self.task_completed_successfully:
+            overall_success = True
+            logger.info(f"[PARSE] Overall success: TRUE (explicit task completion found)")
+        elif self.task_failed:
+            overall_success = False
+            logger.info(f"[PARSE] Overall success: FALSE (explicit task failure found)")
+        # 2. Final result analysis
+        elif final_result:
+            success_indicators = [
+                "successfully",
+                "completed",
+                "verified",
+                "added",
+                "confirmed",
+                "success",
+                "accomplished",
+            ]
+            if any(indicator in final_result.lower() for indicator in success_indicators):
+                overall_success = True
+                logger.info(
+                    f"[PARSE] Overall success: TRUE (final result indicates success)"
+                )
+            else:
+                # Check if it's just a neutral result description
+                error_indicators = ["failed", "error", "could not", "unable", "timeout"]
+                if any(indicator in final_result.lower() for indicator in error_indicators):
+                    overall_success = False
+                    logger.info(
+                        f"[PARSE] Overall success: FALSE (final result indicates failure)"
+                    )
+                else:
+                    # Neutral final result - check other indicators
+                    overall_success = True  # Default to success if no clear failure
+                    logger.info(
+                        f"[PARSE] Overall success: TRUE (neutral final result, defaulting to success)"
+                    )
+        # 3. Check for successful verification steps
+        elif self.verification_passed:
             overall_success = True
             logger.info(
-                f"[PARSE] Overall success: TRUE (final result indicates success)"
+                f"[PARSE] Overall success: TRUE (found successful verification steps)"
             )
+        # 4. Step analysis (most lenient)
         else:
-            # Check if it's just a neutral result description
-            error_indicators = ["failed", "error", "could not", "unable", "timeout"]
-            if any(indicator in final_result.lower() for indicator in error_indicators):
-                overall_success = False
+            if self.passed_count > 0:
+                overall_success = True
                 logger.info(
-                    f"[PARSE] Overall success: FALSE (final result indicates failure)"
+                    f"[PARSE] Overall success: TRUE (found {self.passed_count} passed steps, {self.failed_count} failed)"
                 )
             else:
-                # Neutral final result - check other indicators
-                overall_success = True  # Default to success if no clear failure
-                logger.info(
-                    f"[PARSE] Overall success: TRUE (neutral final result, defaulting to success)"
-                )
-    # 3. Check for successful verification steps
-    elif any("Verification:" in r.step and r.status == "passed" for r in results):
-        overall_success = True
+                overall_success = False
+                logger.info(f"[PARSE] Overall success: FALSE (no successful steps found)")
+
+        # Ensure we have at least one result
+        if not results:
+            status = "passed" if overall_success else "failed"
+            error = None if overall_success else "No execution details captured"
+            results.append(StepResult(step="Task execution", status=status, error=error))
+
         logger.info(
-            f"[PARSE] Overall success: TRUE (found successful verification steps)"
+            f"[PARSE] Final determination - Success: {overall_success}, Steps: {len(results)}, Final result: '{final_result}'"
         )
-    # 4. Step analysis (most lenient)
-    else:
-        passed_steps = sum(1 for r in results if r.status == "passed")
-        failed_steps = sum(1 for r in results if r.status == "failed")
 
-        if passed_steps > 0:
-            overall_success = True
-            logger.info(
-                f"[PARSE] Overall success: TRUE (found {passed_steps} passed steps, {failed_steps} failed)"
+        return results, final_result, overall_success
+
+
+class StreamingLogHandler(logging.Handler):
+    """Logging handler that collects the records of one agent run for a parser.
+
+    With ``stream`` set every record is parsed as it arrives (for live step
+    updates); otherwise records are only kept, and ``parse_buffered()`` runs the
+    parser over them if the logs turn out to be needed.
+    """
+
+    def __init__(self, parser: AgentLogParser, run_id: object, stream: bool = True):
+        super().__init__(level=logging.INFO)
+        self.parser = parser
+        self.run_id = run_id
+        self.stream = stream
+        self.buffer = []
+        self._last_record = None
+        self._parsing = False
+
+    def handle(self, record: logging.LogRecord):
+        # Drop other runs' records before taking the handler lock: the parser logs
+        # while this lock is held, and concurrent runs would otherwise wait on
+        # each other's locks
+        if _current_run.get() is not self.run_id:
+            return False
+        return super().handle(record)
+
+    def emit(self, record: logging.LogRecord):
+        # The handler sits on several loggers; a propagated record reaches it once
+        # per logger. Records logged by the parser itself are not agent output.
+        if (
+            self._parsing
+            or record is self._last_record
+            or _current_run.get() is not self.run_id
+        ):
+            return
+        self._last_record = record
+        if not self.stream:
+            self.buffer.append(record)
+            return
+        self._parse(record)
+
+    def _parse(self, record: logging.LogRecord):
+        try:
+            message = record.getMessage()
+        except Exception:
+            return
+        self._parsing = True
+        try:
+            for line in message.split("\n"):
+                self.parser.feed(line)
+        finally:
+            self._parsing = False
+
+    def parse_buffered(self):
+        records, self.buffer = self.buffer, []
+        for record in records:
+            self._parse(record)
+
+
+class StreamingLogCapture:
+    """Attach a log parser to the agent loggers for the duration of a run.
+
+    Records are parsed as they stream in when ``on_step`` wants live steps, and
+    only buffered otherwise, so runs whose typed history is used never pay for
+    parsing.
+    """
+
+    loggers_to_capture = [
+        "",  # Root logger
+        "agent",
+        "controller",
+        "browser",
+        "browser_use",
+        "browser_use_runner_lib",
+    ]
+
+    def __init__(self, scenario: str, on_step=None):
+        self.parser = AgentLogParser(scenario, on_step=on_step)
+        self.handler = StreamingLogHandler(
+            self.parser, run_id=object(), stream=on_step is not None
+        )
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current_run.set(self.handler.run_id)
+        for logger_name in self.loggers_to_capture:
+            log = logging.getLogger(logger_name)
+            log.addHandler(self.handler)
+            # Capture at INFO level by default
+            if log.level > logging.INFO:
+                log.setLevel(logging.INFO)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for logger_name in self.loggers_to_capture:
+            logging.getLogger(logger_name).removeHandler(self.handler)
+        _current_run.reset(self._token)
+
+    def finish(self) -> tuple[list[StepResult], str, bool]:
+        self.handler.parse_buffered()
+        return self.parser.finish()
+
+
+def _action_names(model_output) -> list[str]:
+    names = []
+    for action in getattr(model_output, "action", None) or []:
+        try:
+            data = action.model_dump(exclude_unset=True)
+        except Exception:
+            data = action if isinstance(action, dict) else {}
+        names.extend(name for name, params in data.items() if params is not None)
+    return names
+
+
+def results_from_history(
+    history, scenario: str
+) -> tuple[list[StepResult], str, bool] | None:
+    """Build step results from the agent's typed run history.
+
+    Returns ``None`` when ``history`` does not look like a browser-use
+    ``AgentHistoryList``, so callers can fall back to log parsing.
+    """
+    items = getattr(history, "history", None)
+    if not isinstance(items, list) or not items:
+        return None
+
+    results = []
+    for step_number, item in enumerate(items, 1):
+        model_output = getattr(item, "model_output", None)
+        action_results = getattr(item, "result", None) or []
+
+        brain = getattr(model_output, "current_state", None)
+        evaluation = getattr(brain, "evaluation_previous_goal", "") or ""
+        if evaluation.startswith("Success"):
+            results.append(
+                StepResult(step=f"Verification: {evaluation}", status="passed")
             )
-        else:
-            overall_success = False
-            logger.info(f"[PARSE] Overall success: FALSE (no successful steps found)")
+        elif evaluation.startswith("Failed"):
+            results.append(
+                StepResult(
+                    step=f"Verification: {evaluation}",
+                    status="failed",
+                    error=evaluation,
+                )
+            )
+
+        actions = ", ".join(_action_names(model_output)) or "no action"
+        errors = [r.error for r in action_results if getattr(r, "error", None)]
+        results.append(
+            StepResult(
+                step=f"Step {step_number}: {actions}",
+                status="failed" if errors else "passed",
+                error=errors[0] if errors else None,
+            )
+        )
 
-    # Ensure we have at least one result
-    if not results:
-        status = "passed" if overall_success else "failed"
-        error = None if overall_success else "No execution details captured"
-        results.append(StepResult(step="Task execution", status=status, error=error))
+    is_done = history.is_done() if hasattr(history, "is_done") else False
+    success = None
+    if hasattr(history, "is_successful"):
+        success = history.is_successful()
+    if success is None:
+        success = bool(is_done)
+    final_result = history.final_result() if hasattr(history, "final_result") else None
+
+    if success:
+        # Intermediate failed evaluations don't count once the task succeeded
+        results = [
+            r
+            for r in results
+            if not r.step.startswith("Verification:") or r.status == "passed"
+        ]
+    results.append(
+        StepResult(
+            step="Task completion",
+            status="passed" if success else "failed",
+            error=None if success else "Task execution failed",
+        )
+    )
 
     logger.info(
-        f"[PARSE] Final determination - Success: {overall_success}, Steps: {len(results)}, Final result: '{final_result}'"
+        f"[HISTORY] {scenario}: {len(items)} agent steps, success: {success}, final result: '{final_result}'"
     )
+    return results, final_result, success
+
+
+# Agent actions that only read the page (or sleep); replay doesn't need them, as
+# every replayed operation waits for its own element or URL
+_READ_ONLY_ACTIONS = {
+    "done",
+    "extract_content",
+    "get_dropdown_options",
+    "scroll_down",
+    "scroll_up",
+    "scroll_to_text",
+    "wait",
+}
+
 
-    return results, final_result, overall_success
+# Checks recorded per trace: quoted phrases the agent reported seeing
+MAX_TRACE_TEXT_CHECKS = 5
+_QUOTED = re.compile(r'["“`]([^"”`\n]{2,80})["”`]')
+_JSON_BLOCK = re.compile(r"[\[{].*[\]}]", re.S)
+
+
+def _json_strings(value) -> list[str]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        return [text for v in value for text in _json_strings(v)]
+    return []
+
+
+def _reported_texts(text: str) -> list[str]:
+    """Page text the agent quoted in its final answer or an extraction.
+
+    Extractions are often JSON, whose values (not keys) are taken; otherwise
+    phrases in double quotes or backticks are.
+    """
+    if not text:
+        return []
+    block = _JSON_BLOCK.search(text)
+    if block:
+        try:
+            texts = _json_strings(json.loads(block.group(0)))
+            return [t.strip() for t in texts if 2 <= len(t.strip()) <= 80 and "\n" not in t]
+        except ValueError:
+            pass
+    return [t.strip() for t in _QUOTED.findall(text) if t.strip()]
+
+
+def _element_selectors(element) -> list[str]:
+    """Playwright selectors for an element the agent interacted with, most stable first."""
+    if element is None:
+        return []
+    selectors = []
+    element_id = (getattr(element, "attributes", None) or {}).get("id")
+    if element_id:
+        selectors.append(f'[id="{element_id}"]')
+    css = getattr(element, "css_selector", None)
+    if css:
+        selectors.append(css)
+    xpath = getattr(element, "xpath", None)
+    if xpath:
+        selectors.append("xpath=" + (xpath if xpath.startswith("/") else "/" + xpath))
+    return selectors
+
+
+# Parameters without which an agent action did nothing; such actions are skipped
+_REQUIRED_PARAMS = {
+    "go_to_url": "url",
+    "open_tab": "url",
+    "send_keys": "keys",
+    "input_text": "text",
+    "select_dropdown_option": "text",
+}
+_TOKEN_PUNCTUATION = "\"'“”‘’.,;:()"
+
+
+def _prompt_ref(prompt: str | None, value: str) -> dict | None:
+    """Where ``value`` appears in ``prompt`` as a word, so a trace needn't store it."""
+    if not prompt or not value:
+        return None
+    for index, token in enumerate(prompt.split()):
+        if token == value:
+            return {"token": index}
+        if token.strip(_TOKEN_PUNCTUATION) == value:
+            return {"token": index, "strip": True}
+    return None
+
+
+def prompt_value(prompt: str, ref: dict) -> str:
+    """Resolve a ``value_ref`` recorded by ``trace_from_history`` against the same prompt."""
+    token = prompt.split()[ref["token"]]
+    return token.strip(_TOKEN_PUNCTUATION) if ref.get("strip") else token
+
+
+def _is_password_field(element) -> bool:
+    attributes = getattr(element, "attributes", None) or {}
+    return str(attributes.get("type", "")).lower() == "password"
+
+
+def _trace_op(name: str, params: dict, element, prompt: str | None = None) -> dict | None:
+    if name in ("go_to_url", "open_tab"):
+        return {"op": "goto", "url": params["url"]}
+    if name == "go_back":
+        return {"op": "go_back"}
+    if name == "send_keys":
+        return {"op": "press", "keys": params["keys"]}
+    selectors = _element_selectors(element)
+    if not selectors:
+        return None
+    if name in ("click_element", "click_element_by_index"):
+        return {"op": "click", "selectors": selectors}
+    if name == "input_text":
+        # Values from the scenario text (credentials, test data) are stored as a
+        # reference to it; a password that isn't in the prompt is never stored
+        ref = _prompt_ref(prompt, params["text"])
+        if ref is not None:
+            return {"op": "fill", "selectors": selectors, "value_ref": ref}
+        if _is_password_field(element):
+            return None
+        return {"op": "fill", "selectors": selectors, "value": params["text"]}
+    if name == "select_dropdown_option":
+        return {"op": "select", "selectors": selectors, "value": params["text"]}
+    return None
+
+
+def trace_from_history(history, prompt: str | None = None) -> list[dict] | None:
+    """Turn a successful agent history into a replayable list of page operations.
+
+    Every step first checks the page is on the URL the agent saw, then repeats
+    its navigations, clicks and inputs against the elements' recorded
+    selectors. The trace ends with the checks that make a replay a verdict: the
+    final URL and the text the agent found (``scroll_to_text`` targets and
+    phrases quoted in its extractions and final answer). Typed values found in
+    ``prompt`` are stored as ``value_ref`` positions in it (see
+    ``prompt_value``) rather than literally. Returns ``None`` if any action
+    can't be replayed faithfully.
+    """
+    items = getattr(history, "history", None)
+    if not isinstance(items, list) or not items:
+        return None
+
+    trace = []
+    texts = []
+    last_url = None
+    for item in items:
+        state = getattr(item, "state", None)
+        url = getattr(state, "url", None)
+        if url and url != last_url and not url.startswith("about:"):
+            trace.append({"op": "expect_url", "url": url})
+            last_url = url
+
+        elements = getattr(state, "interacted_element", None) or []
+        action_results = getattr(item, "result", None) or []
+        actions = getattr(getattr(item, "model_output", None), "action", None) or []
+        for position, action in enumerate(actions):
+            try:
+                data = action.model_dump(exclude_unset=True)
+            except Exception:
+                data = action if isinstance(action, dict) else {}
+            for name, params in data.items():
+                if params is None:
+                    continue
+                if name == "done":
+                    texts.extend(_reported_texts(params.get("text", "")))
+                elif name == "extract_content" and position < len(action_results):
+                    extracted = getattr(action_results[position], "extracted_content", "")
+                    texts.extend(_reported_texts(extracted or ""))
+                elif name == "scroll_to_text" and params.get("text"):
+                    texts.append(params["text"])
+                if name in _READ_ONLY_ACTIONS:
+                    continue
+                required = _REQUIRED_PARAMS.get(name)
+                if required and not params.get(required):
+                    logger.info(f"[HISTORY] Action '{name}' has no '{required}'; skipping it")
+                    continue
+                element = elements[position] if position < len(elements) else None
+                op = _trace_op(name, params, element, prompt)
+                if op is None:
+                    logger.info(f"[HISTORY] Action '{name}' can't be replayed; not recording a trace")
+                    return None
+                trace.append(op)
+                if op["op"] in ("goto", "go_back"):
+                    last_url = None
+    if not any(op["op"] != "expect_url" for op in trace):
+        return None
+
+    texts = list(dict.fromkeys(texts))[:MAX_TRACE_TEXT_CHECKS]
+    checks = [{"op": "expect_text", "text": text} for text in texts]
+    final_url = getattr(getattr(items[-1], "state", None), "url", None)
+    if final_url and not final_url.startswith("about:"):
+        checks.insert(0, {"op": "expect_url", "url": final_url})
+    if not checks:
+        logger.info("[HISTORY] Nothing to check the outcome against; not recording a trace")
+        return None
+    if trace[-1] == checks[0]:
+        trace.pop()
+    return trace + checks
+
+
+def parse_agent_logs(
+    logs: list[str], scenario: str
+) -> tuple[list[StepResult], str, bool]:
+    """Parse agent execution logs to extract detailed steps, final result, and success status"""
+    parser = AgentLogParser(scenario)
+    for log_line in logs:
+        parser.feed(log_line)
+    return parser.finish()
 
 
 async def run_agent_with_browser_use(
-    task_description: str, scenario: str
+    task_description: str,
+    scenario: str,
+    browser_pool: BrowserPool | None = None,
+    llm=None,
+    on_step=None,
+    deadline: float | None = None,
 ) -> ScenarioResult:
     """
     Enhanced runner that captures and parses detailed execution logs with proper success detection
+
+    Every attempt builds a fresh agent on a fresh context of a browser checked out
+    from ``browser_pool``; without a pool a single-browser pool is created for
+    this run and closed after it. The whole scenario, retries included, must
+    finish within ``SCENARIO_TIMEOUT_SECONDS`` and before ``deadline`` (a
+    ``time.monotonic()`` value), if given.
+    ``on_step(scenario, step_result)`` is called live for every parsed step.
     """
     start_time = time.time()
+    budget_end = time.monotonic() + SCENARIO_TIMEOUT_SECONDS
+    if deadline is not None:
+        budget_end = min(budget_end, deadline)
+
+    llm = llm or _new_llm()
+
+    pool = browser_pool or BrowserPool(size=1)
+
+    async def run_attempt(timeout: float):
+        async with pool.context() as (browser, browser_context):
+            agent, structured = _build_agent(
+                task_description,
+                scenario,
+                controller=Controller(),
+                llm=llm,
+                browser=browser,
+                browser_context=browser_context,
+                on_step=on_step,
+            )
+            return await _run_agent(
+                agent, scenario, timeout, on_step, structured, task=task_description
+            )
+
+    try:
+        return await _run_with_retries(run_attempt, scenario, start_time, budget_end)
+    finally:
+        if browser_pool is None:
+            await pool.close()
+
+
+def _build_agent(task_description: str, scenario: str, on_step=None, **agent_kwargs):
+    """Create the agent, reporting steps through its step callback when supported.
+
+    Returns ``(agent, structured)``; ``structured`` is False for browser-use
+    versions without step callbacks, whose progress must be scraped from logs.
+    """
+
+    def step_callback(state, model_output, step_number):
+        if on_step is None:
+            return
+        actions = ", ".join(_action_names(model_output)) or "thinking"
+        on_step(scenario, StepResult(step=f"Step {step_number}: {actions}", status="running"))
+
+    try:
+        agent = Agent(
+            task=task_description,
+            register_new_step_callback=step_callback,
+            **agent_kwargs,
+        )
+        return agent, True
+    except TypeError:
+        return Agent(task=task_description, **agent_kwargs), False
+
+
+def _stop_agent(agent):
+    stop = getattr(agent, "stop", None)
+    if callable(stop):
+        try:
+            stop()
+        except Exception as e:
+            logger.warning(f"[BrowserUse] Could not stop agent: {e}")
+
+
+async def _run_agent(
+    agent, scenario: str, timeout: float, on_step=None, structured=True, task=None
+):
+    """Run ``agent`` once within ``timeout`` seconds.
+
+    Returns ``(results, final_result, success, trace)``; ``trace`` is only
+    recorded for successful runs, with values typed from ``task`` (the
+    prompt) stored as references to it.
+    """
+    # Logs are always captured as the fallback when the run returns no typed
+    # history; live steps come from them only for agents without step callbacks
+    log_capture = StreamingLogCapture(scenario, on_step=None if structured else on_step)
+    with log_capture:
+        try:
+            resp = await asyncio.wait_for(agent.run(), timeout=timeout)
+            logger.info(f"[BrowserUse] Agent execution completed successfully")
+        except asyncio.TimeoutError:
+            logger.error(f"[BrowserUse] Agent execution timed out")
+            _stop_agent(agent)
+            raise TimeoutError(f"Agent execution timed out after {timeout:.0f}s")
+        except asyncio.CancelledError:
+            _stop_agent(agent)
+            raise
 
-    # Standard LLM configuration
-    llm = ChatOpenAI(model="gpt-4o", temperature=0, max_tokens=4000, request_timeout=60)
+    # Prefer the agent's typed step history over scraped log text
+    extracted = results_from_history(resp, scenario)
+    if extracted is None:
+        logger.info(f"[BrowserUse] No agent history available, using parsed logs")
+        extracted = log_capture.finish()
+    trace = trace_from_history(resp, task) if extracted[2] else None
+    return (*extracted, trace)
 
-    controller = Controller()
-    agent = Agent(task=task_description, controller=controller, llm=llm)
 
+async def _run_with_retries(
+    run_attempt, scenario: str, start_time: float, budget_end: float
+) -> ScenarioResult:
+    """Call ``run_attempt(timeout)`` until it succeeds, retries run out or the budget ends."""
     max_retries = 3
     last_error = None
+    out_of_time = False
 
     for attempt in range(max_retries):
+        remaining = budget_end - time.monotonic()
+        if remaining < MIN_ATTEMPT_SECONDS:
+            out_of_time = True
+            break
         try:
             logger.info(
                 f"[BrowserUse] Attempt {attempt + 1}/{max_retries} for scenario: {scenario}"
             )
-
-            # Capture logs during execution
-            with LogCapture() as log_capture:
-                try:
-                    resp = await asyncio.wait_for(agent.run(), timeout=300)
-                    logger.info(f"[BrowserUse] Agent execution completed successfully")
-                except asyncio.TimeoutError:
-                    logger.error(f"[BrowserUse] Agent execution timed out")
-                    raise Exception("Agent execution timed out after 5 minutes")
-
-            # Get captured logs
-            captured_logs = log_capture.get_logs()
-            logger.info(f"[BrowserUse] Captured {len(captured_logs)} log lines")
-
-            # Parse logs to extract detailed steps and determine success
-            results, final_result, execution_successful = parse_agent_logs(
-                captured_logs, scenario
+            results, final_result, execution_successful, trace = await run_attempt(
+                min(AGENT_ATTEMPT_TIMEOUT_SECONDS, remaining)
             )
 
             execution_time = time.time() - start_time
@@ -377,14 +920,18 @@ async def run_agent_with_browser_use(
                 final_result=final_result,
                 execution_time=execution_time,
                 success=execution_successful,
+                trace=trace,
             )
 
         except RateLimitError as e:
             last_error = e
+            # Back off every OpenAI caller, honoring the server's Retry-After
+            delay = retry_delay(e, attempt)
+            openai_limiter.pause(delay)
             logger.warning(
-                f"[BrowserUse] ⏳ Rate limit hit. Retry {attempt + 1}/{max_retries}..."
+                f"[BrowserUse] ⏳ Rate limit hit. Retry {attempt + 1}/{max_retries} in {delay:.1f}s..."
             )
-            await asyncio.sleep(3)
+            await asyncio.sleep(min(delay, max(0.0, budget_end - time.monotonic())))
         except Exception as e:
             last_error = e
             logger.error(
@@ -393,11 +940,17 @@ async def run_agent_with_browser_use(
             )
             if attempt == max_retries - 1:
                 break
-            await asyncio.sleep(2)
+            await asyncio.sleep(min(2, max(0.0, budget_end - time.monotonic())))
 
-    # All retries failed
+    # All retries failed or the time budget ran out
     execution_time = time.time() - start_time
-    error_msg = f"All {max_retries} attempts failed. Last error: {str(last_error)}"
+    if out_of_time:
+        error_msg = (
+            f"Time budget exhausted after {execution_time:.0f}s and {attempt} attempt(s). "
+            f"Last error: {str(last_error)}"
+        )
+    else:
+        error_msg = f"All {max_retries} attempts failed. Last error: {str(last_error)}"
 
     logger.error(f"[BrowserUse] {error_msg}")
 
@@ -416,29 +969,77 @@ async def run_agent_with_browser_use(
     )
 
 
-def run_browser_use_test_hybrid(prompt: str, scenario_name="Unnamed scenario"):
+async def _run_on_shared_resources(
+    prompt: str, scenario_name: str, on_step=None, deadline: float | None = None
+) -> ScenarioResult:
+    return await run_agent_with_browser_use(
+        prompt,
+        scenario_name,
+        browser_pool=_shared_browser_pool(),
+        llm=_shared_llm(),
+        on_step=on_step,
+        deadline=deadline,
+    )
+
+
+def submit_browser_use_test(
+    prompt: str, scenario_name="Unnamed scenario", on_step=None, deadline=None
+) -> concurrent.futures.Future:
+    """Start a scenario on the shared agent loop and return a future for its ScenarioResult.
+
+    Cancelling the future cancels the run and closes its browser context.
+    """
+    return agent_loop.submit(
+        _run_on_shared_resources(prompt, scenario_name, on_step, deadline)
+    )
+
+
+def _failed_result(scenario_name: str, step: str, error: str, execution_time=0.0):
+    return ScenarioResult(
+        scenario=scenario_name,
+        results=[StepResult(step=step, status="failed", error=error)],
+        final_result=None,
+        execution_time=execution_time,
+        success=False,
+    )
+
+
+def run_browser_use_test_hybrid(
+    prompt: str, scenario_name="Unnamed scenario", on_step=None, deadline=None
+):
     """
     Synchronous wrapper with enhanced error handling
+
+    Safe to call from any thread; concurrent calls share the agent loop, its
+    LLM client and the warm browser pool. ``on_step(scenario, step_result)`` is
+    called from the loop thread as steps are parsed. Past ``deadline`` (a
+    ``time.monotonic()`` value) the run is cancelled and reported as failed.
     """
+    started = time.monotonic()
+    future = None
     try:
         logger.info(f"[BrowserUse] Starting execution for: {scenario_name}")
-        result = asyncio.run(run_agent_with_browser_use(prompt, scenario_name))
+        future = submit_browser_use_test(prompt, scenario_name, on_step, deadline)
+        # The run enforces the deadline itself; the grace covers browser teardown
+        timeout = None if deadline is None else max(0.0, deadline - started) + CANCEL_GRACE_SECONDS
+        result = future.result(timeout=timeout)
         logger.info(
             f"[BrowserUse] Completed execution for: {scenario_name} - Success: {result.success}"
         )
         return result
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        logger.error(f"[BrowserUse] ⏱️ Cancelled {scenario_name}: time budget exhausted")
+        return _failed_result(
+            scenario_name,
+            "browser-use agent execution",
+            "Cancelled: time budget exhausted",
+            time.monotonic() - started,
+        )
     except Exception as e:
         logger.error(f"[BrowserUse] Wrapper execution failed: {e}", exc_info=True)
-        return ScenarioResult(
-            scenario=scenario_name,
-            results=[
-                StepResult(
-                    step="test execution wrapper",
-                    status="failed",
-                    error=f"Wrapper execution failed: {str(e)}",
-                )
-            ],
-            final_result=None,
-            execution_time=0.0,
-            success=False,
+        return _failed_result(
+            scenario_name,
+            "test execution wrapper",
+            f"Wrapper execution failed: {str(e)}",
         )
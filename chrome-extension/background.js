@@ -27,33 +27,113 @@ chrome.tabs.onUpdated.addListener((tabId, changeInfo, tab) => {
     }
 });
 
-chrome.runtime.onMessage.addListener((request, sender, sendResponse) => {
-    if (request.action === "triggerAgent") {
-        console.log("[Agent] Received triggerAgent for", request.issueKey, "with status:", request.status);
+// Board scans arriving within this window are merged into one request
+const TRIGGER_DEBOUNCE_MS = 2000;
+// A card is not re-sent with the same status for this long
+const LAST_SENT_TTL_MS = 5 * 60 * 1000;
+// Backup for the debounce timer, which is lost if Chrome suspends the worker
+const FLUSH_ALARM = 'flushTriggers';
 
-        let endpoint = "";
-        if (request.status === "qa") {
-        endpoint = "run-tests";
-        } else if (request.status === "in progress") {
-        endpoint = "suggest-scenarios";
-        }
+// Queued cards and recently sent cards live in chrome.storage.session, since
+// module state is lost whenever Chrome suspends this service worker
+let stateQueue = Promise.resolve();
+let flushTimer = null;
+
+function withTriggerState(update) {
+    const run = stateQueue.then(async () => {
+        const stored = await chrome.storage.session.get(['pendingTriggers', 'lastSentTriggers']);
+        const state = {
+            pending: stored.pendingTriggers || {},
+            lastSent: stored.lastSentTriggers || {}
+        };
+        const result = update(state);
+        await chrome.storage.session.set({
+            pendingTriggers: state.pending,
+            lastSentTriggers: state.lastSent
+        });
+        return result;
+    });
+    stateQueue = run.catch(err => console.error("[Agent] ❌ Trigger state error:", err));
+    return run;
+}
 
-        const url = (AGENT_BACKEND_URL || 'http://localhost:5000') + '/' + endpoint;
-
-        fetch(url, {
-            method: "POST",
-            headers: {
-                "Content-Type": "application/json"
-            },
-            body: JSON.stringify({
-                issueKey: request.issueKey,
-                status: request.status,
-                hasTestedLabel: request.hasTestedLabel || false
-            })
-        })
-        .then(res => res.json())
-        .then(data => console.log("[Agent] ✅ Response:", data))
-        .catch(err => console.error("[Agent] ❌ Error:", err));
+function queueTriggers(items) {
+    withTriggerState(state => {
+        const now = Date.now();
+        let queued = false;
+        items.forEach(item => {
+            const previous = state.lastSent[item.issueKey];
+            if (previous && previous.status === item.status && now - previous.sentAt < LAST_SENT_TTL_MS) {
+                return;
+            }
+            state.pending[item.issueKey] = item;
+            queued = true;
+        });
+        return queued;
+    }).then(queued => {
+        if (!queued) return;
+        clearTimeout(flushTimer);
+        flushTimer = setTimeout(flushTriggers, TRIGGER_DEBOUNCE_MS);
+        chrome.alarms.create(FLUSH_ALARM, { delayInMinutes: 0.5 });
+    });
+}
+
+async function flushTriggers() {
+    clearTimeout(flushTimer);
+    chrome.alarms.clear(FLUSH_ALARM);
+
+    const items = await withTriggerState(state => {
+        const now = Date.now();
+        const items = Object.values(state.pending);
+        state.pending = {};
+        Object.keys(state.lastSent).forEach(key => {
+            if (now - state.lastSent[key].sentAt >= LAST_SENT_TTL_MS) delete state.lastSent[key];
+        });
+        items.forEach(item => {
+            state.lastSent[item.issueKey] = { status: item.status, sentAt: now };
+        });
+        return items;
+    });
+    if (!items.length) return;
+
+    const url = (AGENT_BACKEND_URL || 'http://localhost:5000') + '/trigger-batch';
+    console.log("[Agent] Sending batch of", items.length, "cards");
+
+    fetch(url, {
+        method: "POST",
+        headers: {
+            "Content-Type": "application/json"
+        },
+        body: JSON.stringify({ items: items })
+    })
+    .then(res => res.json())
+    .then(data => console.log("[Agent] ✅ Response:", data))
+    .catch(err => {
+        console.error("[Agent] ❌ Error:", err);
+        // Allow the cards to be sent again on the next scan
+        withTriggerState(state => {
+            items.forEach(item => delete state.lastSent[item.issueKey]);
+        });
+    });
+}
+
+chrome.alarms.onAlarm.addListener((alarm) => {
+    if (alarm.name === FLUSH_ALARM) flushTriggers();
+});
+
+// Send whatever a suspended worker left queued
+flushTriggers();
+
+chrome.runtime.onMessage.addListener((request, sender, sendResponse) => {
+    if (request.action === "triggerBatch") {
+        queueTriggers(request.items || []);
+    } else if (request.action === "triggerAgent") {
+        console.log("[Agent] Received triggerAgent for", request.issueKey, "with status:", request.status);
+        queueTriggers([{
+            issueKey: request.issueKey,
+            status: request.status,
+            hasTestedLabel: request.hasTestedLabel || false
+        }]);
     }
 });
 
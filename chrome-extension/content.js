@@ -2,33 +2,35 @@ function checkQAColumn() {
     console.log("[Extension] Checking board columns for agent triggers...");
 
     const cards = document.querySelectorAll('[data-testid="platform-board-kit.ui.card.card"]');
+    const items = [];
 
     cards.forEach(card => {
         const columnContainer = card.closest('[data-testid^="platform-board-kit.ui.column"]');
         const columnTitleEl = columnContainer?.querySelector('[data-testid*="column-name"]');
         const columnTitle = columnTitleEl?.textContent?.trim();
 
+        let status = null;
+        if (columnTitle === "In Progress") {
+            status = 'in progress';
+        } else if (columnTitle === "QA") {
+            status = 'qa';
+        }
+        if (!status) return;
+
         const issueKey = card.getAttribute("data-issue-key") || card.textContent?.match(/[A-Z]+-\d+/)?.[0];
         if (!issueKey) return;
 
-        const hasTestedLabel = checkForTestedLabel(card);
-
-        if (columnTitle === "In Progress") {
-        chrome.runtime.sendMessage({
-            action: 'triggerAgent',
+        items.push({
             issueKey: issueKey,
-            status: 'in progress',
-            hasTestedLabel: hasTestedLabel
+            status: status,
+            hasTestedLabel: checkForTestedLabel(card)
         });
-        } else if (columnTitle === "QA") {
-        chrome.runtime.sendMessage({
-            action: 'triggerAgent',
-            issueKey: issueKey,
-            status: 'qa',
-            hasTestedLabel: hasTestedLabel
-        });
-        }
     });
+
+    // One message per board scan; the background script batches and dedupes
+    if (items.length) {
+        chrome.runtime.sendMessage({ action: 'triggerBatch', items: items });
+    }
 }
 
 // Check if card has a "tested" label
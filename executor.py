@@ -1,17 +1,41 @@
-from playwright.sync_api import sync_playwright
+import os
+import time
+from urllib.parse import urldefrag
 
+from action_registry import get_registry
+from playwright_session import scenario_page
 from reporter import TestStepResult
 
-def run_test_steps(steps, scenario="Unnamed scenario"):
-    results = []
+# How long a replayed action waits for its element or page before diverging
+REPLAY_TIMEOUT_MS = int(os.getenv("REPLAY_TIMEOUT_MS", "10000"))
+# Playwright's own default for clicks, fills and navigations
+PLAYWRIGHT_TIMEOUT_MS = 30000
+
+
+def _remaining_ms(deadline: float | None, cap: int) -> int:
+    """``cap``, shortened to what is left before ``deadline`` (a ``time.monotonic()`` value).
+
+    Raises ``TimeoutError`` once the deadline has passed.
+    """
+    if deadline is None:
+        return cap
+    remaining = int((deadline - time.monotonic()) * 1000)
+    if remaining <= 0:
+        raise TimeoutError("Story time budget exhausted")
+    return min(cap, remaining)
+
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            viewport={"width": 1280, "height": 720}, device_scale_factor=1
-        )
-        page = context.new_page()
+def run_test_steps(steps, scenario="Unnamed scenario", session=None, deadline=None):
+    """Run ``steps`` in a fresh context of ``session``'s browser (or a browser of their own).
 
+    No step runs past ``deadline`` (a ``time.monotonic()`` value): Playwright
+    and wait timeouts are shortened to the time left, and steps still to run
+    when it passes fail.
+    """
+    registry = get_registry()
+    results = []
+
+    with scenario_page(session) as page:
         for index, step in enumerate(steps):
             step_result = TestStepResult(step=step, status="")
             try:
@@ -19,50 +43,15 @@ def run_test_steps(steps, scenario="Unnamed scenario"):
                 context_data = step.get("context", {})
                 print(f"Executing Step {index+1}: {action} -> {context_data}")
 
-                if action in ["go_to", "navigate"]:
-                    url = context_data.get("url", "")
-                    page.goto(url, wait_until="networkidle")
-                    page.wait_for_load_state("load")
-
-                elif action == "login":
-                    page.fill("#user-name", context_data.get("username", ""))
-                    page.fill("#password", context_data.get("password", ""))
-                    page.click("#login-button")
-                    page.wait_for_timeout(1000)
-
-                elif action == "add_to_cart":
-                    item = context_data.get("item_name", "").lower()
-                    if "backpack" in item:
-                        page.click("#add-to-cart-sauce-labs-backpack")
-                    elif "bike light" in item:
-                        page.click("#add-to-cart-sauce-labs-bike-light")
-                    else:
-                        page.locator("button:has-text('Add to cart')").first.click()
-
-                elif action == "remove_from_cart":
-                    item = context_data.get("item_name", "").lower()
-                    if "backpack" in item:
-                        page.click("#remove-sauce-labs-backpack")
-                    elif "bike light" in item:
-                        page.click("#remove-sauce-labs-bike-light")
-
-                elif action in ["view_cart", "click_cart_icon"]:
-                    page.click(".shopping_cart_link")
-                    page.wait_for_timeout(1000)
-
-                elif action in ["verify_items", "verify_cart"]:
-                    expected_items = context_data.get("expected_items", [])
-                    found_items = page.locator(
-                        ".cart_item .inventory_item_name"
-                    ).all_text_contents()
-                    for item in expected_items:
-                        assert item in found_items, f"'{item}' not found in cart"
+                timeout_ms = None
+                if deadline is not None:
+                    timeout_ms = _remaining_ms(deadline, PLAYWRIGHT_TIMEOUT_MS)
+                    page.set_default_timeout(timeout_ms)
+                step_result.waits = registry.run(page, action, context_data, timeout_ms=timeout_ms)
 
                 step_result.status = "passed"
-                print(f"✅ Step {index+1} succeeded")
-
-                if index == len(steps) - 1:
-                    page.wait_for_timeout(1000)
+                waited = ", ".join(f"{w['wait']} {w['seconds']:.2f}s" for w in step_result.waits)
+                print(f"✅ Step {index+1} succeeded" + (f" (waited: {waited})" if waited else ""))
 
             except Exception as e:
                 print(f"❌ Step {index+1} failed: {e}")
@@ -72,5 +61,77 @@ def run_test_steps(steps, scenario="Unnamed scenario"):
 
             results.append(step_result)
 
-        browser.close()
+    return results
+
+
+def _same_url(actual: str, expected: str) -> bool:
+    return urldefrag(actual)[0].rstrip("/") == urldefrag(expected)[0].rstrip("/")
+
+
+def _locate(page, selectors, timeout_ms):
+    """First of the recorded ``selectors`` that matches a visible element."""
+    per_selector = max(1000, timeout_ms // len(selectors))
+    for selector in selectors:
+        locator = page.locator(selector).first
+        try:
+            locator.wait_for(state="visible", timeout=per_selector)
+            return locator
+        except Exception:
+            continue
+    raise LookupError(f"No element matches {selectors}")
+
+
+def _replay_op(page, op, timeout_ms):
+    kind = op["op"]
+    if kind == "expect_url":
+        page.wait_for_url(lambda url: _same_url(url, op["url"]), timeout=timeout_ms)
+    elif kind == "expect_text":
+        page.get_by_text(op["text"]).first.wait_for(state="visible", timeout=timeout_ms)
+    elif kind == "goto":
+        page.goto(op["url"], wait_until="load", timeout=timeout_ms)
+    elif kind == "go_back":
+        page.go_back(timeout=timeout_ms)
+    elif kind == "press":
+        page.keyboard.press(op["keys"])
+    elif kind == "click":
+        _locate(page, op["selectors"], timeout_ms).click(timeout=timeout_ms)
+    elif kind == "fill":
+        _locate(page, op["selectors"], timeout_ms).fill(op["value"], timeout=timeout_ms)
+    elif kind == "select":
+        _locate(page, op["selectors"], timeout_ms).select_option(label=op["value"], timeout=timeout_ms)
+    else:
+        raise ValueError(f"Unknown trace operation '{kind}'")
+
+
+def describe_op(op) -> str:
+    """Short description of a trace operation (input values are left out)."""
+    target = (
+        op.get("url") or (op.get("selectors") or [""])[0] or op.get("keys") or op.get("text", "")
+    )
+    return f"{op['op']} {target}".strip()
+
+
+def replay_trace(
+    trace, scenario="Unnamed scenario", timeout_ms=REPLAY_TIMEOUT_MS, session=None, deadline=None
+):
+    """Repeat a recorded agent run and its checks; stops at the first operation that diverges.
+
+    Operations time out at ``deadline`` (a ``time.monotonic()`` value) at the latest.
+    """
+    results = []
+
+    with scenario_page(session) as page:
+        for index, op in enumerate(trace):
+            step_result = TestStepResult(step=op, status="")
+            try:
+                _replay_op(page, op, _remaining_ms(deadline, timeout_ms))
+                step_result.status = "passed"
+            except Exception as e:
+                print(f"❌ Replay of '{scenario}' diverged at step {index+1} ({describe_op(op)}): {e}")
+                step_result.status = "failed"
+                step_result.error = str(e)
+            results.append(step_result)
+            if step_result.status == "failed":
+                break
+
     return results
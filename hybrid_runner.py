@@ -0,0 +1,246 @@
+"""Run scenarios on the deterministic Playwright engine when possible.
+
+Scenario text made only of steps the executor knows (open a URL, enter
+credentials and log in, add or remove an item, open the cart, check the cart) is
+compiled into ``executor`` actions and run without any LLM call. Other scenarios
+go to the browser-use agent, whose successful runs are recorded and replayed
+through Playwright the next time the same scenario (by fingerprint) comes up;
+the agent only runs again when the replay diverges.
+"""
+import logging
+import os
+import re
+import time
+
+from browser_use_runner_lib import (
+    ScenarioResult,
+    StepResult,
+    prompt_value,
+    run_browser_use_test_hybrid,
+)
+from results_store import get_results_store, scenario_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Re-run a scenario on the agent when its deterministic run fails (e.g. a selector
+# that doesn't exist on this site) instead of reporting the failure directly
+HYBRID_FALLBACK_ON_FAILURE = (
+    os.getenv("HYBRID_FALLBACK_ON_FAILURE", "true").lower() == "true"
+)
+# Record successful agent runs and replay them instead of asking the agent again
+TRACE_REPLAY = os.getenv("TRACE_REPLAY", "true").lower() == "true"
+
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)]|step\s+\d+:?)\s*", re.IGNORECASE)
+_QUOTES = "\"'“”‘’"
+
+_GO_TO = re.compile(r"^(?:go to|navigate to|open|visit)\s+(?:the\s+)?(?:page\s+)?(https?://\S+?)\.?$", re.I)
+_USERNAME = re.compile(r"^(?:enter|type|fill in|input)\s+(?:the\s+)?username\s*[:=]?\s*(\S+)$", re.I)
+_PASSWORD = re.compile(r"^(?:enter|type|fill in|input)\s+(?:the\s+)?password\s*[:=]?\s*(\S+)$", re.I)
+_LOGIN = re.compile(r"^(?:click|press|tap)\s+(?:on\s+)?(?:the\s+)?log\s?in(?:\s+button)?\.?$", re.I)
+_ADD = re.compile(r"^(?:click\s+)?add to cart(?:\s+(?:on|for)\s+(?:the\s+)?(.+?))?\.?$", re.I)
+_REMOVE = re.compile(r"^(?:click\s+)?remove\s+(?:the\s+)?(.+?)\s+from\s+(?:the\s+)?cart\.?$", re.I)
+_CART = re.compile(r"^(?:click|open|go to|view)\s+(?:on\s+)?(?:the\s+)?(?:shopping\s+)?cart(?:\s+icon|\s+link|\s+page)?\.?$", re.I)
+_VERIFY = re.compile(
+    r"^(?:assert|verify|check)\s+(?:that\s+)?(?:the\s+)?(.+?)\s+(?:is|are)\s+"
+    r"(?:visible|shown|displayed|present|listed)\s+in\s+the\s+cart\.?$",
+    re.I,
+)
+_ANY_ITEM = re.compile(r"^(?:an?|any|the|selected)?\s*(?:item|items|product|products)$", re.I)
+_BARE_URL = re.compile(r"https?://\S+")
+
+
+def _clean(line: str) -> str:
+    line = _LIST_MARKER.sub("", line).strip()
+    for quote in _QUOTES:
+        line = line.replace(quote, "")
+    return line.strip()
+
+
+def compile_steps(text: str) -> list[dict] | None:
+    """Translate natural-language steps (one per line) into executor actions.
+
+    Returns ``None`` as soon as a line isn't recognised, since a partially
+    compiled scenario would test something else.
+    """
+    actions = []
+    credentials = {}
+    for raw in text.splitlines():
+        line = _clean(raw)
+        if not line:
+            continue
+        if m := _GO_TO.match(line):
+            actions.append({"action": "go_to", "context": {"url": m.group(1)}, "description": line})
+        elif m := _USERNAME.match(line):
+            credentials["username"] = m.group(1)
+        elif m := _PASSWORD.match(line):
+            credentials["password"] = m.group(1)
+        elif _LOGIN.match(line):
+            if set(credentials) != {"username", "password"}:
+                return None
+            actions.append({"action": "login", "context": credentials, "description": line})
+            credentials = {}
+        elif m := _ADD.match(line):
+            item = m.group(1) or ""
+            if _ANY_ITEM.match(item) or item.lower().startswith("any "):
+                item = ""
+            actions.append(
+                {"action": "add_to_cart", "context": {"item_name": item}, "description": line}
+            )
+        elif m := _REMOVE.match(line):
+            actions.append(
+                {"action": "remove_from_cart", "context": {"item_name": m.group(1)}, "description": line}
+            )
+        elif _CART.match(line):
+            actions.append({"action": "view_cart", "context": {}, "description": line})
+        elif m := _VERIFY.match(line):
+            item = m.group(1)
+            expected = [] if _ANY_ITEM.match(item) else [item]
+            actions.append(
+                {
+                    "action": "verify_cart",
+                    "context": {"expected_items": expected, "min_items": 1},
+                    "description": line,
+                }
+            )
+        else:
+            return None
+    # Credentials that were never submitted mean the flow wasn't fully understood
+    if credentials or not actions:
+        return None
+    return actions
+
+
+def compile_prompt(prompt: str) -> list[dict] | None:
+    """Compile a runner prompt: the story description, a blank line, then the scenario step.
+
+    The whole prompt must compile, since the description can state
+    preconditions (a login, test data) the step relies on. The one exception
+    is a description that is nothing but the site URL, which is opened first.
+    """
+    actions = compile_steps(prompt)
+    if actions is not None:
+        return actions
+    context, _, step = prompt.strip().rpartition("\n\n")
+    lines = [line.strip() for line in context.splitlines() if line.strip()]
+    if len(lines) != 1 or not _BARE_URL.fullmatch(lines[0]):
+        return None
+    actions = compile_steps(step)
+    if actions is None or actions[0]["action"] == "go_to":
+        return actions
+    url = lines[0]
+    return [{"action": "go_to", "context": {"url": url}, "description": f"Go to {url}"}] + actions
+
+
+def _scenario_result(scenario_name, step_results, start, describe, engine) -> ScenarioResult:
+    results = [
+        StepResult(step=describe(r.step), status=r.status, error=r.error)
+        for r in step_results
+    ]
+    success = bool(results) and all(r.status == "passed" for r in results)
+    return ScenarioResult(
+        scenario=scenario_name,
+        results=results,
+        final_result=(
+            f"All {len(results)} steps passed on the {engine}"
+            if success
+            else f"Run on the {engine} failed"
+        ),
+        execution_time=time.time() - start,
+        success=success,
+    )
+
+
+def _out_of_time(deadline) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def _run_fast_path(actions: list[dict], scenario_name: str, deadline=None) -> ScenarioResult:
+    from executor import run_test_steps
+    from playwright_session import get_session_pool
+
+    start = time.time()
+    # Runs on a pooled worker whose browser stays up between scenarios
+    future = get_session_pool().submit(
+        run_test_steps, actions, scenario=scenario_name, deadline=deadline
+    )
+    return _scenario_result(
+        scenario_name,
+        future.result(),
+        start,
+        lambda step: step.get("description") or step.get("action", ""),
+        "deterministic engine",
+    )
+
+
+def _resolve_values(trace: list[dict], prompt: str) -> list[dict]:
+    """Fill in the typed values a trace references from the scenario prompt."""
+    return [
+        dict(op, value=prompt_value(prompt, op["value_ref"])) if "value_ref" in op else op
+        for op in trace
+    ]
+
+
+def _replay(trace: list[dict], scenario_name: str, prompt: str, deadline=None) -> ScenarioResult:
+    from executor import describe_op, replay_trace
+    from playwright_session import get_session_pool
+
+    trace = _resolve_values(trace, prompt)
+    start = time.time()
+    future = get_session_pool().submit(
+        replay_trace, trace, scenario=scenario_name, deadline=deadline
+    )
+    return _scenario_result(
+        scenario_name,
+        future.result(),
+        start,
+        lambda op: f"Replay: {describe_op(op)}",
+        "recorded replay",
+    )
+
+
+def _run_agent(prompt, scenario_name, on_step, deadline) -> ScenarioResult:
+    if not TRACE_REPLAY:
+        return run_browser_use_test_hybrid(
+            prompt, scenario_name, on_step=on_step, deadline=deadline
+        )
+
+    store = get_results_store()
+    fingerprint = scenario_fingerprint(scenario_name, prompt)
+    trace = store.trace(fingerprint)
+    if trace:
+        logger.info(f"[Hybrid] ⏪ Replaying the recorded run of '{scenario_name}'")
+        try:
+            result = _replay(trace, scenario_name, prompt, deadline)
+            if result.success:
+                return result
+            if _out_of_time(deadline):
+                logger.info(f"[Hybrid] Replay of '{scenario_name}' ran out of time")
+                return result
+            logger.info(f"[Hybrid] Replay of '{scenario_name}' diverged, running the agent")
+        except Exception as e:
+            logger.warning(f"[Hybrid] Replay unavailable for '{scenario_name}': {e}")
+        store.drop_trace(fingerprint)
+
+    result = run_browser_use_test_hybrid(
+        prompt, scenario_name, on_step=on_step, deadline=deadline
+    )
+    trace = getattr(result, "trace", None)
+    if result.success and trace:
+        store.save_trace(fingerprint, scenario_name, trace)
+        logger.info(f"[Hybrid] 📼 Recorded {len(trace)} actions of '{scenario_name}' for replay")
+    return result
+
+
+def run_hybrid_test(prompt: str, scenario_name="Unnamed scenario", on_step=None, deadline=None):
+    """Runner for ``format_test_results``: Playwright fast path or recorded replay first, agent otherwise."""
+    actions = compile_prompt(prompt)
+    if actions is not None:
+        logger.info(f"[Hybrid] ⚡ Running '{scenario_name}' on the deterministic engine")
+        try:
+            result = _run_fast_path(actions, scenario_name, deadline)
+            if result.success or not HYBRID_FALLBACK_ON_FAILURE or _out_of_time(deadline):
+                return result
+            logger.info(f"[Hybrid] Fast path failed for '{scenario_name}', retrying with the agent")
+        except Exception as e:
+            logger.warning(f"[Hybrid] Fast path unavailable for '{scenario_name}': {e}")
+    return _run_agent(prompt, scenario_name, on_step, deadline)
@@ -0,0 +1,118 @@
+"""Snapshot cache of fetched Jira issues.
+
+A sweep or request opens a scope with ``issue_cache_scope()``; inside it, each
+issue is fetched once (individually or by a bulk search) and served from memory
+afterwards. Optionally, a short-TTL process-wide cache is shared by all requests
+(``JIRA_ISSUE_CACHE_TTL_SECONDS``, off by default). Code that writes to an issue
+must update the cached snapshot or call ``invalidate_issue()``.
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+JIRA_ISSUE_CACHE_TTL_SECONDS = float(os.getenv("JIRA_ISSUE_CACHE_TTL_SECONDS", "0"))
+
+_current_cache = contextvars.ContextVar("issue_cache", default=None)
+
+
+class IssueCache:
+    """Thread-safe map of issue key to ``(issue, fields, fetched_at)``.
+
+    ``fields`` is the tuple of fields the issue was fetched with, or ``None``
+    when it was fetched in full. Entries older than ``ttl`` seconds are ignored.
+    """
+
+    def __init__(self, ttl: float | None = None):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, fields=None):
+        """Return the cached issue if it was fetched with at least ``fields``."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        issue, cached_fields, fetched_at = entry
+        if self.ttl is not None and time.monotonic() - fetched_at > self.ttl:
+            self.invalidate(key)
+            return None
+        if cached_fields is None:
+            return issue
+        if fields is None or not set(fields) <= set(cached_fields):
+            return None
+        return issue
+
+    def put(self, issue, fields=None):
+        with self._lock:
+            self._entries[issue.key] = (
+                issue,
+                tuple(fields) if fields else None,
+                time.monotonic(),
+            )
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+_shared_cache = (
+    IssueCache(ttl=JIRA_ISSUE_CACHE_TTL_SECONDS)
+    if JIRA_ISSUE_CACHE_TTL_SECONDS > 0
+    else None
+)
+
+
+def current_issue_cache() -> IssueCache | None:
+    return _current_cache.get()
+
+
+@contextmanager
+def issue_cache_scope():
+    """Cache issues fetched inside the ``with`` block (nested scopes share the outer cache)."""
+    if _current_cache.get() is not None:
+        yield _current_cache.get()
+        return
+    cache = IssueCache()
+    token = _current_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _current_cache.reset(token)
+
+
+def _caches():
+    return [c for c in (current_issue_cache(), _shared_cache) if c is not None]
+
+
+def get_issue(jira, key: str, fields=None):
+    """Fetch ``key`` (optionally only ``fields``) through the active caches."""
+    caches = _caches()
+    for cache in caches:
+        issue = cache.get(key, fields)
+        if issue is not None:
+            return issue
+    if fields:
+        issue = jira.issue(key, fields=",".join(fields))
+    else:
+        issue = jira.issue(key)
+    for cache in caches:
+        cache.put(issue, fields)
+    return issue
+
+
+def peek_issue(key: str, fields=None):
+    """Return the cached snapshot of ``key`` without fetching, or ``None``."""
+    for cache in _caches():
+        issue = cache.get(key, fields)
+        if issue is not None:
+            return issue
+    return None
+
+
+def invalidate_issue(key: str):
+    """Drop ``key`` from the active caches after a write that changed it."""
+    for cache in _caches():
+        cache.invalidate(key)
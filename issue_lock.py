@@ -0,0 +1,93 @@
+"""Cross-process per-issue lock so only one workflow runs for an issue at a time.
+
+Locks live in the shared state database, so every gunicorn worker sees them.
+Each lock remembers the job that holds it, letting a duplicate trigger attach to
+that job instead of starting new work, and expires after a TTL in case the
+holding process dies without releasing it.
+"""
+import os
+import time
+from contextlib import closing
+
+import state_db
+
+ISSUE_LOCK_TTL_SECONDS = float(os.getenv("ISSUE_LOCK_TTL_SECONDS", "3600"))
+
+
+class IssueLocks:
+    """SQLite-backed locks keyed by issue."""
+
+    def __init__(self, path: str | None = None, ttl: float = ISSUE_LOCK_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        with closing(state_db.connect(self.path)) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS issue_locks (
+                    issue_key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    job_id TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+
+    def acquire(self, issue_key: str, kind: str, job_id: str) -> dict | None:
+        """Take the lock for ``job_id``.
+
+        Returns ``None`` on success, otherwise the live holder as
+        ``{"kind": ..., "job_id": ...}``.
+        """
+        now = time.time()
+        with closing(state_db.connect(self.path)) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT kind, job_id, expires_at FROM issue_locks WHERE issue_key = ?",
+                    (issue_key,),
+                ).fetchone()
+                if row and row["expires_at"] > now:
+                    conn.execute("COMMIT")
+                    return {"kind": row["kind"], "job_id": row["job_id"]}
+                conn.execute(
+                    "INSERT OR REPLACE INTO issue_locks VALUES (?, ?, ?, ?)",
+                    (issue_key, kind, job_id, now + self.ttl),
+                )
+                conn.execute("COMMIT")
+                return None
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def holders(self, issue_keys) -> dict[str, dict]:
+        """Live holders of the given issues' locks as ``{issue_key: {"kind", "job_id"}}``."""
+        issue_keys = list(issue_keys)
+        if not issue_keys:
+            return {}
+        placeholders = ",".join("?" * len(issue_keys))
+        with closing(state_db.connect(self.path)) as conn:
+            rows = conn.execute(
+                f"SELECT issue_key, kind, job_id FROM issue_locks "
+                f"WHERE issue_key IN ({placeholders}) AND expires_at > ?",
+                (*issue_keys, time.time()),
+            ).fetchall()
+        return {
+            row["issue_key"]: {"kind": row["kind"], "job_id": row["job_id"]}
+            for row in rows
+        }
+
+    def refresh(self, issue_key: str, job_id: str):
+        """Push the expiry of a held lock forward by another TTL."""
+        with closing(state_db.connect(self.path)) as conn:
+            conn.execute(
+                "UPDATE issue_locks SET expires_at = ? WHERE issue_key = ? AND job_id = ?",
+                (time.time() + self.ttl, issue_key, job_id),
+            )
+
+    def release(self, issue_key: str, job_id: str):
+        """Release the lock if ``job_id`` still holds it."""
+        with closing(state_db.connect(self.path)) as conn:
+            conn.execute(
+                "DELETE FROM issue_locks WHERE issue_key = ? AND job_id = ?",
+                (issue_key, job_id),
+            )
@@ -1,18 +1,25 @@
-from jira_writer import format_test_results
+from jira_writer import RESULT_REUSE_MAX_AGE_SECONDS, format_test_results
 from flask import Flask, request, jsonify
 from flask_cors import CORS
+import asyncio
+import functools
+import hashlib
+import hmac
 import logging
+import os
 import sys
-from jira_reader import get_user_story, connect_to_jira
-from nlp_parser import extract_test_steps
-from browser_use_runner_lib import run_browser_use_test_hybrid
-from subtask_manager import (
-    create_subtask_with_steps,
-    get_subtask_with_label,
-    add_label,
-    remove_label,
-    transition_subtask_to_done,
-)
+import time
+import uuid
+import async_jira
+from issue_cache import invalidate_issue, issue_cache_scope
+from issue_lock import IssueLocks
+from jira_outbox import get_outbox
+from job_queue import JobQueue, SqliteJobStore
+from jira_reader import get_user_story
+from results_store import get_results_store
+from webhook_events import SeenEvents
+from hybrid_runner import run_hybrid_test
+from subtask_manager import create_subtask_with_steps, get_subtask_with_label
 
 logging.basicConfig(
     level=logging.INFO,
@@ -27,25 +34,50 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
-# Runtime memory lock to avoid concurrent processing
-recent_issues = set()
+# Per-issue lock shared by every server process to avoid concurrent processing
+issue_locks = IssueLocks()
 
+# Background workers that run the long Jira/browser workflows
+jobs = JobQueue(store=SqliteJobStore())
 
-@app.route("/suggest-scenarios", methods=["POST"])
-def suggest_scenarios():
-    data = request.json
-    issue_key = data.get("issueKey")
-    if not issue_key:
-        return jsonify({"status": "error", "message": "issueKey required"}), 400
+# Jira webhook deliveries already handled, so retries don't start work twice
+seen_events = SeenEvents()
+JIRA_WEBHOOK_SECRET = os.getenv("JIRA_WEBHOOK_SECRET", "")
+# Without a secret deliveries are refused unless this is set explicitly (local testing)
+JIRA_WEBHOOK_ALLOW_UNAUTHENTICATED = (
+    os.getenv("JIRA_WEBHOOK_ALLOW_UNAUTHENTICATED", "false").lower() == "true"
+)
+if not JIRA_WEBHOOK_SECRET:
+    if JIRA_WEBHOOK_ALLOW_UNAUTHENTICATED:
+        logger.warning(
+            "⚠️ JIRA_WEBHOOK_SECRET is not set: /jira-webhook accepts unauthenticated "
+            "requests and anyone who can reach it can start test runs"
+        )
+    else:
+        logger.warning("⚠️ JIRA_WEBHOOK_SECRET is not set: /jira-webhook refuses all deliveries")
+# /trigger-batch skips cards whose workflow completed this recently
+TRIGGER_COOLDOWN_SECONDS = float(os.getenv("TRIGGER_COOLDOWN_SECONDS", "600"))
+
+
+def _track_progress(job):
+    """Progress callback that records scenario state and keeps the issue lock alive."""
+
+    def progress(name, state, **info):
+        job.scenario_progress(name, state, **info)
+        issue_locks.refresh(job.issue_key, job.id)
+
+    return progress
 
-    global recent_issues
-    if issue_key in recent_issues:
-        return jsonify({"status": "skipped", "message": "Already being processed"}), 200
 
-    recent_issues.add(issue_key)
+def _suggest_scenarios_job(job, data):
+    issue_key = job.issue_key
     try:
+        # Imported here so the web app loads without the OpenAI client
+        from nlp_parser import extract_test_steps
+
         story = get_user_story(issue_key)
-        scenarios = extract_test_steps(story)
+        # "refresh": true bypasses the LLM cache and regenerates the scenarios
+        scenarios = extract_test_steps(story, use_cache=not data.get("refresh"))
 
         seen = set()
         unique_scenarios = []
@@ -69,85 +101,47 @@ def suggest_scenarios():
             logger.info(
                 f"[JIRA] Subtask already exists for {issue_key}: {existing.key}"
             )
-            return jsonify({"status": "skipped", "subtask": existing.key})
-
-        add_label(issue_key, "scenarios-generated")
-        subtask_key = create_subtask_with_steps(issue_key, summary, desc)
+            return {"status": "skipped", "subtask": existing.key}
 
-        qa_user_id = "70121:2fb0d5c3-a6a9-445b-a741-f0a2caf987fe"
-        jira = connect_to_jira()
-        resp = jira._session.put(
-            f"{jira._options['server']}/rest/api/3/issue/{subtask_key}/assignee",
-            json={"accountId": qa_user_id},
+        subtask_key, _ = async_jira.run_concurrently(
+            asyncio.to_thread(create_subtask_with_steps, issue_key, summary, desc),
+            async_jira.update_labels(issue_key, add=["scenarios-generated"]),
         )
-        print(f"[JIRA] 👤 Assigned subtask {subtask_key} to QA user.")
-
-        mention = {
-            "type": "doc",
-            "version": 1,
-            "content": [
-                {
-                    "type": "paragraph",
-                    "content": [
-                        {
-                            "type": "mention",
-                            "attrs": {"id": qa_user_id, "text": "<@QA>"},
-                        },
-                        {
-                            "type": "text",
-                            "text": f" Suggested test scenarios have been created in {subtask_key}. Please review or edit before moving to QA.",
-                        },
-                    ],
-                }
-            ],
-        }
-        jira._session.post(
-            f"{jira._options['server']}/rest/api/3/issue/{issue_key}/comment",
-            json={"body": mention},
+        outbox = get_outbox()
+        outbox.assign(subtask_key)
+        outbox.mention(
+            issue_key,
+            f" Suggested test scenarios have been created in {subtask_key}. Please review or edit before moving to QA.",
         )
 
-        return jsonify(
-            {"status": "success", "subtask": subtask_key, "scenarios": len(scenarios)}
-        )
+        return {"status": "success", "subtask": subtask_key, "scenarios": len(scenarios)}
 
     except Exception as e:
         logger.error(f"Error in /suggest-scenarios: {str(e)}", exc_info=True)
-        return jsonify({"status": "error", "message": str(e)}), 500
+        raise
     finally:
-        recent_issues.discard(issue_key)
-
-
-@app.route("/run-tests", methods=["POST"])
-def run_tests():
-    data = request.json
-    issue_key = data.get("issueKey")
-    if not issue_key:
-        return jsonify({"status": "error", "message": "issueKey required"}), 400
+        issue_locks.release(issue_key, job.id)
 
-    global recent_issues
-    if issue_key in recent_issues:
-        return jsonify({"status": "skipped", "message": "Tests already running"}), 200
 
-    recent_issues.add(issue_key)
+def _run_tests_job(job, data):
+    issue_key = job.issue_key
     try:
         subtask = get_subtask_with_label(issue_key, "scenarios-generated")
         if not subtask:
-            return (
-                jsonify({"status": "skipped", "message": "No test subtask found."}),
-                200,
-            )
+            return {"status": "skipped", "message": "No test subtask found."}
         if subtask.fields.status.name.lower() == "done":
-            return (
-                jsonify(
-                    {
-                        "status": "skipped",
-                        "message": "Test subtask is already marked as Done.",
-                    }
-                ),
-                200,
-            )
-        add_label(issue_key, "testing-in-progress")
-        story = get_user_story(issue_key)
+            return {
+                "status": "skipped",
+                "message": "Test subtask is already marked as Done.",
+            }
+        # Mark the story as under test while its description is being read
+        _, story = async_jira.run_concurrently(
+            async_jira.update_labels(issue_key, add=["testing-in-progress"]),
+            asyncio.to_thread(get_user_story, issue_key),
+        )
+        # The read may have cached labels from before the add landed; drop them
+        # so later label decisions (here or on the outbox thread) refetch
+        invalidate_issue(issue_key)
         context = story["description"]
         subtask_description = subtask.fields.description
 
@@ -161,25 +155,238 @@ def run_tests():
             if step.strip()
         ]
 
+        # Known step sequences run on Playwright directly, the rest on the agent,
+        # whose steps are reported on the job as they are parsed
+        runner = functools.partial(
+            run_hybrid_test,
+            on_step=lambda name, step: job.scenario_step(name, step.step, step.status),
+        )
         format_test_results(
-            scenarios, run_browser_use_test_hybrid, subtask.key, issue_key
+            scenarios,
+            runner,
+            subtask.key,
+            issue_key,
+            progress=_track_progress(job),
+            # "force": true re-runs scenarios even if they are unchanged
+            reuse_max_age=0 if data.get("force") else RESULT_REUSE_MAX_AGE_SECONDS,
         )
-        
-        remove_label(issue_key, "testing-in-progress")
-        remove_label(issue_key, "scenarios-generated")
-        add_label(issue_key, "auto-tested")
-
-        transition_subtask_to_done(subtask.key)
 
-        return jsonify(
-            {"status": "completed", "subtask": subtask.key, "results": len(scenarios)}
-        )
+        outbox = get_outbox()
+        final_writes = [
+            outbox.update_labels(
+                issue_key,
+                add=["auto-tested"],
+                remove=["testing-in-progress", "scenarios-generated"],
+            ),
+            outbox.transition_done(subtask.key),
+        ]
+        # Hold the issue until the labels and transition land, so a re-trigger
+        # doesn't see "scenarios-generated" still set and test again
+        result = {"status": "completed", "subtask": subtask.key, "results": len(scenarios)}
+        if not outbox.wait(final_writes):
+            logger.warning(f"⚠️ Jira updates for {issue_key} are still pending; they will be retried")
+            result["jiraUpdatesPending"] = True
+        return result
 
     except Exception as e:
         logger.error(f"Error in /run-tests: {str(e)}", exc_info=True)
-        return jsonify({"status": "error", "message": str(e)}), 500
+        raise
     finally:
-        recent_issues.discard(issue_key)
+        issue_locks.release(issue_key, job.id)
+
+
+def _in_issue_cache_scope(job_fn, job, data):
+    # Each issue is read from Jira once per workflow
+    with issue_cache_scope():
+        return job_fn(job, data)
+
+
+def _start_job(kind: str, data: dict):
+    """Queue workflow ``kind`` for ``data["issueKey"]``; returns ``(body, status)``."""
+    job_fn, busy_message = WORKFLOWS[kind]
+    issue_key = data.get("issueKey")
+    if not issue_key:
+        return {"status": "error", "message": "issueKey required"}, 400
+
+    job_id = uuid.uuid4().hex
+    holder = issue_locks.acquire(issue_key, kind, job_id)
+    if holder:
+        if holder["kind"] == kind:
+            # Same work already in flight: attach to it instead of starting more
+            return (
+                {
+                    "status": "attached",
+                    "job": holder["job_id"],
+                    "issueKey": issue_key,
+                    "message": busy_message,
+                },
+                200,
+            )
+        return (
+            {
+                "status": "skipped",
+                "job": holder["job_id"],
+                "message": f"Issue is busy with {holder['kind']}",
+            },
+            200,
+        )
+
+    try:
+        job = jobs.submit(
+            kind,
+            issue_key,
+            functools.partial(_in_issue_cache_scope, job_fn, data=data),
+            job_id=job_id,
+        )
+    except Exception:
+        issue_locks.release(issue_key, job_id)
+        raise
+    logger.info(f"Queued {kind} job {job.id} for {issue_key}")
+    return {"status": "queued", "job": job.id, "issueKey": issue_key}, 202
+
+
+def _enqueue(kind: str):
+    body, status = _start_job(kind, request.json or {})
+    return jsonify(body), status
+
+
+WORKFLOWS = {
+    "suggest-scenarios": (_suggest_scenarios_job, "Already being processed"),
+    "run-tests": (_run_tests_job, "Tests already running"),
+}
+
+# Board column (status name, lowercased) that triggers each workflow
+STATUS_WORKFLOWS = {"in progress": "suggest-scenarios", "qa": "run-tests"}
+
+
+@app.route("/suggest-scenarios", methods=["POST"])
+def suggest_scenarios():
+    return _enqueue("suggest-scenarios")
+
+
+@app.route("/run-tests", methods=["POST"])
+def run_tests():
+    return _enqueue("run-tests")
+
+
+@app.route("/trigger-batch", methods=["POST"])
+def trigger_batch():
+    """Start the workflows for a whole board in one request.
+
+    Takes ``{"items": [{"issueKey", "status", "hasTestedLabel"}, ...]}`` and checks
+    running and recently completed work for every card with one lookup each
+    before queuing what is left.
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get("items", []) if isinstance(data, dict) else data
+
+    # One entry per issue; a card seen twice keeps its latest status
+    wanted = {}
+    for item in items:
+        if not isinstance(item, dict) or not item.get("issueKey"):
+            continue
+        kind = STATUS_WORKFLOWS.get(str(item.get("status", "")).strip().lower())
+        if kind:
+            wanted[item["issueKey"]] = (kind, item)
+
+    holders = issue_locks.holders(wanted)
+    recent = (
+        jobs.store.completed_since(wanted, time.time() - TRIGGER_COOLDOWN_SECONDS)
+        if jobs.store
+        else {}
+    )
+
+    results = []
+    for issue_key, (kind, item) in wanted.items():
+        if issue_key in holders:
+            holder = holders[issue_key]
+            status = "attached" if holder["kind"] == kind else "skipped"
+            results.append({"issueKey": issue_key, "status": status, "job": holder["job_id"]})
+        elif (issue_key, kind) in recent:
+            results.append(
+                {"issueKey": issue_key, "status": "recent", "job": recent[(issue_key, kind)]["id"]}
+            )
+        elif kind == "run-tests" and item.get("hasTestedLabel"):
+            results.append({"issueKey": issue_key, "status": "already-tested"})
+        else:
+            body, _ = _start_job(kind, {"issueKey": issue_key, "source": "batch"})
+            results.append(dict(body, issueKey=issue_key))
+
+    queued = sum(1 for r in results if r["status"] == "queued")
+    logger.info(f"Batch trigger: {len(items)} cards, {queued} jobs queued")
+    return jsonify({"queued": queued, "results": results})
+
+
+def _webhook_authorized() -> bool:
+    if not JIRA_WEBHOOK_SECRET:
+        return JIRA_WEBHOOK_ALLOW_UNAUTHENTICATED
+    signature = request.headers.get("X-Hub-Signature", "")
+    if signature:
+        expected = hmac.new(
+            JIRA_WEBHOOK_SECRET.encode(), request.get_data(), hashlib.sha256
+        ).hexdigest()
+        return hmac.compare_digest(signature, f"sha256={expected}")
+    # Webhooks registered without signing can carry the secret in the URL
+    return hmac.compare_digest(request.args.get("secret", ""), JIRA_WEBHOOK_SECRET)
+
+
+def _status_transition(event: dict) -> str | None:
+    """Return the new status (lowercased) if ``event`` moved an issue between columns."""
+    if event.get("webhookEvent") != "jira:issue_updated":
+        return None
+    for item in (event.get("changelog") or {}).get("items", []):
+        if item.get("field") == "status":
+            return (item.get("toString") or "").strip().lower()
+    return None
+
+
+@app.route("/jira-webhook", methods=["POST"])
+def jira_webhook():
+    if not JIRA_WEBHOOK_SECRET and not JIRA_WEBHOOK_ALLOW_UNAUTHENTICATED:
+        return jsonify({"status": "error", "message": "Webhook secret not configured"}), 503
+    if not _webhook_authorized():
+        return jsonify({"status": "error", "message": "Invalid webhook secret"}), 401
+
+    event = request.get_json(silent=True) or {}
+    issue = event.get("issue") or {}
+    issue_key = issue.get("key")
+    status = _status_transition(event)
+    kind = STATUS_WORKFLOWS.get(status)
+    if not issue_key or not kind:
+        return jsonify({"status": "ignored"}), 200
+    if ((issue.get("fields") or {}).get("issuetype") or {}).get("subtask"):
+        return jsonify({"status": "ignored", "message": "Sub-task transition"}), 200
+
+    event_id = request.headers.get("X-Atlassian-Webhook-Identifier") or (
+        f"{issue.get('id', issue_key)}:{event.get('timestamp')}:{status}"
+    )
+    if seen_events.seen(event_id):
+        return jsonify({"status": "duplicate", "issueKey": issue_key}), 200
+
+    logger.info(f"Webhook: {issue_key} moved to {status}, starting {kind}")
+    body, code = _start_job(kind, {"issueKey": issue_key, "source": "webhook"})
+    # Only remember the event once the job is queued, so a delivery that failed
+    # here is not dropped when Jira retries it
+    seen_events.first_seen(event_id)
+    return jsonify(body), code
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    snapshot = jobs.snapshot(job_id)
+    if not snapshot:
+        return jsonify({"status": "error", "message": "Unknown job"}), 404
+    return jsonify(snapshot)
+
+
+@app.route("/issues/<issue_key>/runs", methods=["GET"])
+def issue_runs(issue_key):
+    store = get_results_store()
+    limit = request.args.get("limit", 20, type=int)
+    runs = store.runs(issue_key, limit=limit)
+    for run in runs:
+        run["scenarios"] = store.run_results(run["id"])
+    return jsonify({"issueKey": issue_key, "runs": runs})
 
 
 @app.route("/health", methods=["GET"])
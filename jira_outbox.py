@@ -0,0 +1,332 @@
+"""Durable write-behind queue for Jira updates.
+
+Comments, mentions, assignments, label changes and transitions are recorded in
+the shared SQLite state database and applied by a background worker, so a test
+run finishes as soon as its browser work is done. Failed writes are retried
+with exponential backoff and survive restarts. Writes to the same issue are
+applied in the order they were queued, and consecutive label changes to an
+issue are merged into a single update. Different issues are written
+concurrently.
+
+Delivery is at-least-once: a worker that dies after Jira applied a write but
+before recording it leaves the write to be retried. Label changes, assignments
+and transitions are idempotent. Comments and mentions carry a marker (a
+comment property), and a write that may already have been applied is skipped
+when a comment with its marker exists. Callers that must not release an issue
+before its writes land use ``wait()``.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import closing
+
+import async_jira
+import state_db
+
+JIRA_OUTBOX_MAX_ATTEMPTS = int(os.getenv("JIRA_OUTBOX_MAX_ATTEMPTS", "10"))
+JIRA_OUTBOX_POLL_SECONDS = float(os.getenv("JIRA_OUTBOX_POLL_SECONDS", "5"))
+# A worker that claimed a write but died releases it after this long
+JIRA_OUTBOX_LEASE_SECONDS = 300
+# How long a workflow waits for its final Jira writes before releasing the issue
+JIRA_OUTBOX_WAIT_SECONDS = float(os.getenv("JIRA_OUTBOX_WAIT_SECONDS", "60"))
+
+
+def _apply(issue_key: str, op: str, payload: dict):
+    """Return the coroutine performing one queued write."""
+    if op == "comment":
+        return async_jira.add_comment(issue_key, payload["body"], marker=payload.get("marker"))
+    if op == "mention":
+        return async_jira.post_mention(
+            issue_key,
+            payload["text"],
+            payload.get("account_id") or async_jira.QA_ACCOUNT_ID,
+            marker=payload.get("marker"),
+        )
+    if op == "assign":
+        return async_jira.assign(
+            issue_key, payload.get("account_id") or async_jira.QA_ACCOUNT_ID
+        )
+    if op == "labels":
+        return async_jira.update_labels(
+            issue_key, add=payload.get("add", []), remove=payload.get("remove", [])
+        )
+    if op == "transition_done":
+        return async_jira.transition_to_done(issue_key)
+    raise ValueError(f"Unknown outbox operation: {op}")
+
+
+def merge_label_changes(changes: list[dict]) -> dict:
+    """Fold ordered ``{"add", "remove"}`` deltas into one equivalent delta."""
+    add, remove = [], []
+    for change in changes:
+        for label in change.get("add", []):
+            if label in remove:
+                remove.remove(label)
+            if label not in add:
+                add.append(label)
+        for label in change.get("remove", []):
+            if label in add:
+                add.remove(label)
+            if label not in remove:
+                remove.append(label)
+    return {"add": add, "remove": remove}
+
+
+def _batches(rows) -> list[tuple[list[int], str, dict]]:
+    """Group one issue's rows into ``(ids, op, payload)``, merging adjacent label rows."""
+    batches = []
+    for row in rows:
+        payload = json.loads(row["payload"])
+        if row["op"] == "labels" and batches and batches[-1][1] == "labels":
+            ids, _, previous = batches[-1]
+            ids.append(row["id"])
+            batches[-1] = (ids, "labels", merge_label_changes([previous, payload]))
+        else:
+            batches.append(([row["id"]], row["op"], payload))
+    return batches
+
+
+class JiraOutbox:
+    """SQLite-backed queue of Jira writes with a lazily started drain thread."""
+
+    def __init__(
+        self,
+        path: str | None = None,
+        max_attempts: int = JIRA_OUTBOX_MAX_ATTEMPTS,
+        poll_interval: float = JIRA_OUTBOX_POLL_SECONDS,
+        autostart: bool = True,
+    ):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.autostart = autostart
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._drain_lock = threading.Lock()
+        with closing(state_db.connect(self.path)) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jira_outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    issue_key TEXT NOT NULL,
+                    op TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    locked_until REAL NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS jira_outbox_pending "
+                "ON jira_outbox(state, issue_key, id)"
+            )
+
+    # -- producers ---------------------------------------------------------
+
+    def enqueue(self, issue_key: str, op: str, **payload) -> int:
+        """Queue ``op`` on ``issue_key`` and wake the worker; returns the row id."""
+        if not issue_key:
+            raise ValueError(f"Cannot queue '{op}' without an issue key")
+        now = time.time()
+        with closing(state_db.connect(self.path)) as conn:
+            cur = conn.execute(
+                "INSERT INTO jira_outbox (issue_key, op, payload, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (issue_key, op, json.dumps(payload, ensure_ascii=False), now, now),
+            )
+        if self.autostart:
+            self.start()
+            self._wakeup.set()
+        return cur.lastrowid
+
+    def comment(self, issue_key: str, body: str) -> int:
+        return self.enqueue(issue_key, "comment", body=body, marker=uuid.uuid4().hex)
+
+    def mention(self, issue_key: str, text: str, account_id: str | None = None) -> int:
+        return self.enqueue(
+            issue_key, "mention", text=text, account_id=account_id, marker=uuid.uuid4().hex
+        )
+
+    def assign(self, issue_key: str, account_id: str | None = None) -> int:
+        return self.enqueue(issue_key, "assign", account_id=account_id)
+
+    def update_labels(self, issue_key: str, add=(), remove=()) -> int:
+        return self.enqueue(issue_key, "labels", add=list(add), remove=list(remove))
+
+    def transition_done(self, issue_key: str) -> int:
+        return self.enqueue(issue_key, "transition_done")
+
+    # -- draining ----------------------------------------------------------
+
+    def _claim(self) -> dict[str, list]:
+        """Lease every due write whose issue has no earlier write still outstanding."""
+        now = time.time()
+        claimed, blocked = {}, set()
+        with closing(state_db.connect(self.path)) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT * FROM jira_outbox WHERE state = 'pending' ORDER BY id"
+                ).fetchall()
+                for row in rows:
+                    key = row["issue_key"]
+                    if key in blocked:
+                        continue
+                    if row["next_attempt_at"] > now or row["locked_until"] > now:
+                        blocked.add(key)  # keep per-issue order
+                        continue
+                    claimed.setdefault(key, []).append(row)
+                ids = [row["id"] for batch in claimed.values() for row in batch]
+                conn.executemany(
+                    "UPDATE jira_outbox SET locked_until = ? WHERE id = ?",
+                    [(now + JIRA_OUTBOX_LEASE_SECONDS, i) for i in ids],
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return claimed
+
+    def _succeeded(self, ids: list[int]):
+        with closing(state_db.connect(self.path)) as conn:
+            conn.executemany("DELETE FROM jira_outbox WHERE id = ?", [(i,) for i in ids])
+
+    def _failed(self, ids: list[int], error: Exception):
+        """Release ``ids`` for a retry with backoff, or park them once out of attempts."""
+        now = time.time()
+        with closing(state_db.connect(self.path)) as conn:
+            for i in ids:
+                row = conn.execute(
+                    "SELECT attempts FROM jira_outbox WHERE id = ?", (i,)
+                ).fetchone()
+                attempts = (row["attempts"] if row else 0) + 1
+                state = "dead" if attempts >= self.max_attempts else "pending"
+                delay = min(300.0, 2.0**attempts)
+                conn.execute(
+                    "UPDATE jira_outbox SET attempts = ?, state = ?, next_attempt_at = ?, "
+                    "locked_until = 0, last_error = ? WHERE id = ?",
+                    (attempts, state, now + delay, str(error), i),
+                )
+
+    async def _drain_issue(self, issue_key: str, rows: list) -> int:
+        done = 0
+        # Rows that failed or were leased before may already have reached Jira
+        retried = {
+            row["id"] for row in rows if row["attempts"] or row["locked_until"]
+        }
+        for ids, op, payload in _batches(rows):
+            try:
+                if (
+                    payload.get("marker")
+                    and retried.intersection(ids)
+                    and await async_jira.has_marked_comment(issue_key, payload["marker"])
+                ):
+                    print(f"[Outbox] ↩️ {op} on {issue_key} was already posted, skipping")
+                else:
+                    await _apply(issue_key, op, payload)
+            except Exception as e:
+                print(f"[Outbox] ⚠️ {op} on {issue_key} failed, will retry: {e}")
+                # Later writes to this issue wait for this one
+                self._failed(ids, e)
+                self._release([row["id"] for row in rows if row["id"] not in ids])
+                break
+            self._succeeded(ids)
+            done += len(ids)
+        return done
+
+    def _release(self, ids: list[int]):
+        with closing(state_db.connect(self.path)) as conn:
+            conn.executemany(
+                "UPDATE jira_outbox SET locked_until = 0 WHERE id = ?", [(i,) for i in ids]
+            )
+
+    def drain(self) -> int:
+        """Apply every due write once and return how many were applied."""
+        claimed = self._claim()
+        if not claimed:
+            return 0
+        counts = async_jira.run_concurrently(
+            *(self._drain_issue(key, rows) for key, rows in claimed.items())
+        )
+        return sum(counts)
+
+    def pending(self) -> int:
+        with closing(state_db.connect(self.path)) as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) AS n FROM jira_outbox WHERE state = 'pending'"
+            ).fetchone()
+        return row["n"]
+
+    def wait(self, ids, timeout: float = JIRA_OUTBOX_WAIT_SECONDS) -> bool:
+        """Block until the writes ``ids`` are applied; False if one is dead or still pending."""
+        ids = list(ids)
+        placeholders = ",".join("?" * len(ids))
+        deadline = time.monotonic() + timeout
+        if self.autostart:
+            self.start()
+        while True:
+            with closing(state_db.connect(self.path)) as conn:
+                rows = conn.execute(
+                    f"SELECT state FROM jira_outbox WHERE id IN ({placeholders})", ids
+                ).fetchall()
+            if not rows:
+                return True
+            if any(row["state"] == "dead" for row in rows) or time.monotonic() >= deadline:
+                return False
+            self._wakeup.set()
+            time.sleep(min(0.2, max(0.0, deadline - time.monotonic())))
+
+    def flush(self, timeout: float = 60) -> bool:
+        """Drain until nothing is pending; returns False if ``timeout`` ran out first."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._drain_lock:
+                self.drain()
+            if not self.pending():
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(min(1.0, max(0.0, deadline - time.monotonic())))
+
+    # -- worker ------------------------------------------------------------
+
+    def start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="jira-outbox", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            try:
+                with self._drain_lock:
+                    self.drain()
+            except Exception as e:
+                print(f"[Outbox] ❌ Drain failed: {e}")
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> JiraOutbox:
+    """Return the process-wide outbox, creating its table on first use."""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = JiraOutbox()
+            if _outbox.pending():
+                _outbox.start()  # resume writes left over by a previous run
+        return _outbox
@@ -0,0 +1,122 @@
+"""Process-wide pool of Jira clients.
+
+Building a ``JIRA`` object opens a new HTTP session, negotiates TLS and (by
+default) probes ``serverInfo``. The pool builds up to ``size`` clients once per
+process and keeps their connections alive. A client is checked out by one
+thread at a time (``requests.Session`` is not safe to share) and checked back in
+when the caller is done; a client that sat idle in the pool longer than the
+health check interval is probed before being handed out and rebuilt if the
+probe fails.
+"""
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from requests.adapters import HTTPAdapter
+except Exception:  # pragma: no cover - allow import without requests
+    HTTPAdapter = None
+
+
+def enable_keep_alive(session, maxsize: int):
+    """Mount an adapter on ``session`` that keeps up to ``maxsize`` connections open."""
+    if HTTPAdapter is None or session is None:
+        return
+    adapter = HTTPAdapter(pool_connections=maxsize, pool_maxsize=maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+class JiraClientPool:
+    """Thread-safe checkout/checkin pool of lazily built Jira clients."""
+
+    def __init__(
+        self,
+        factory,
+        size: int = 4,
+        health_check_interval: float = 300.0,
+        checkout_timeout: float | None = 60.0,
+    ):
+        self.factory = factory
+        self.size = max(1, size)
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+        # Idle clients as (client, generation, checked_in_at); LIFO keeps warm ones in use
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._generation = 0
+
+    def _is_healthy(self, client) -> bool:
+        try:
+            client.server_info()
+            return True
+        except Exception as e:
+            print(f"[JIRA] ⚠️ Pooled client failed health check: {e}")
+            return False
+
+    def _build(self):
+        try:
+            return self.factory(), self._generation
+        except BaseException:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _discard(self):
+        with self._lock:
+            self._created -= 1
+
+    def _acquire(self):
+        while True:
+            try:
+                client, generation, checked_in_at = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_build = self._created < self.size
+                    if can_build:
+                        self._created += 1
+                if can_build:
+                    return self._build()
+                try:
+                    client, generation, checked_in_at = self._idle.get(
+                        timeout=self.checkout_timeout
+                    )
+                except queue.Empty:
+                    raise TimeoutError(
+                        f"No Jira client free after {self.checkout_timeout}s "
+                        f"(pool size {self.size})"
+                    ) from None
+
+            if generation != self._generation:
+                self._discard()
+                continue
+            idle = time.monotonic() - checked_in_at
+            if idle > self.health_check_interval and not self._is_healthy(client):
+                self._discard()
+                continue
+            return client, generation
+
+    @contextmanager
+    def checkout(self):
+        """Yield a client for the caller's exclusive use and return it to the pool afterwards."""
+        client, generation = self._acquire()
+        try:
+            yield client
+        finally:
+            if generation == self._generation:
+                self._idle.put((client, generation, time.monotonic()))
+            else:
+                self._discard()
+
+    def reset(self):
+        """Drop every pooled client so the next checkout builds fresh ones."""
+        with self._lock:
+            self._generation += 1
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard()
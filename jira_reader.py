@@ -11,13 +11,21 @@ except Exception:  # pragma: no cover - allow import without python-dotenv
 import json
 from pathlib import Path
 
+from issue_cache import current_issue_cache, get_issue
+from jira_pool import JiraClientPool, enable_keep_alive
+
 # Load environment variables from .env
 env_path = Path(__file__).resolve().parent.parent / "ai-jira-ui-tester/.env"
 load_dotenv(dotenv_path=env_path, override=True)
 
 
-# Connect to Jira
-def connect_to_jira():
+JIRA_POOL_SIZE = int(os.getenv("JIRA_POOL_SIZE", "4"))
+JIRA_POOL_HEALTHCHECK_SECONDS = float(os.getenv("JIRA_POOL_HEALTHCHECK_SECONDS", "300"))
+# How long a caller waits for a free client when all of them are checked out
+JIRA_POOL_CHECKOUT_TIMEOUT_SECONDS = float(os.getenv("JIRA_POOL_CHECKOUT_TIMEOUT_SECONDS", "60"))
+
+
+def _build_jira_client():
     if JIRA is None:
         raise RuntimeError("JIRA package not installed")
 
@@ -26,10 +34,26 @@ def connect_to_jira():
     jira = JIRA(
         options=jira_options,
         basic_auth=(os.getenv("JIRA_EMAIL"), os.getenv("JIRA_API_TOKEN")),
+        get_server_info=False,
     )
+    enable_keep_alive(getattr(jira, "_session", None), JIRA_POOL_SIZE * 4)
     return jira
 
 
+_client_pool = JiraClientPool(
+    _build_jira_client,
+    size=JIRA_POOL_SIZE,
+    health_check_interval=JIRA_POOL_HEALTHCHECK_SECONDS,
+    checkout_timeout=JIRA_POOL_CHECKOUT_TIMEOUT_SECONDS,
+)
+
+
+# Connect to Jira: ``with connect_to_jira() as jira`` checks a pooled client out
+# for this thread and returns it (with its open connections) afterwards
+def connect_to_jira():
+    return _client_pool.checkout()
+
+
 # Extract first URL from story description
 def extract_url(description):
     for line in description.split("\n"):
@@ -50,34 +74,58 @@ def extract_steps(description):
     return steps
 
 
-# Get all stories in a specific Jira project/status (e.g., QA column)
-def get_stories_by_status(project_key, status_name):
-    jira = connect_to_jira()
+# Only the fields the workflow reads are requested when listing stories
+STORY_FIELDS = ("summary", "description", "labels", "status", "subtasks")
+SEARCH_PAGE_SIZE = int(os.getenv("JIRA_SEARCH_PAGE_SIZE", "100"))
+
+
+def _story_from_issue(issue):
+    return {
+        "key": issue.key,
+        "summary": issue.fields.summary,
+        "description": issue.fields.description,
+        "labels": issue.fields.labels,  # Include labels in returned data
+        "customfields": {
+            "url": extract_url(issue.fields.description),
+            "steps": extract_steps(issue.fields.description),
+        },
+    }
+
+
+# Stream all stories in a specific Jira project/status page by page
+def iter_stories_by_status(project_key, status_name, page_size=SEARCH_PAGE_SIZE):
     jql = (
         f'project = "{project_key}" AND status = "{status_name}" AND issuetype = Story'
     )
-    issues = jira.search_issues(jql, maxResults=20)
-    stories = []
-    for issue in issues:
-        stories.append(
-            {
-                "key": issue.key,
-                "summary": issue.fields.summary,
-                "description": issue.fields.description,
-                "labels": issue.fields.labels,  # Include labels in returned data
-                "customfields": {
-                    "url": extract_url(issue.fields.description),
-                    "steps": extract_steps(issue.fields.description),
-                },
-            }
-        )
-    return stories
+    start_at = 0
+    while True:
+        # The client goes back to the pool between pages, while the caller works
+        with connect_to_jira() as jira:
+            page = jira.search_issues(
+                jql, startAt=start_at, maxResults=page_size, fields=",".join(STORY_FIELDS)
+            )
+        # Seed the per-run cache so later helpers don't re-fetch these issues
+        cache = current_issue_cache()
+        for issue in page:
+            if cache is not None:
+                cache.put(issue, STORY_FIELDS)
+            yield _story_from_issue(issue)
+
+        start_at += len(page)
+        total = getattr(page, "total", None)
+        if not page or len(page) < page_size or (total is not None and start_at >= total):
+            break
+
+
+# Get all stories in a specific Jira project/status (e.g., QA column)
+def get_stories_by_status(project_key, status_name):
+    return list(iter_stories_by_status(project_key, status_name))
 
 
 # Get issue labels
 def get_issue_labels(issue_key):
-    jira = connect_to_jira()
-    issue = jira.issue(issue_key)
+    with connect_to_jira() as jira:
+        issue = get_issue(jira, issue_key, fields=("labels",))
     return issue.fields.labels
 
 
@@ -91,16 +139,6 @@ if __name__ == "__main__":
 
 
 def get_user_story(issue_key):
-    jira = connect_to_jira()
-    issue = jira.issue(issue_key)
-    story = {
-        "key": issue.key,
-        "summary": issue.fields.summary,
-        "description": issue.fields.description,
-        "labels": issue.fields.labels,  # Include labels in returned data
-        "customfields": {
-            "url": extract_url(issue.fields.description),
-            "steps": extract_steps(issue.fields.description),
-        },
-    }
-    return story
+    with connect_to_jira() as jira:
+        issue = get_issue(jira, issue_key, fields=STORY_FIELDS)
+    return _story_from_issue(issue)
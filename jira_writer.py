@@ -1,8 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from browser_use_runner_lib import run_browser_use_test_hybrid
-from jira_reader import connect_to_jira
+from jira_reader import connect_to_jira, extract_url
+from issue_cache import get_issue
+from jira_outbox import get_outbox
+from results_store import get_results_store, scenario_fingerprint
+import inspect
 import json
+import os
 import re
+import threading
+import time
+
+# Upper bound on browsers running at once across every story in this process
+MAX_PARALLEL_BROWSERS = int(os.getenv("MAX_PARALLEL_BROWSERS", "3"))
+# Safe on by default because every agent run captures only its own log records
+# (see ``browser_use_runner_lib._current_run``)
+PARALLEL_SCENARIOS = os.getenv("PARALLEL_SCENARIOS", "true").lower() == "true"
+# Unchanged scenarios that passed more recently than this are not re-run. Off by
+# default: the fingerprint doesn't cover the deployed build, so a reused verdict
+# can hide a regression shipped since
+RESULT_REUSE_MAX_AGE_SECONDS = float(os.getenv("RESULT_REUSE_MAX_AGE_SECONDS", "0"))
+# Wall-clock budget for all scenarios of one story (0 = unlimited)
+STORY_TIMEOUT_SECONDS = float(os.getenv("STORY_TIMEOUT_SECONDS", "1800"))
+_browser_slots = threading.BoundedSemaphore(MAX_PARALLEL_BROWSERS)
 
 
 def _extract_json_block(text: str):
@@ -23,8 +44,8 @@ def _extract_json_block(text: str):
 def get_subtask_status(subtask_key: str) -> str:
     """Get the current status of a subtask."""
     try:
-        jira = connect_to_jira()
-        issue = jira.issue(subtask_key)
+        with connect_to_jira() as jira:
+            issue = get_issue(jira, subtask_key, fields=("status",))
         return issue.fields.status.name
     except Exception as e:
         print(f"[JIRA] ❌ Error getting status for {subtask_key}: {e}")
@@ -32,10 +53,17 @@ def get_subtask_status(subtask_key: str) -> str:
 
 
 def has_previous_test_execution(subtask_key: str) -> bool:
-    """Check if the subtask has any previous test execution comments."""
+    """Check if the subtask has been tested before.
+
+    Runs are looked up in the local results store; the comments are only
+    downloaded for subtasks tested before the store existed.
+    """
     try:
-        jira = connect_to_jira()
-        issue = jira.issue(subtask_key, expand="comments")
+        if get_results_store().has_runs(subtask_key):
+            return True
+
+        with connect_to_jira() as jira:
+            issue = jira.issue(subtask_key, expand="comments")
 
         for comment in issue.fields.comment.comments:
             if "Automated Test Execution Report" in comment.body:
@@ -83,7 +111,6 @@ def should_execute_tests(subtask_key: str) -> tuple[bool, str]:
 def add_status_change_comment(subtask_key: str, reason: str):
     """Add a comment explaining why tests are being re-executed."""
     try:
-        jira = connect_to_jira()
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         comment = f"🔄 **Test Re-execution Triggered**\n"
@@ -92,8 +119,8 @@ def add_status_change_comment(subtask_key: str, reason: str):
         comment += f"**Current Status:** {get_subtask_status(subtask_key)}\n\n"
         comment += "Executing automated test scenarios...\n"
 
-        jira.add_comment(subtask_key, comment)
-        print(f"[JIRA] ✅ Status change comment added to {subtask_key}")
+        get_outbox().comment(subtask_key, comment)
+        print(f"[JIRA] ✅ Status change comment queued for {subtask_key}")
 
     except Exception as e:
         print(f"[JIRA] ❌ Failed to add status change comment: {e}")
@@ -104,42 +131,42 @@ def create_subtask_with_scenarios(parent_issue_key: str, scenarios: list[dict])
 
     Returns the new subtask key.
     """
-    jira = connect_to_jira()
-    parent_issue = jira.issue(parent_issue_key)
-    project_key = parent_issue.fields.project.key
+    with connect_to_jira() as jira:
+        parent_issue = get_issue(jira, parent_issue_key, fields=("project",))
+        project_key = parent_issue.fields.project.key
 
-    description = (
-        "Edit the JSON below to update the test scenarios before moving the parent issue to QA.\n\n"
-        "```json\n" + json.dumps(scenarios, indent=2) + "\n```"
-    )
-    # Determine the correct subtask issue type for this project
-    issue_type_id = None
-    try:
-        meta = jira.createmeta(projectKeys=project_key)
-        project_meta = meta.get("projects", [{}])[0]
-        for itype in project_meta.get("issuetypes", []):
-            if itype.get("subtask"):
-                issue_type_id = itype.get("id")
-                break
-    except Exception:
-        pass
-
-    issue_type = {"id": issue_type_id} if issue_type_id else {"name": "Subtask"}
-
-    subtask = jira.create_issue(
-        project={"key": project_key},
-        summary="Automated Test Scenarios",
-        description=description,
-        issuetype=issue_type,
-        parent={"key": parent_issue_key},
-    )
+        description = (
+            "Edit the JSON below to update the test scenarios before moving the parent issue to QA.\n\n"
+            "```json\n" + json.dumps(scenarios, indent=2) + "\n```"
+        )
+        # Determine the correct subtask issue type for this project
+        issue_type_id = None
+        try:
+            meta = jira.createmeta(projectKeys=project_key)
+            project_meta = meta.get("projects", [{}])[0]
+            for itype in project_meta.get("issuetypes", []):
+                if itype.get("subtask"):
+                    issue_type_id = itype.get("id")
+                    break
+        except Exception:
+            pass
+
+        issue_type = {"id": issue_type_id} if issue_type_id else {"name": "Subtask"}
+
+        subtask = jira.create_issue(
+            project={"key": project_key},
+            summary="Automated Test Scenarios",
+            description=description,
+            issuetype=issue_type,
+            parent={"key": parent_issue_key},
+        )
     return subtask.key
 
 
 def read_scenarios_from_subtask(subtask_key: str) -> list[dict]:
     """Return test scenarios stored in the subtask description."""
-    jira = connect_to_jira()
-    issue = jira.issue(subtask_key)
+    with connect_to_jira() as jira:
+        issue = get_issue(jira, subtask_key, fields=("description",))
     scenarios = _extract_json_block(issue.fields.description)
     if isinstance(scenarios, list):
         return scenarios
@@ -155,7 +182,6 @@ def post_results_to_jira(
         print("[Mock Mode] Skipping Jira comment post.")
         return
 
-    jira = connect_to_jira()
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     summary = f"Automated Test Report\n"
     summary += f"_Tested on: {timestamp}_\n"
@@ -224,22 +250,13 @@ def post_results_to_jira(
         else "\n⚠️ Overall: Some Tests Failed\n"
     )
 
-    try:
-        jira.add_comment(issue_key, summary)
-        print(f"[JIRA] ✅ Comment added to {issue_key}")
-
-        label_issue_key = parent_issue_key or issue_key
-        current_issue = jira.issue(label_issue_key)
-        labels = current_issue.fields.labels
-        if "testing-in-progress" in labels:
-            labels.remove("testing-in-progress")
-        if "auto-tested" not in labels:
-            labels.append("auto-tested")
-        current_issue.update(fields={"labels": labels})
-        print(f"[JIRA] 🏷️ Labels updated for {label_issue_key}")
-
-    except Exception as e:
-        print(f"[JIRA] ❌ Failed to update issue: {e}")
+    outbox = get_outbox()
+    outbox.comment(issue_key, summary)
+    label_issue_key = parent_issue_key or issue_key
+    outbox.update_labels(
+        label_issue_key, add=["auto-tested"], remove=["testing-in-progress"]
+    )
+    print(f"[JIRA] ✅ Results and label update queued for {issue_key}")
 
 
 def execute_tests_with_status_check(
@@ -297,32 +314,16 @@ def execute_tests_with_status_check(
 
     # Execute the tests
     try:
-        results = format_test_results(scenarios, runner, subtask_key, parent_issue_key)
-
-        # Move subtask to DONE after successful execution
-        try:
-            jira = connect_to_jira()
-            transitions = jira.transitions(subtask_key)
-            done_transition = None
-
-            for transition in transitions:
-                if transition["name"].upper() in [
-                    "DONE",
-                    "COMPLETE",
-                    "COMPLETED",
-                    "RESOLVED",
-                ]:
-                    done_transition = transition["id"]
-                    break
-
-            if done_transition:
-                jira.transition_issue(subtask_key, done_transition)
-                print(f"[JIRA] ✅ Subtask {subtask_key} moved to DONE")
-            else:
-                print(f"[JIRA] ⚠️ Could not find DONE transition for {subtask_key}")
+        results = format_test_results(
+            scenarios,
+            runner,
+            subtask_key,
+            parent_issue_key,
+            reuse_max_age=0 if force_execute else RESULT_REUSE_MAX_AGE_SECONDS,
+        )
 
-        except Exception as e:
-            print(f"[JIRA] ❌ Failed to move subtask to DONE: {e}")
+        # Move subtask to DONE once the report has been posted
+        get_outbox().transition_done(subtask_key)
 
         return {
             "executed": True,
@@ -345,168 +346,255 @@ def execute_tests_with_status_check(
         }
 
 
-def format_test_results(
-    scenarios: list[dict], runner, subtask_key: str, parent_issue_key: str
+def _accepts_deadline(runner) -> bool:
+    try:
+        return "deadline" in inspect.signature(runner).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def _execute_scenario(
+    runner, i: int, total: int, scenario_data: dict, progress=None, deadline=None
 ):
-    """Fixed version that correctly determines scenario success based on the ScenarioResult.success field"""
-    from jira_reader import connect_to_jira
-    import time
+    """Run one scenario and return ``(report_section, result_entry)``.
 
-    jira = connect_to_jira()
+    ``deadline`` (a ``time.monotonic()`` value) is the story's time budget: a
+    scenario still waiting for a browser slot when it passes is not started, and
+    runners accepting a ``deadline`` argument are cut off at it.
+    """
+    name = scenario_data["scenario"]
+    context = scenario_data["steps"]
 
-    # Build simplified results
-    all_results = []
-    overall_summary = f"Automated Test Execution Report\n"
-    overall_summary += (
-        f"_Executed on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}_\n\n"
-    )
+    print(f"[JIRA] Executing scenario {i}/{total}: {name}")
+    started = time.monotonic()
 
-    overall_passed = True
+    try:
+        # Run the test, holding one of the shared browser slots; don't wait for
+        # a slot past the story deadline
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        if not _browser_slots.acquire(timeout=timeout):
+            raise TimeoutError("Story time budget exhausted before the scenario started")
+        try:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError("Story time budget exhausted before the scenario started")
+            if progress:
+                progress(name, "running")
+            if deadline is not None and _accepts_deadline(runner):
+                result_obj = runner(context, name, deadline=deadline)
+            else:
+                result_obj = runner(context, name)
+        finally:
+            _browser_slots.release()
 
-    print(f"[JIRA] Starting test execution for {len(scenarios)} scenarios...")
+        # Debug information for troubleshooting
 
-    for i, scenario_data in enumerate(scenarios, 1):
-        name = scenario_data["scenario"]
-        context = scenario_data["steps"]
+        # Handle ScenarioResult object - FIXED LOGIC
+        if hasattr(result_obj, "results"):
+            scenario_results = result_obj.results
+            final_result = (
+                getattr(result_obj, "final_result", None) or "No result available"
+            )
+        else:
+            # Fallback if it's a different structure
+            scenario_results = result_obj if isinstance(result_obj, list) else []
+            final_result = "No result available"
+
+        # CRITICAL FIX: Check for task completion success in logs
+        # The logs show "✅ Task completed successfully" which should indicate success
+        scenario_passed = False
+
+        # Method 1: Check the success field if it exists
+        if hasattr(result_obj, "success"):
+            scenario_passed = result_obj.success
+
+        # Method 2: Check if final result indicates success
+        elif final_result and "successfully" in final_result.lower():
+            scenario_passed = True
+
+        # Method 3: Check if there's a "Task completion" step with "passed" status
+        elif scenario_results:
+            for step in scenario_results:
+                step_name = getattr(step, "step", "")
+                step_status = getattr(step, "status", "")
+                if "Task completion" in step_name and step_status == "passed":
+                    scenario_passed = True
+                    break
 
-        print(f"[JIRA] Executing scenario {i}/{len(scenarios)}: {name}")
+        # Method 4: Check logs for task completion indicators
+        # This is a fallback that could be implemented if we had access to logs
 
-        try:
-            # Run the test
-            result_obj = runner(context, name)
+        print(
+            f"[JIRA] ✅ Scenario {i} completed: {name} - {'PASSED' if scenario_passed else 'FAILED'}"
+        )
 
-            # Debug information for troubleshooting
+        # Build simplified result for this scenario (only name, final result, status)
+        status_emoji = "✅" if scenario_passed else "❌"
+        scenario_summary = f"**{name}**\n"
+        scenario_summary += (
+            f"Status: {status_emoji} {'PASSED' if scenario_passed else 'FAILED'}\n"
+        )
+        scenario_summary += f"Final Result: {final_result}\n\n"
+
+        # Only show failed steps if scenario failed
+        if not scenario_passed and scenario_results:
+            scenario_summary += "Failed Steps:\n"
+            for step in scenario_results:
+                if getattr(step, "status", "") != "passed":
+                    step_desc = getattr(step, "step", "Unnamed Step")
+                    error_msg = getattr(step, "error", "No error message")
+                    scenario_summary += f"- ❌ {step_desc}: {error_msg}\n"
+            scenario_summary += "\n"
+
+        if progress:
+            progress(name, "passed" if scenario_passed else "failed")
+
+        return scenario_summary, {
+            "scenario": name,
+            "passed": scenario_passed,
+            "result_obj": result_obj,
+            "duration": round(time.monotonic() - started, 2),
+        }
 
-            # Handle ScenarioResult object - FIXED LOGIC
-            if hasattr(result_obj, "results"):
-                scenario_results = result_obj.results
-                final_result = (
-                    getattr(result_obj, "final_result", None) or "No result available"
-                )
-            else:
-                # Fallback if it's a different structure
-                scenario_results = result_obj if isinstance(result_obj, list) else []
-                final_result = "No result available"
-
-            # CRITICAL FIX: Check for task completion success in logs
-            # The logs show "✅ Task completed successfully" which should indicate success
-            scenario_passed = False
-
-            # Method 1: Check the success field if it exists
-            if hasattr(result_obj, "success"):
-                scenario_passed = result_obj.success
-
-            # Method 2: Check if final result indicates success
-            elif final_result and "successfully" in final_result.lower():
-                scenario_passed = True
-
-            # Method 3: Check if there's a "Task completion" step with "passed" status
-            elif scenario_results:
-                for step in scenario_results:
-                    step_name = getattr(step, "step", "")
-                    step_status = getattr(step, "status", "")
-                    if "Task completion" in step_name and step_status == "passed":
-                        scenario_passed = True
-                        break
-
-            # Method 4: Check logs for task completion indicators
-            # This is a fallback that could be implemented if we had access to logs
-
-            print(
-                f"[JIRA] ✅ Scenario {i} completed: {name} - {'PASSED' if scenario_passed else 'FAILED'}"
-            )
+    except Exception as e:
+        print(f"[JIRA] ❌ Error executing scenario {i}: {str(e)}")
 
-            if not scenario_passed:
-                overall_passed = False
+        # Simplified error format
+        error_summary = f"**{name}**\n"
+        error_summary += f"Status: ❌ EXECUTION ERROR\n"
+        error_summary += f"Final Result: {str(e)}\n\n"
 
-            # Build simplified result for this scenario (only name, final result, status)
-            status_emoji = "✅" if scenario_passed else "❌"
-            scenario_summary = f"**{name}**\n"
-            scenario_summary += (
-                f"Status: {status_emoji} {'PASSED' if scenario_passed else 'FAILED'}\n"
-            )
-            scenario_summary += f"Final Result: {final_result}\n\n"
-
-            # Only show failed steps if scenario failed
-            if not scenario_passed and scenario_results:
-                scenario_summary += "Failed Steps:\n"
-                for step in scenario_results:
-                    if getattr(step, "status", "") != "passed":
-                        step_desc = getattr(step, "step", "Unnamed Step")
-                        error_msg = getattr(step, "error", "No error message")
-                        scenario_summary += f"- ❌ {step_desc}: {error_msg}\n"
-                scenario_summary += "\n"
-
-            # Add to overall summary
-            overall_summary += scenario_summary
-
-            all_results.append(
-                {"scenario": name, "passed": scenario_passed, "result_obj": result_obj}
-            )
+        if progress:
+            progress(name, "error", error=str(e))
 
-        except Exception as e:
-            print(f"[JIRA] ❌ Error executing scenario {i}: {str(e)}")
-            overall_passed = False
+        return error_summary, {
+            "scenario": name,
+            "passed": False,
+            "error": str(e),
+            "duration": round(time.monotonic() - started, 2),
+        }
 
-            # Simplified error format
-            error_summary = f"**{name}**\n"
-            error_summary += f"Status: ❌ EXECUTION ERROR\n"
-            error_summary += f"Final Result: {str(e)}\n\n"
 
-            overall_summary += error_summary
+def _fingerprint(scenario_data: dict) -> str:
+    steps = scenario_data["steps"]
+    url = extract_url(steps) if isinstance(steps, str) else scenario_data.get("url")
+    return scenario_fingerprint(scenario_data["scenario"], steps, url)
 
-            all_results.append({"scenario": name, "passed": False, "error": str(e)})
 
-    # Add final summary
-    overall_summary += "---\n"
-    overall_summary += f"**Summary:** {'✅ ALL TESTS PASSED' if overall_passed else '⚠️ SOME TESTS FAILED'}\n"
-    passed_count = sum(1 for r in all_results if r["passed"])
-    overall_summary += f"Total: {len(scenarios)} | Passed: {passed_count} | Failed: {len(scenarios) - passed_count}\n"
+def _reused_outcome(scenario_data: dict, prior: dict, progress=None):
+    """Report section and result entry for a scenario whose verdict is reused."""
+    name = scenario_data["scenario"]
+    tested_on = datetime.fromtimestamp(prior["executed_at"]).strftime("%Y-%m-%d %H:%M")
+    print(f"[JIRA] ♻️ Reusing result of unchanged scenario: {name}")
+    if progress:
+        progress(name, "passed", reused=True)
 
-    # Post the simplified comment to the subtask
-    try:
-        print(f"[JIRA] Posting simplified results to subtask {subtask_key}...")
-        jira.add_comment(subtask_key, overall_summary)
-        print(f"[JIRA] ✅ Simplified results posted to {subtask_key}")
+    scenario_summary = f"**{name}**\n"
+    scenario_summary += f"Status: ✅ PASSED (unchanged, reused from {tested_on})\n"
+    scenario_summary += f"Final Result: {prior['final_result'] or 'No result available'}\n\n"
+    return scenario_summary, {
+        "scenario": name,
+        "passed": True,
+        "final_result": prior["final_result"],
+        "reused": True,
+    }
 
-        # Brief delay to ensure comment is posted
-        time.sleep(1)
 
-    except Exception as e:
-        print(f"[JIRA] ❌ Failed to post results to subtask: {str(e)}")
+def format_test_results(
+    scenarios: list[dict],
+    runner,
+    subtask_key: str,
+    parent_issue_key: str,
+    parallel: bool = PARALLEL_SCENARIOS,
+    progress=None,
+    reuse_max_age: float = 0,
+    story_budget: float = STORY_TIMEOUT_SECONDS,
+):
+    """Fixed version that correctly determines scenario success based on the ScenarioResult.success field
+
+    With ``parallel`` the scenarios run concurrently, bounded by the process-wide
+    ``MAX_PARALLEL_BROWSERS`` limit; the report keeps the original scenario order.
+    ``progress(name, state, **info)`` is called as each scenario starts and ends.
+    With ``reuse_max_age`` a scenario whose fingerprint (text, context and URL)
+    passed on this subtask within that many seconds is reported, not re-run.
+    All scenarios together must finish within ``story_budget`` seconds.
+    """
+    # Build simplified results
+    overall_summary = f"Automated Test Execution Report\n"
+    overall_summary += (
+        f"_Executed on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}_\n\n"
+    )
+
+    print(f"[JIRA] Starting test execution for {len(scenarios)} scenarios...")
+
+    started_at = time.time()
+    deadline = time.monotonic() + story_budget if story_budget > 0 else None
+    total = len(scenarios)
+    if progress:
+        for scenario_data in scenarios:
+            progress(scenario_data["scenario"], "queued")
+
+    fingerprints = [_fingerprint(scenario_data) for scenario_data in scenarios]
+    outcomes = [None] * total
+    if reuse_max_age > 0:
+        store = get_results_store()
+        for idx, (scenario_data, fingerprint) in enumerate(zip(scenarios, fingerprints)):
+            prior = store.reusable_result(subtask_key, fingerprint, reuse_max_age)
+            if prior:
+                outcomes[idx] = _reused_outcome(scenario_data, prior, progress)
+    pending = [
+        (i, scenario_data)
+        for i, scenario_data in enumerate(scenarios, 1)
+        if outcomes[i - 1] is None
+    ]
+
+    if parallel and len(pending) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(pending), MAX_PARALLEL_BROWSERS)) as pool:
+            executed = list(
+                pool.map(
+                    lambda item: _execute_scenario(
+                        runner, item[0], total, item[1], progress, deadline
+                    ),
+                    pending,
+                )
+            )
+    else:
+        executed = [
+            _execute_scenario(runner, i, total, scenario_data, progress, deadline)
+            for i, scenario_data in pending
+        ]
+    for (i, _), outcome in zip(pending, executed):
+        outcomes[i - 1] = outcome
+
+    all_results = []
+    for (scenario_summary, result), fingerprint in zip(outcomes, fingerprints):
+        overall_summary += scenario_summary
+        result["fingerprint"] = fingerprint
+        all_results.append(result)
+    overall_passed = all(r["passed"] for r in all_results)
 
-    # Mention QA user on parent issue
     try:
-        qa_user_id = "70121:2fb0d5c3-a6a9-445b-a741-f0a2caf987fe"
-        passed_count = sum(1 for r in all_results if r["passed"])
-        mention = {
-            "type": "doc",
-            "version": 1,
-            "content": [
-                {
-                    "type": "paragraph",
-                    "content": [
-                        {
-                            "type": "mention",
-                            "attrs": {"id": qa_user_id, "text": "<@QA>"},
-                        },
-                        {
-                            "type": "text",
-                            "text": f" All test scenarios for {subtask_key} have been executed. "
-                            f"Results: {passed_count}/{len(scenarios)} passed. Please review the detailed results in the subtask.",
-                        },
-                    ],
-                }
-            ],
-        }
-        jira._session.post(
-            f"{jira._options['server']}/rest/api/3/issue/{parent_issue_key}/comment",
-            json={"body": mention},
+        get_results_store().record_run(
+            subtask_key, all_results, parent_issue_key, started_at=started_at
         )
-        print(f"[JIRA] ✅ QA mention posted to parent issue {parent_issue_key}")
-
     except Exception as e:
-        print(f"[JIRA] ⚠️ Failed to mention QA user: {str(e)}")
+        print(f"[JIRA] ⚠️ Failed to record results locally: {e}")
+
+    # Add final summary
+    overall_summary += "---\n"
+    overall_summary += f"**Summary:** {'✅ ALL TESTS PASSED' if overall_passed else '⚠️ SOME TESTS FAILED'}\n"
+    passed_count = sum(1 for r in all_results if r["passed"])
+    overall_summary += f"Total: {len(scenarios)} | Passed: {passed_count} | Failed: {len(scenarios) - passed_count}\n"
+
+    # Jira writes are applied in the background so the run ends with the browsers
+    outbox = get_outbox()
+    outbox.comment(subtask_key, overall_summary)
+    if parent_issue_key:
+        outbox.mention(
+            parent_issue_key,
+            f" All test scenarios for {subtask_key} have been executed. "
+            f"Results: {passed_count}/{len(scenarios)} passed. Please review the detailed results in the subtask.",
+        )
+    print(f"[JIRA] 📮 Results for {subtask_key} queued for posting")
 
     return all_results
 
@@ -516,6 +604,7 @@ def check_and_execute_multiple_subtasks(
     subtask_keys: list[str],
     parent_issue_keys: list[str] = None,
     runner=run_browser_use_test_hybrid,
+    max_parallel_stories: int = 1,
 ) -> list[dict]:
     """
     Check and execute tests for multiple subtasks.
@@ -524,6 +613,8 @@ def check_and_execute_multiple_subtasks(
         subtask_keys: List of subtask keys to check
         parent_issue_keys: List of parent issue keys (same length as subtask_keys)
         runner: Test runner function
+        max_parallel_stories: How many subtasks to process at once; browsers
+            stay bounded by ``MAX_PARALLEL_BROWSERS`` regardless
 
     Returns:
         List of execution results for each subtask
@@ -531,28 +622,27 @@ def check_and_execute_multiple_subtasks(
     if parent_issue_keys and len(subtask_keys) != len(parent_issue_keys):
         raise ValueError("subtask_keys and parent_issue_keys must have the same length")
 
-    results = []
-
-    for i, subtask_key in enumerate(subtask_keys):
+    def process(i: int, subtask_key: str) -> dict:
         parent_key = parent_issue_keys[i] if parent_issue_keys else None
 
         print(f"\n[JIRA] Processing subtask {i+1}/{len(subtask_keys)}: {subtask_key}")
 
         try:
-            result = execute_tests_with_status_check(
+            return execute_tests_with_status_check(
                 subtask_key=subtask_key, parent_issue_key=parent_key, runner=runner
             )
-            results.append(result)
 
         except Exception as e:
             print(f"[JIRA] ❌ Failed to process subtask {subtask_key}: {e}")
-            results.append(
-                {
-                    "executed": False,
-                    "reason": f"Processing failed: {str(e)}",
-                    "subtask_key": subtask_key,
-                    "error": str(e),
-                }
-            )
+            return {
+                "executed": False,
+                "reason": f"Processing failed: {str(e)}",
+                "subtask_key": subtask_key,
+                "error": str(e),
+            }
+
+    if max_parallel_stories > 1 and len(subtask_keys) > 1:
+        with ThreadPoolExecutor(max_workers=max_parallel_stories) as pool:
+            return list(pool.map(process, range(len(subtask_keys)), subtask_keys))
 
-    return results
+    return [process(i, key) for i, key in enumerate(subtask_keys)]
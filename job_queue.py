@@ -0,0 +1,287 @@
+"""In-process job queue used by the backend to run long workflows off the request thread."""
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+import state_db
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_HISTORY_LIMIT = int(os.getenv("JOB_HISTORY_LIMIT", "500"))
+# Job changes within this window are written to the store as one snapshot
+JOB_PERSIST_INTERVAL_SECONDS = float(os.getenv("JOB_PERSIST_INTERVAL_SECONDS", "0.5"))
+
+
+@dataclass
+class Job:
+    """State, per-scenario progress and timings of one queued workflow."""
+
+    kind: str
+    issue_key: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    state: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    scenarios: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    listener: Optional[Callable[["Job"], None]] = field(
+        default=None, repr=False, compare=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def changed(self):
+        """Notify the owning queue that the job's state changed."""
+        if self.listener:
+            self.listener(self)
+
+    def scenario_progress(self, name: str, state: str, **info):
+        """Record that scenario ``name`` moved to ``state``."""
+        with self._lock:
+            entry = self.scenarios.setdefault(name, {"state": "queued"})
+            now = time.time()
+            if state == "running":
+                entry["started_at"] = now
+            elif state != "queued":
+                entry["finished_at"] = now
+                if entry.get("started_at"):
+                    entry["duration"] = round(now - entry["started_at"], 2)
+            entry["state"] = state
+            entry.update(info)
+        self.changed()
+
+    def scenario_step(self, name: str, step: str, status: str):
+        """Record a step reported live while scenario ``name`` is running."""
+        with self._lock:
+            entry = self.scenarios.setdefault(name, {"state": "running"})
+            entry["steps"] = entry.get("steps", 0) + 1
+            entry["last_step"] = {"step": step, "status": status}
+        self.changed()
+
+    def _scenarios_copy(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: dict(entry) for name, entry in self.scenarios.items()}
+
+    @property
+    def done(self) -> bool:
+        return self.state in ("completed", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serialisable snapshot."""
+        data = {
+            "id": self.id,
+            "kind": self.kind,
+            "issueKey": self.issue_key,
+            "state": self.state,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "scenarios": self._scenarios_copy(),
+            "result": self.result,
+            "error": self.error,
+        }
+        if self.started_at:
+            data["queued_seconds"] = round(self.started_at - self.created_at, 2)
+            data["run_seconds"] = round(
+                (self.finished_at or time.time()) - self.started_at, 2
+            )
+        return data
+
+
+class SqliteJobStore:
+    """Persists job snapshots so any server process can answer ``/jobs/<id>``."""
+
+    def __init__(self, path: str | None = None, history_limit: int = JOB_HISTORY_LIMIT):
+        self.path = path
+        self.history_limit = history_limit
+        with closing(state_db.connect(self.path)) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    issue_key TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_updated ON jobs(updated_at)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_issue ON jobs(issue_key, updated_at)"
+            )
+
+    def save(self, job: Job):
+        with closing(state_db.connect(self.path)) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?)",
+                (job.id, job.issue_key, json.dumps(job.to_dict()), time.time()),
+            )
+            if job.done:
+                conn.execute(
+                    "DELETE FROM jobs WHERE id NOT IN "
+                    "(SELECT id FROM jobs ORDER BY updated_at DESC LIMIT ?)",
+                    (self.history_limit,),
+                )
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with closing(state_db.connect(self.path)) as conn:
+            row = conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def completed_since(self, issue_keys, since: float) -> Dict[tuple, Dict[str, Any]]:
+        """Latest job completed after ``since`` per ``(issue_key, kind)`` for ``issue_keys``."""
+        issue_keys = list(issue_keys)
+        if not issue_keys:
+            return {}
+        placeholders = ",".join("?" * len(issue_keys))
+        with closing(state_db.connect(self.path)) as conn:
+            rows = conn.execute(
+                f"SELECT data FROM jobs WHERE issue_key IN ({placeholders}) "
+                "AND updated_at >= ? ORDER BY updated_at",
+                (*issue_keys, since),
+            ).fetchall()
+        completed = {}
+        for row in rows:
+            job = json.loads(row["data"])
+            if job["state"] == "completed":
+                completed[(job["issueKey"], job["kind"])] = job
+        return completed
+
+
+class JobQueue:
+    """FIFO queue drained by a fixed pool of daemon worker threads.
+
+    Workers start lazily on the first submit so the queue is safe to create at
+    import time under gunicorn's pre-fork model. Snapshots are written to the
+    store by a writer thread, so progress reported from the agent loop (one
+    event per parsed step) never blocks on SQLite; changes to a job within
+    ``persist_interval`` are coalesced into one write.
+    """
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        history_limit: int = JOB_HISTORY_LIMIT,
+        store: Optional[SqliteJobStore] = None,
+        persist_interval: float = JOB_PERSIST_INTERVAL_SECONDS,
+    ):
+        self.workers = max(1, workers)
+        self.history_limit = history_limit
+        self.store = store
+        self.persist_interval = persist_interval
+        self._queue = queue.Queue()
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._threads = []
+        self._dirty: Dict[str, Job] = {}
+        self._writing = False
+        self._persisted = threading.Condition()
+        self._writer = None
+
+    def submit(
+        self,
+        kind: str,
+        issue_key: str,
+        fn: Callable[[Job], Dict[str, Any]],
+        job_id: Optional[str] = None,
+    ) -> Job:
+        """Queue ``fn(job)`` and return the job immediately."""
+        job = Job(kind=kind, issue_key=issue_key, listener=self._persist)
+        if job_id:
+            job.id = job_id
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+            self._ensure_workers()
+        job.changed()
+        self._queue.put((job, fn))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def snapshot(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job as a dict, falling back to the shared store for jobs of other processes."""
+        job = self.get(job_id)
+        if job:
+            return job.to_dict()
+        return self.store.load(job_id) if self.store else None
+
+    def _persist(self, job: Job):
+        if not self.store:
+            return
+        with self._persisted:
+            self._dirty[job.id] = job
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._write_loop, name="jirai-job-writer", daemon=True
+                )
+                self._writer.start()
+            self._persisted.notify_all()
+
+    def _write_loop(self):
+        while True:
+            with self._persisted:
+                while not self._dirty:
+                    self._persisted.wait()
+            # Let a burst of step updates collapse into one snapshot per job
+            time.sleep(self.persist_interval)
+            with self._persisted:
+                batch, self._dirty = self._dirty, {}
+                self._writing = True
+            try:
+                for job in batch.values():
+                    try:
+                        self.store.save(job)
+                    except Exception as e:
+                        print(f"[JOBS] ⚠️ Could not persist job {job.id}: {e}")
+            finally:
+                with self._persisted:
+                    self._writing = False
+                    self._persisted.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every job change so far is in the store; False on timeout."""
+        with self._persisted:
+            return self._persisted.wait_for(
+                lambda: not self._dirty and not self._writing, timeout=timeout
+            )
+
+    def _ensure_workers(self):
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.workers:
+            t = threading.Thread(target=self._work, name="jirai-job-worker", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j.done]
+        excess = len(self._jobs) - self.history_limit
+        for job in sorted(finished, key=lambda j: j.finished_at or 0)[: max(0, excess)]:
+            del self._jobs[job.id]
+
+    def _work(self):
+        while True:
+            job, fn = self._queue.get()
+            job.state = "running"
+            job.started_at = time.time()
+            job.changed()
+            try:
+                job.result = fn(job)
+                job.state = "completed"
+            except Exception as e:
+                job.error = str(e)
+                job.state = "failed"
+            finally:
+                job.finished_at = time.time()
+                job.changed()
+                self._queue.task_done()
@@ -0,0 +1,83 @@
+"""Persistent, content-addressed cache for LLM responses.
+
+Entries are keyed by a hash of everything that determines the completion
+(model, prompts, temperature), so an unchanged story returns the stored answer
+instead of calling the API again. Entries expire after a TTL and the least
+recently used ones are evicted once the cache grows past its size limit.
+"""
+import hashlib
+import json
+import os
+import time
+from contextlib import closing
+
+import state_db
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+
+
+def cache_key(model: str, system_prompt: str, user_prompt: str, temperature: float) -> str:
+    """Return the content hash identifying one completion request."""
+    payload = json.dumps(
+        [model, system_prompt, user_prompt, temperature], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed cache of JSON-serialisable LLM results."""
+
+    def __init__(
+        self,
+        path: str | None = None,
+        ttl: float = LLM_CACHE_TTL_SECONDS,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        with closing(state_db.connect(self.path)) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache(last_used)"
+            )
+
+    def get(self, key: str):
+        """Return the cached value for ``key`` or ``None`` if missing or expired."""
+        now = time.time()
+        with closing(state_db.connect(self.path)) as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            if now - row["created_at"] > self.ttl:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+        return json.loads(row["value"])
+
+    def put(self, key: str, value):
+        """Store ``value`` and evict the least recently used entries beyond the limit."""
+        now = time.time()
+        with closing(state_db.connect(self.path)) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key NOT IN "
+                "(SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,),
+            )
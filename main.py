@@ -1,23 +1,34 @@
-from jira_reader import get_stories_by_status
+from issue_cache import issue_cache_scope
+from jira_reader import iter_stories_by_status
 from nlp_parser import extract_test_steps
 from executor import run_test_steps
+from jira_outbox import get_outbox
 from jira_writer import post_results_to_jira
+from playwright_session import SessionPool
 
 if __name__ == "__main__":
-    # Replace with your actual Jira project key
-    stories = get_stories_by_status(project_key="JAI", status_name="QA")
+    # Replace with your actual Jira project key; stories stream in pages and
+    # stay cached for the rest of the sweep. Browsers are launched once and
+    # every flow runs in its own context (EXECUTOR_WORKERS flows at a time).
+    with issue_cache_scope(), SessionPool() as sessions:
+        stories = iter_stories_by_status(project_key="JAI", status_name="QA")
+        for story in stories:
+            print(f"\nProcessing {story['key']} — {story['summary']}")
+            steps = extract_test_steps(story)
+            flows = steps.get(
+                "flows", []
+            )  # Assuming "flows" is part of the extracted steps
 
-    for story in stories:
-        print(f"\nProcessing {story['key']} — {story['summary']}")
-        steps = extract_test_steps(story)
-        flows = steps.get(
-            "flows", []
-        )  # Assuming "flows" is part of the extracted steps
+            runs = []
+            for flow in flows:
+                scenario = flow.get("scenario", "Unnamed scenario")
+                runs.append(
+                    (scenario, sessions.submit(run_test_steps, flow.get("steps", []), scenario=scenario))
+                )
+            scenario_results = [(scenario, run.result()) for scenario, run in runs]
 
-        scenario_results = []
-        for flow in flows:
-            scenario = flow.get("scenario", "Unnamed scenario")
-            results = run_test_steps(flow.get("steps", []), scenario=scenario)
-            scenario_results.append((scenario, results))
+            post_results_to_jira(story["key"], scenario_results)
 
-        post_results_to_jira(story["key"], scenario_results)
+    # Results are posted in the background; wait for them before exiting
+    if not get_outbox().flush(timeout=120):
+        print("[Outbox] ⚠️ Some Jira updates are still pending and will be retried on the next run")
@@ -7,9 +7,29 @@ from openai import OpenAI
 
 from pathlib import Path
 
+from llm_cache import LLM_CACHE_ENABLED, LLMCache, cache_key
+from rate_limiter import call_with_rate_limit, estimate_tokens
+
 env_path = Path(__file__).resolve().parent.parent / "ai-jira-ui-tester/.env"
 load_dotenv(dotenv_path=env_path, override=True)
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Retries (rate limits and transient failures) are handled by the shared rate
+# limiter rather than the client, so 429s pause every caller
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+
+MODEL = "gpt-4"
+TEMPERATURE = 0.2
+# Expected completion size, reserved against the tokens-per-minute budget
+RESPONSE_TOKENS = 1500
+
+_cache = None
+
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = LLMCache()
+    return _cache
+
 
 SYSTEM_PROMPT = """
 You're a QA automation specialist working with browser-use. 
@@ -30,7 +50,12 @@ Focus on creating comprehensive test coverage that validates the feature works a
 """
 
 
-def extract_test_steps(story):
+def extract_test_steps(story, use_cache: bool = True):
+    """Ask the LLM for test scenarios for ``story``.
+
+    Identical prompts are answered from the local LLM cache unless ``use_cache``
+    is False (or the cache is disabled), in which case the answer is refreshed.
+    """
     USER_PROMPT = f"""
 Story:
 {story['description']}
@@ -38,14 +63,27 @@ Story:
 If the story doesn't describe test flows clearly, invent 2–3 possible flows that match the feature described.
 """
 
+    key = cache_key(MODEL, SYSTEM_PROMPT, USER_PROMPT, TEMPERATURE)
+    if use_cache and LLM_CACHE_ENABLED:
+        try:
+            cached = _get_cache().get(key)
+            if cached:
+                print(f"[LLM] ♻️ Using cached scenarios for {story.get('key', 'story')}")
+                return cached
+        except Exception as e:
+            print(f"[LLM] ⚠️ Cache lookup failed: {e}")
+
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": USER_PROMPT},
+    ]
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": USER_PROMPT},
-            ],
-            temperature=0.2,
+        response = call_with_rate_limit(
+            client.chat.completions.create,
+            model=MODEL,
+            messages=messages,
+            temperature=TEMPERATURE,
+            tokens=estimate_tokens(messages, RESPONSE_TOKENS),
         )
         content = response.choices[0].message.content
 
@@ -55,12 +93,23 @@ If the story doesn't describe test flows clearly, invent 2–3 possible flows th
         if match:
             json_data = match.group(0)
             try:
-                return json.loads(json_data)
+                scenarios = json.loads(json_data)
             except json.JSONDecodeError:
-                return ast.literal_eval(json_data)
+                scenarios = ast.literal_eval(json_data)
+            _store(key, scenarios)
+            return scenarios
 
         raise ValueError("No valid JSON array found in GPT response")
 
     except Exception as e:
         print(f"Error parsing test steps: {e}")
         return []
+
+
+def _store(key, scenarios):
+    if not (scenarios and LLM_CACHE_ENABLED):
+        return
+    try:
+        _get_cache().put(key, scenarios)
+    except Exception as e:
+        print(f"[LLM] ⚠️ Could not cache scenarios: {e}")
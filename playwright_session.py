@@ -0,0 +1,158 @@
+"""Long-lived Playwright browsers for the deterministic executor.
+
+Launching Chromium costs more than most deterministic scenarios, so a
+``PlaywrightSession`` starts Playwright and one browser once and gives every
+scenario its own ``new_context()`` (separate cookies and storage). Playwright's
+sync API only works on the thread that started it, so a session belongs to one
+thread; ``SessionPool`` runs scenarios in parallel on worker threads that each
+own a session for the pool's lifetime. ``get_session_pool()`` is the
+process-wide pool long-running servers share.
+"""
+import atexit
+import concurrent.futures
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+try:
+    from playwright.sync_api import sync_playwright
+except Exception:  # pragma: no cover - allow import without playwright
+    sync_playwright = None
+
+# Worker threads (each with its own browser) used to run scenarios in parallel
+EXECUTOR_WORKERS = int(os.getenv("EXECUTOR_WORKERS", "1"))
+EXECUTOR_HEADLESS = os.getenv("EXECUTOR_HEADLESS", "true").lower() == "true"
+VIEWPORT = {"width": 1280, "height": 720}
+
+
+class PlaywrightSession:
+    """One Playwright instance and browser, handing out a fresh context per scenario."""
+
+    def __init__(self, headless: bool = EXECUTOR_HEADLESS):
+        self.headless = headless
+        self._playwright = None
+        self._browser = None
+        self._thread = None
+
+    def _check_thread(self):
+        if self._thread is None:
+            self._thread = threading.get_ident()
+        elif self._thread != threading.get_ident():
+            raise RuntimeError("PlaywrightSession used from a thread other than its own")
+
+    def _ensure_browser(self):
+        if self._playwright is None:
+            if sync_playwright is None:
+                raise RuntimeError("playwright package not installed")
+            self._playwright = sync_playwright().start()
+        if self._browser is None or not self._browser.is_connected():
+            # First use, or the browser crashed: launch a replacement
+            self._browser = self._playwright.chromium.launch(headless=self.headless)
+        return self._browser
+
+    @contextmanager
+    def page(self):
+        """Page in a new, isolated browser context that is closed afterwards."""
+        self._check_thread()
+        context = self._ensure_browser().new_context(
+            viewport=VIEWPORT, device_scale_factor=1
+        )
+        try:
+            yield context.new_page()
+        finally:
+            try:
+                context.close()
+            except Exception as e:
+                print(f"[Playwright] ⚠️ Error closing browser context: {e}")
+
+    def close(self):
+        self._check_thread()
+        try:
+            if self._browser is not None:
+                self._browser.close()
+        finally:
+            if self._playwright is not None:
+                self._playwright.stop()
+            self._browser = self._playwright = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+@contextmanager
+def scenario_page(session: PlaywrightSession | None = None):
+    """Page from ``session``, or from a session started just for this scenario."""
+    if session is not None:
+        with session.page() as page:
+            yield page
+        return
+    with PlaywrightSession() as own_session, own_session.page() as page:
+        yield page
+
+
+class SessionPool:
+    """Worker threads that each own a ``PlaywrightSession``.
+
+    ``submit(fn, *args)`` calls ``fn(*args, session=...)`` on a free worker and
+    returns a future. Use as a context manager, or call ``close()`` so every
+    worker closes its browser.
+    """
+
+    def __init__(self, workers: int = EXECUTOR_WORKERS):
+        self.workers = max(1, workers)
+        self._jobs = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"playwright-session-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _work(self):
+        with PlaywrightSession() as session:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    return
+                future, fn, args, kwargs = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(fn(*args, session=session, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+
+    def submit(self, fn, *args, **kwargs) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        self._jobs.put((future, fn, args, kwargs))
+        return future
+
+    def close(self):
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_session_pool() -> SessionPool:
+    """Return the process-wide pool (started on first use, closed at exit)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SessionPool()
+            atexit.register(_pool.close)
+        return _pool
@@ -0,0 +1,196 @@
+"""Token-bucket scheduler shared by every OpenAI call in the process.
+
+Both the scenario generator (``nlp_parser``) and the browser-use agent's
+``ChatOpenAI`` draw from the same request and token budgets, so concurrent
+scenarios queue up behind the quota instead of all hitting 429s and backing off
+at once. When a rate limit is hit anyway, the server's ``Retry-After`` pauses
+every caller; otherwise retries use jittered exponential backoff.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+
+OPENAI_REQUESTS_PER_MINUTE = float(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "60"))
+OPENAI_TOKENS_PER_MINUTE = float(os.getenv("OPENAI_TOKENS_PER_MINUTE", "150000"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+# Tokens reserved per agent LLM call, whose prompt size isn't known up front
+OPENAI_AGENT_CALL_TOKENS = int(os.getenv("OPENAI_AGENT_CALL_TOKENS", "6000"))
+
+try:
+    from langchain_core.rate_limiters import BaseRateLimiter
+except Exception:  # pragma: no cover - allow import without langchain-core
+    BaseRateLimiter = None
+
+
+class TokenBucket:
+    """Bucket refilled continuously at ``per_minute / 60`` units per second."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = max(1.0, per_minute)
+        self.rate = self.capacity / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take ``amount`` (possibly into debt) and return how long to wait for it."""
+        self.available = min(
+            self.capacity, self.available + (now - self.updated) * self.rate
+        )
+        self.updated = now
+        self.available -= min(amount, self.capacity)
+        return 0.0 if self.available >= 0 else -self.available / self.rate
+
+
+class RateLimiter:
+    """Thread-safe request/token limiter usable from sync and async code."""
+
+    def __init__(
+        self,
+        requests_per_minute: float = OPENAI_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = OPENAI_TOKENS_PER_MINUTE,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Reserve one request and ``tokens`` tokens; return the seconds to wait first."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(
+                self.requests.reserve(1, now),
+                self.tokens.reserve(tokens, now) if tokens else 0.0,
+            )
+            return max(wait, self._paused_until - now)
+
+    def acquire(self, tokens: int = 0):
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self, tokens: int = 0):
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        """Hold back every caller for ``seconds`` (e.g. after a 429 with Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    return (
+        type(error).__name__ == "RateLimitError"
+        or getattr(error, "status_code", None) == 429
+    )
+
+
+# Failures the OpenAI SDK would retry itself: dropped connections, timeouts, 5xx
+_TRANSIENT_ERRORS = {"APIConnectionError", "APITimeoutError", "InternalServerError"}
+
+
+def is_transient_error(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    return type(error).__name__ in _TRANSIENT_ERRORS or (
+        isinstance(status, int) and status >= 500
+    )
+
+
+def retry_delay(
+    error: Exception, attempt: int, base: float = 1.0, cap: float = 60.0
+) -> float:
+    """Seconds to wait before retry ``attempt`` (0-based) after ``error``.
+
+    Honors ``Retry-After``/``retry-after-ms`` response headers, falling back to
+    full-jitter exponential backoff.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def estimate_tokens(messages: list[dict], max_tokens: int = 0) -> int:
+    """Rough token estimate (~4 characters per token) for a chat request."""
+    chars = sum(len(str(m.get("content", ""))) for m in messages)
+    return chars // 4 + max_tokens
+
+
+def call_with_rate_limit(
+    fn,
+    *args,
+    tokens: int = 0,
+    limiter: "RateLimiter | None" = None,
+    max_retries: int = OPENAI_MAX_RETRIES,
+    **kwargs,
+):
+    """Call ``fn`` within the shared budget, retrying rate-limit and transient errors.
+
+    A rate limit pauses every caller; a transient failure (connection error,
+    timeout, 5xx) only backs off this call.
+    """
+    limiter = limiter or openai_limiter
+    for attempt in range(max_retries + 1):
+        limiter.acquire(tokens)
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            rate_limited = is_rate_limit_error(e)
+            if not (rate_limited or is_transient_error(e)) or attempt == max_retries:
+                raise
+            delay = retry_delay(e, attempt)
+            if rate_limited:
+                limiter.pause(delay)
+                print(
+                    f"[OpenAI] ⏳ Rate limited, retrying in {delay:.1f}s "
+                    f"({attempt + 1}/{max_retries})"
+                )
+            else:
+                print(
+                    f"[OpenAI] ⚠️ {type(e).__name__}, retrying in {delay:.1f}s "
+                    f"({attempt + 1}/{max_retries})"
+                )
+                time.sleep(delay)
+
+
+openai_limiter = RateLimiter()
+
+
+if BaseRateLimiter is not None:
+
+    class LangChainRateLimiter(BaseRateLimiter):
+        """Adapter letting ``ChatOpenAI(rate_limiter=...)`` draw from ``openai_limiter``."""
+
+        def __init__(
+            self, limiter: RateLimiter, tokens_per_call: int = OPENAI_AGENT_CALL_TOKENS
+        ):
+            self.limiter = limiter
+            self.tokens_per_call = tokens_per_call
+
+        # Reservations can't be undone, so every acquire waits for its slot
+        def acquire(self, *, blocking: bool = True) -> bool:
+            self.limiter.acquire(self.tokens_per_call)
+            return True
+
+        async def aacquire(self, *, blocking: bool = True) -> bool:
+            await self.limiter.aacquire(self.tokens_per_call)
+            return True
+
+else:
+    LangChainRateLimiter = None
+
+
+def langchain_rate_limiter():
+    """Return a limiter for ``ChatOpenAI`` sharing the process budget, if supported."""
+    if LangChainRateLimiter is None:
+        return None
+    return LangChainRateLimiter(openai_limiter)
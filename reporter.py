@@ -1,5 +1,5 @@
-from dataclasses import dataclass, asdict
-from typing import Any, Dict, Optional
+from dataclasses import dataclass, asdict, field
+from typing import Any, Dict, List, Optional
 
 
 @dataclass
@@ -9,6 +9,8 @@ class TestStepResult:
     step: Dict[str, Any]
     status: str
     error: Optional[str] = None
+    # How long each of the step's waits took: {"wait": description, "seconds": float}
+    waits: List[Dict[str, Any]] = field(default_factory=list)
 
     def to_dict(self) -> Dict[str, Any]:
         """Return a plain dictionary representation."""
@@ -0,0 +1,268 @@
+"""Local history of test runs, scenarios and steps.
+
+Every ``format_test_results`` run is recorded in the shared SQLite state
+database, indexed by issue key and scenario name, so "has this subtask been
+tested before" and "how did this scenario do last time" are local lookups
+instead of downloading and searching the Jira comments. Scenario results also
+carry a fingerprint of what was tested, so an unchanged scenario's recent
+verdict can be reused instead of running it again, and the actions of a
+successful agent run are kept per fingerprint so it can be replayed.
+"""
+import hashlib
+import json
+import threading
+import time
+from contextlib import closing
+
+import state_db
+
+
+def scenario_fingerprint(scenario: str, steps, url: str | None = None) -> str:
+    """Hash of the scenario text, its story context/steps and the target URL."""
+    if not isinstance(steps, str):
+        steps = json.dumps(steps, sort_keys=True, ensure_ascii=False)
+    payload = json.dumps([scenario.strip(), steps.strip(), url or ""], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _step_rows(result_obj) -> list[tuple[str, str, str | None]]:
+    steps = getattr(result_obj, "results", None) or []
+    return [
+        (
+            str(getattr(step, "step", "")),
+            str(getattr(step, "status", "")),
+            getattr(step, "error", None),
+        )
+        for step in steps
+    ]
+
+
+class ResultsStore:
+    """SQLite tables ``runs``, ``scenario_results`` and ``step_results``."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        with closing(state_db.connect(self.path)) as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    issue_key TEXT NOT NULL,
+                    parent_issue_key TEXT,
+                    started_at REAL NOT NULL,
+                    finished_at REAL NOT NULL,
+                    total INTEGER NOT NULL,
+                    passed_count INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS runs_issue ON runs(issue_key, started_at);
+
+                CREATE TABLE IF NOT EXISTS scenario_results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+                    issue_key TEXT NOT NULL,
+                    scenario TEXT NOT NULL,
+                    passed INTEGER NOT NULL,
+                    final_result TEXT,
+                    error TEXT,
+                    duration REAL,
+                    executed_at REAL NOT NULL,
+                    fingerprint TEXT,
+                    reused INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS scenario_results_issue
+                    ON scenario_results(issue_key, scenario, executed_at);
+                CREATE INDEX IF NOT EXISTS scenario_results_scenario
+                    ON scenario_results(scenario, executed_at);
+                CREATE INDEX IF NOT EXISTS scenario_results_fingerprint
+                    ON scenario_results(issue_key, fingerprint, executed_at);
+
+                CREATE TABLE IF NOT EXISTS step_results (
+                    scenario_result_id INTEGER NOT NULL
+                        REFERENCES scenario_results(id) ON DELETE CASCADE,
+                    position INTEGER NOT NULL,
+                    step TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    PRIMARY KEY (scenario_result_id, position)
+                );
+
+                CREATE TABLE IF NOT EXISTS scenario_traces (
+                    fingerprint TEXT PRIMARY KEY,
+                    scenario TEXT NOT NULL,
+                    trace TEXT NOT NULL,
+                    recorded_at REAL NOT NULL
+                );
+                """
+            )
+
+    def record_run(
+        self,
+        issue_key: str,
+        results: list[dict],
+        parent_issue_key: str | None = None,
+        started_at: float | None = None,
+    ) -> int:
+        """Store one execution of ``issue_key``'s scenarios and return the run id.
+
+        ``results`` are the entries built by ``format_test_results``: ``scenario``,
+        ``passed`` and optionally ``result_obj``, ``final_result``, ``error``,
+        ``duration``, ``fingerprint`` and ``reused``.
+        """
+        now = time.time()
+        with closing(state_db.connect(self.path)) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                run_id = conn.execute(
+                    "INSERT INTO runs (issue_key, parent_issue_key, started_at, "
+                    "finished_at, total, passed_count) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        issue_key,
+                        parent_issue_key,
+                        started_at or now,
+                        now,
+                        len(results),
+                        sum(1 for r in results if r.get("passed")),
+                    ),
+                ).lastrowid
+                for r in results:
+                    result_obj = r.get("result_obj")
+                    scenario_id = conn.execute(
+                        "INSERT INTO scenario_results (run_id, issue_key, scenario, "
+                        "passed, final_result, error, duration, executed_at, "
+                        "fingerprint, reused) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            run_id,
+                            issue_key,
+                            r["scenario"],
+                            int(bool(r.get("passed"))),
+                            getattr(result_obj, "final_result", None)
+                            or r.get("final_result"),
+                            r.get("error"),
+                            r.get("duration"),
+                            now,
+                            r.get("fingerprint"),
+                            int(bool(r.get("reused"))),
+                        ),
+                    ).lastrowid
+                    conn.executemany(
+                        "INSERT INTO step_results VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (scenario_id, position, step, status, error)
+                            for position, (step, status, error) in enumerate(
+                                _step_rows(result_obj)
+                            )
+                        ],
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return run_id
+
+    def has_runs(self, issue_key: str) -> bool:
+        with closing(state_db.connect(self.path)) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM runs WHERE issue_key = ? LIMIT 1", (issue_key,)
+            ).fetchone()
+        return row is not None
+
+    def runs(self, issue_key: str, limit: int = 20) -> list[dict]:
+        """Most recent runs of ``issue_key``, newest first."""
+        with closing(state_db.connect(self.path)) as conn:
+            rows = conn.execute(
+                "SELECT * FROM runs WHERE issue_key = ? ORDER BY started_at DESC, id DESC LIMIT ?",
+                (issue_key, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def scenario_history(
+        self, scenario: str, issue_key: str | None = None, limit: int = 20
+    ) -> list[dict]:
+        """Most recent results of ``scenario`` (optionally only on ``issue_key``), newest first."""
+        query = "SELECT * FROM scenario_results WHERE scenario = ?"
+        params = [scenario]
+        if issue_key:
+            query += " AND issue_key = ?"
+            params.append(issue_key)
+        query += " ORDER BY executed_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        with closing(state_db.connect(self.path)) as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [
+            dict(row, passed=bool(row["passed"]), reused=bool(row["reused"]))
+            for row in rows
+        ]
+
+    def reusable_result(
+        self, issue_key: str, fingerprint: str, max_age: float
+    ) -> dict | None:
+        """Latest executed result of ``fingerprint`` on ``issue_key`` if it passed
+        within the last ``max_age`` seconds.
+
+        Only real executions count (not verdicts that were themselves reused), and
+        failures are never reused since the application may have been fixed.
+        """
+        with closing(state_db.connect(self.path)) as conn:
+            row = conn.execute(
+                "SELECT * FROM scenario_results WHERE issue_key = ? AND fingerprint = ? "
+                "AND reused = 0 ORDER BY executed_at DESC, id DESC LIMIT 1",
+                (issue_key, fingerprint),
+            ).fetchone()
+        if row is None or not row["passed"] or time.time() - row["executed_at"] > max_age:
+            return None
+        return dict(row, passed=True)
+
+    def save_trace(self, fingerprint: str, scenario: str, trace: list[dict]):
+        """Keep the replayable actions of the latest successful agent run of ``fingerprint``."""
+        with closing(state_db.connect(self.path)) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scenario_traces VALUES (?, ?, ?, ?)",
+                (fingerprint, scenario, json.dumps(trace, ensure_ascii=False), time.time()),
+            )
+
+    def trace(self, fingerprint: str) -> list[dict] | None:
+        with closing(state_db.connect(self.path)) as conn:
+            row = conn.execute(
+                "SELECT trace FROM scenario_traces WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+        return json.loads(row["trace"]) if row else None
+
+    def drop_trace(self, fingerprint: str):
+        with closing(state_db.connect(self.path)) as conn:
+            conn.execute("DELETE FROM scenario_traces WHERE fingerprint = ?", (fingerprint,))
+
+    def run_results(self, run_id: int) -> list[dict]:
+        """Scenario results of one run, each with its ordered ``steps``."""
+        with closing(state_db.connect(self.path)) as conn:
+            scenarios = conn.execute(
+                "SELECT * FROM scenario_results WHERE run_id = ? ORDER BY id", (run_id,)
+            ).fetchall()
+            results = []
+            for row in scenarios:
+                steps = conn.execute(
+                    "SELECT step, status, error FROM step_results "
+                    "WHERE scenario_result_id = ? ORDER BY position",
+                    (row["id"],),
+                ).fetchall()
+                results.append(
+                    dict(
+                        row,
+                        passed=bool(row["passed"]),
+                        reused=bool(row["reused"]),
+                        steps=[dict(s) for s in steps],
+                    )
+                )
+        return results
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_results_store() -> ResultsStore:
+    """Return the process-wide results store, creating its tables on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultsStore()
+        return _store
@@ -0,0 +1,19 @@
+"""Shared SQLite database for state that every server process must see."""
+import os
+import sqlite3
+from pathlib import Path
+
+STATE_DB_PATH = os.getenv(
+    "JIRAI_STATE_DB", str(Path(__file__).resolve().parent / "jirai_state.db")
+)
+
+
+def connect(path: str | None = None) -> sqlite3.Connection:
+    """Open a connection in autocommit mode; use ``BEGIN IMMEDIATE`` for atomic updates."""
+    conn = sqlite3.connect(path or STATE_DB_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    # SQLite leaves foreign keys (and their ON DELETE actions) off per connection
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
@@ -1,11 +1,12 @@
+from issue_cache import get_issue, invalidate_issue, peek_issue
 from jira_reader import connect_to_jira
 
 
 def create_subtask_with_steps(
     parent_key: str, summary: str, description: str, label: str = "scenarios-generated"
 ):
-    jira = connect_to_jira()
-    parent = jira.issue(parent_key)
+    with connect_to_jira() as jira:
+        parent = get_issue(jira, parent_key, fields=("project",))
     project_key = parent.fields.project.key
 
     # ✅ Hardcoded Subtask ID
@@ -20,50 +21,84 @@ def create_subtask_with_steps(
         "labels": [label],
     }
 
-    new_issue = jira.create_issue(fields=issue_dict)
+    with connect_to_jira() as jira:
+        new_issue = jira.create_issue(fields=issue_dict)
     print(f"[JIRA] ✅ Created subtask {new_issue.key} under {parent_key}")
     return new_issue.key
 
 
 def get_subtask_with_label(parent_key: str, label: str):
-    jira = connect_to_jira()
     jql = (
         f"parent = {parent_key} "
         f"AND issuetype in subTaskIssueTypes() "
         f'AND labels = "{label}" '
         f'AND summary ~ "Suggested Test Scenarios"'
     )
-    issues = jira.search_issues(jql)
+    with connect_to_jira() as jira:
+        issues = jira.search_issues(jql)
     return issues[0] if issues else None
 
 
+def update_labels(issue_key: str, add=(), remove=()) -> bool:
+    """Add and remove labels on ``issue_key`` in a single request.
+
+    Uses Jira's ``update.labels`` add/remove operations, so the server applies
+    the delta atomically and no read-modify-write of the label list is needed.
+    Removals are always sent: the cached snapshot may predate a label added
+    elsewhere, and removing a missing label is a no-op in Jira. The snapshot
+    only skips adds of labels already present; returns False when nothing is left.
+    """
+    add = [label for label in add if label not in remove]
+    remove = list(remove)
+
+    snapshot = peek_issue(issue_key, fields=("labels",))
+    if snapshot is not None:
+        current = snapshot.fields.labels or []
+        add = [label for label in add if label not in current]
+    if not add and not remove:
+        return False
+
+    operations = [{"add": label} for label in add] + [
+        {"remove": label} for label in remove
+    ]
+    try:
+        with connect_to_jira() as jira:
+            resp = jira._session.put(
+                f"{jira._options['server']}/rest/api/3/issue/{issue_key}",
+                json={"update": {"labels": operations}},
+            )
+        resp.raise_for_status()
+    except Exception:
+        invalidate_issue(issue_key)
+        raise
+
+    if snapshot is not None:
+        labels = [label for label in snapshot.fields.labels or [] if label not in remove]
+        snapshot.fields.labels = labels + add
+    if add:
+        print(f"[JIRA] 🏷️ Added labels {add} to {issue_key}")
+    if remove:
+        print(f"[JIRA] 🧹 Removed labels {remove} from {issue_key}")
+    return True
+
+
 def add_label(issue_key: str, label: str):
-    jira = connect_to_jira()
-    issue = jira.issue(issue_key)
-    labels = issue.fields.labels or []
-    if label not in labels:
-        labels.append(label)
-        issue.update(fields={"labels": labels})
-        print(f"[JIRA] 🏷️ Added label '{label}' to {issue_key}")
+    update_labels(issue_key, add=[label])
 
 
 def remove_label(issue_key: str, label: str):
-    jira = connect_to_jira()
-    issue = jira.issue(issue_key)
-    labels = issue.fields.labels or []
-    if label in labels:
-        labels.remove(label)
-        issue.update(fields={"labels": labels})
-        print(f"[JIRA] 🧹 Removed label '{label}' from {issue_key}")
+    update_labels(issue_key, remove=[label])
 
 
 def transition_subtask_to_done(issue_key: str):
-    jira = connect_to_jira()
-    transitions = jira.transitions(issue_key)
-    for t in transitions:
-        if "done" in t["name"].lower():
-            jira.transition_issue(issue_key, t["id"])
-            print(f"[JIRA] ✅ Transitioned {issue_key} to Done")
-            return True
+    with connect_to_jira() as jira:
+        transitions = jira.transitions(issue_key)
+        for t in transitions:
+            name = t["name"].lower()
+            if "done" in name or name in ("complete", "completed", "resolved"):
+                jira.transition_issue(issue_key, t["id"])
+                invalidate_issue(issue_key)
+                print(f"[JIRA] ✅ Transitioned {issue_key} to Done")
+                return True
     print(f"[JIRA] ⚠️ No 'Done' transition found for {issue_key}")
     return False
@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import MagicMock
+
+import action_registry
+from action_registry import ActionRegistry
+
+
+class TestActionRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = ActionRegistry.from_file(action_registry.EXECUTOR_ACTIONS_CONFIG)
+        self.page = MagicMock()
+        self.page.url = "https://www.saucedemo.com/inventory.html"
+
+    def test_aliases_share_handler(self):
+        timings = self.registry.run(self.page, "click_cart_icon", {})
+        self.page.click.assert_called_once_with(".shopping_cart_link")
+        self.page.wait_for_selector.assert_called_once_with(
+            ".cart_list", state="visible", timeout=10000
+        )
+        self.assertEqual(timings[0]["wait"], "selector cart_page visible")
+        self.page.wait_for_timeout.assert_not_called()
+
+    def test_login_uses_site_selectors(self):
+        self.registry.run(self.page, "login", {"username": "u", "password": "p"})
+        self.page.fill.assert_any_call("#user-name", "u")
+        self.page.fill.assert_any_call("#password", "p")
+        self.page.click.assert_called_once_with("#login-button")
+
+    def test_unknown_site_falls_back_to_default_selectors(self):
+        self.page.url = "https://shop.example.com/"
+        self.registry.run(self.page, "login", {"username": "u", "password": "p"})
+        self.page.fill.assert_any_call("input[type='password']", "p")
+        # no post-login selector for this site, so the navigation away is awaited
+        self.page.wait_for_load_state.assert_not_called()
+        predicate = self.page.wait_for_url.call_args.args[0]
+        self.assertEqual(self.page.wait_for_url.call_args.kwargs, {"timeout": 10000})
+        self.assertFalse(predicate("https://shop.example.com/"))
+        self.assertTrue(predicate("https://shop.example.com/account"))
+
+    def test_goto_picks_site_from_target_url(self):
+        site = self.registry.site_for("https://www.saucedemo.com/")
+        self.assertEqual(site.get("cart_link"), ".shopping_cart_link")
+        self.registry.run(self.page, "go_to", {"url": "https://www.saucedemo.com/"})
+        self.page.goto.assert_called_once_with(
+            "https://www.saucedemo.com/", wait_until="load"
+        )
+
+    def test_item_selector_and_fallback(self):
+        self.registry.run(self.page, "add_to_cart", {"item_name": "Sauce Labs Backpack"})
+        self.page.click.assert_called_once_with("#add-to-cart-sauce-labs-backpack")
+        self.registry.run(self.page, "add_to_cart", {"item_name": ""})
+        self.page.locator.assert_called_once_with("button:has-text('Add to cart')")
+        with self.assertRaises(ValueError):
+            self.registry.run(self.page, "remove_from_cart", {"item_name": "Onesie"})
+
+    def test_verify_cart_asserts_items(self):
+        self.page.locator.return_value.all_text_contents.return_value = [
+            "Sauce Labs Backpack"
+        ]
+        context = {"expected_items": ["backpack"], "min_items": 1}
+        self.registry.run(self.page, "verify_cart", context)
+        context["expected_items"] = ["bike light"]
+        with self.assertRaises(AssertionError):
+            self.registry.run(self.page, "verify_items", context)
+
+    def test_unknown_action_and_handler_rejected(self):
+        with self.assertRaises(ValueError):
+            self.registry.run(self.page, "teleport", {})
+        with self.assertRaises(ValueError):
+            ActionRegistry({"actions": {"x": {"handler": "nope"}}})
+        with self.assertRaises(ValueError):
+            ActionRegistry({"actions": {"x": {"handler": "click", "waits": [{"for": "nap"}]}}})
+
+
+if __name__ == "__main__":
+    unittest.main()
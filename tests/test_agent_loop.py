@@ -0,0 +1,44 @@
+import asyncio
+import threading
+import unittest
+
+from agent_loop import BackgroundLoop
+
+
+class TestBackgroundLoop(unittest.TestCase):
+    def test_submissions_share_one_loop_thread(self):
+        bg = BackgroundLoop(name="test-loop")
+        started = threading.Event()
+
+        async def on_start():
+            started.set()
+
+        async def whoami():
+            await asyncio.sleep(0)
+            return threading.current_thread().name, asyncio.get_running_loop()
+
+        bg.on_start(on_start)
+        try:
+            first = bg.submit(whoami()).result(timeout=2)
+            second = bg.submit(whoami()).result(timeout=2)
+            self.assertEqual(first[0], "test-loop")
+            self.assertIs(first[1], second[1])
+            self.assertTrue(started.wait(2))
+        finally:
+            bg.stop()
+
+    def test_stop_runs_shutdown_hooks(self):
+        bg = BackgroundLoop(name="test-loop")
+        closed = []
+
+        async def on_stop():
+            closed.append(True)
+
+        bg.on_stop(on_stop)
+        bg.submit(asyncio.sleep(0)).result(timeout=2)
+        bg.stop()
+        self.assertEqual(closed, [True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import async_jira
+from issue_cache import issue_cache_scope
+
+
+class TestAsyncJira(unittest.TestCase):
+    def setUp(self):
+        self.jira = MagicMock()
+        self.jira._options = {"server": "https://jira.example"}
+        patcher = patch("async_jira.connect_to_jira")
+        patcher.start().return_value.__enter__.return_value = self.jira
+        self.addCleanup(patcher.stop)
+
+    def test_independent_writes_run_concurrently(self):
+        # Each call blocks until the other has started, so serial execution would hang
+        barrier = threading.Barrier(2, timeout=5)
+
+        def request(*args, **kwargs):
+            barrier.wait()
+            return MagicMock()
+
+        self.jira._session.put.side_effect = request
+        self.jira._session.post.side_effect = request
+
+        async_jira.run_concurrently(
+            async_jira.assign("ABC-2"),
+            async_jira.post_mention("ABC-1", " Scenarios are ready."),
+        )
+
+        self.jira._session.put.assert_called_once_with(
+            "https://jira.example/rest/api/3/issue/ABC-2/assignee",
+            json={"accountId": async_jira.QA_ACCOUNT_ID},
+        )
+        body = self.jira._session.post.call_args.kwargs["json"]["body"]
+        mention, text = body["content"][0]["content"]
+        self.assertEqual(mention["attrs"]["id"], async_jira.QA_ACCOUNT_ID)
+        self.assertEqual(text["text"], " Scenarios are ready.")
+
+    def test_failures_can_be_collected(self):
+        self.jira.add_comment.side_effect = RuntimeError("down")
+        comment, mention = async_jira.run_concurrently(
+            async_jira.add_comment("ABC-2", "report"),
+            async_jira.post_mention("ABC-1", " done"),
+            return_exceptions=True,
+        )
+        self.assertIsInstance(comment, RuntimeError)
+        self.assertNotIsInstance(mention, Exception)
+
+    def test_issue_cache_scope_reaches_worker_threads(self):
+        self.jira.issue.return_value.key = "ABC-1"
+        with issue_cache_scope():
+            async_jira.run_concurrently(async_jira.get_issue("ABC-1", ("labels",)))
+            async_jira.run_concurrently(async_jira.get_issue("ABC-1", ("labels",)))
+        self.jira.issue.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
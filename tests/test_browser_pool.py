@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import browser_pool
+from browser_pool import BrowserPool
+
+
+def _fake_browser(config=None):
+    browser = MagicMock()
+    browser.playwright_browser = MagicMock()
+    browser.playwright_browser.is_connected.return_value = True
+    browser.new_context = AsyncMock(side_effect=lambda config=None: AsyncMock())
+    browser.close = AsyncMock()
+    return browser
+
+
+@patch.object(browser_pool, "BrowserContextConfig", MagicMock())
+@patch.object(browser_pool, "BrowserConfig", MagicMock())
+@patch.object(browser_pool, "Browser", side_effect=_fake_browser)
+class TestBrowserPool(unittest.TestCase):
+    def test_reuses_browser_with_fresh_contexts(self, m_browser):
+        async def scenario():
+            pool = BrowserPool(size=1, max_uses=5)
+            async with pool.context() as (first, first_ctx):
+                pass
+            async with pool.context() as (second, second_ctx):
+                pass
+            return first, first_ctx, second, second_ctx
+
+        first, first_ctx, second, second_ctx = asyncio.run(scenario())
+        self.assertIs(first, second)
+        self.assertIsNot(first_ctx, second_ctx)
+        first_ctx.close.assert_awaited_once()
+        self.assertEqual(m_browser.call_count, 1)
+
+    def test_recycles_after_crash_and_max_uses(self, m_browser):
+        async def scenario():
+            pool = BrowserPool(size=1, max_uses=2)
+            used = []
+            for i in range(5):
+                async with pool.context() as (browser, _):
+                    if i == 1:
+                        browser.playwright_browser.is_connected.return_value = False
+                    used.append(browser)
+            return used
+
+        used = asyncio.run(scenario())
+        # crashed during its second use, then a fresh browser served two runs
+        self.assertIs(used[0], used[1])
+        self.assertIsNot(used[1], used[2])
+        self.assertIs(used[2], used[3])
+        self.assertIsNot(used[3], used[4])
+        used[0].close.assert_awaited_once()
+        used[2].close.assert_awaited_once()
+        self.assertEqual(m_browser.call_count, 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,348 @@
+import concurrent.futures
+import json
+import os
+import sys
+import tempfile
+import time
+import types
+import unittest
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+
+class _DummyBaseModel:
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+
+sys.modules.setdefault('pydantic', types.SimpleNamespace(BaseModel=_DummyBaseModel))
+sys.modules.setdefault('browser_use', types.SimpleNamespace(Agent=object, Controller=object))
+sys.modules.setdefault('langchain_openai', types.SimpleNamespace(ChatOpenAI=object))
+sys.modules.setdefault('openai', types.SimpleNamespace(RateLimitError=Exception))
+
+import hybrid_runner
+import reporter
+from browser_use_runner_lib import ScenarioResult, prompt_value, trace_from_history
+from results_store import ResultsStore
+
+
+def _story_steps():
+    path = os.path.join(os.path.dirname(__file__), "dummy_story.json")
+    with open(path) as f:
+        return "\n".join(json.load(f)["customfields"]["steps"])
+
+
+class TestCompileSteps(unittest.TestCase):
+    def test_compiles_known_flow(self):
+        actions = hybrid_runner.compile_steps(_story_steps())
+        self.assertEqual(
+            [a["action"] for a in actions],
+            ["go_to", "login", "add_to_cart", "view_cart", "verify_cart"],
+        )
+        self.assertEqual(actions[0]["context"], {"url": "https://www.saucedemo.com"})
+        self.assertEqual(
+            actions[1]["context"], {"username": "standard_user", "password": "secret_sauce"}
+        )
+        self.assertEqual(actions[2]["context"], {"item_name": ""})
+        self.assertEqual(actions[4]["context"], {"expected_items": [], "min_items": 1})
+
+    def test_numbered_steps_with_named_items(self):
+        actions = hybrid_runner.compile_steps(
+            "1. Open https://www.saucedemo.com\n"
+            "2. Enter username: standard_user\n"
+            "3. Enter password: secret_sauce\n"
+            "4. Click the login button\n"
+            "5. Add to cart on the Sauce Labs Backpack\n"
+            "6. Verify that Sauce Labs Backpack is shown in the cart"
+        )
+        self.assertEqual(actions[2]["context"], {"item_name": "Sauce Labs Backpack"})
+        self.assertEqual(actions[3]["context"]["expected_items"], ["Sauce Labs Backpack"])
+
+    def test_unrecognised_text_is_not_compiled(self):
+        self.assertIsNone(
+            hybrid_runner.compile_steps(
+                "Go to https://www.saucedemo.com\nCheck that the page looks nice"
+            )
+        )
+        # credentials without submitting them are not a complete login
+        self.assertIsNone(
+            hybrid_runner.compile_steps(
+                "Go to https://www.saucedemo.com\nEnter username: standard_user"
+            )
+        )
+
+
+STORY_DESCRIPTION = (
+    "As a shopper I want to add products to my cart so that I can buy them later.\n"
+    "Site: https://www.saucedemo.com (log in as standard_user)\n"
+    "Acceptance criteria: the cart badge shows the number of items."
+)
+
+
+class TestCompilePrompt(unittest.TestCase):
+    def test_description_with_preconditions_is_not_compiled(self):
+        # "log in as standard_user" can't be dropped, so the agent runs this
+        for step in ("Add to cart on the Sauce Labs Backpack", "Open https://www.saucedemo.com"):
+            self.assertIsNone(hybrid_runner.compile_prompt(f"{STORY_DESCRIPTION}\n\n{step}"))
+
+    def test_url_only_description_opens_the_site(self):
+        actions = hybrid_runner.compile_prompt(
+            "https://www.saucedemo.com\n\nAdd to cart on the Sauce Labs Backpack"
+        )
+        self.assertEqual([a["action"] for a in actions], ["go_to", "add_to_cart"])
+        self.assertEqual(actions[0]["context"], {"url": "https://www.saucedemo.com"})
+        self.assertIsNone(hybrid_runner.compile_prompt("No site here.\n\nView the cart"))
+
+    def test_fully_compilable_prompt_is_compiled(self):
+        actions = hybrid_runner.compile_prompt(
+            "Go to https://www.saucedemo.com\nEnter username: standard_user\n"
+            "Enter password: secret_sauce\nClick the login button\n\n"
+            "Add to cart on the Sauce Labs Backpack"
+        )
+        self.assertEqual(
+            [a["action"] for a in actions], ["go_to", "login", "add_to_cart"]
+        )
+
+
+class _InlinePool:
+    """Session pool stand-in that runs jobs on the calling thread."""
+
+    def __init__(self, session):
+        self.session = session
+        self.submitted = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted.append(fn)
+        future = concurrent.futures.Future()
+        future.set_result(fn(*args, session=self.session, **kwargs))
+        return future
+
+
+class TestRunHybridTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = ResultsStore(os.path.join(tmp.name, "state.db"))
+        patcher = patch("hybrid_runner.get_results_store", return_value=self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.session = MagicMock()
+        patcher = patch("playwright_session.get_session_pool", return_value=_InlinePool(self.session))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("hybrid_runner.run_browser_use_test_hybrid")
+    @patch("executor.run_test_steps")
+    def test_compiled_scenario_skips_the_agent(self, m_steps, m_agent):
+        m_steps.side_effect = lambda actions, scenario, deadline=None, session=None: [
+            reporter.TestStepResult(step=a, status="passed") for a in actions
+        ]
+        result = hybrid_runner.run_hybrid_test(_story_steps(), "Cart")
+        self.assertTrue(result.success)
+        self.assertEqual(result.results[0].step, "Go to https://www.saucedemo.com")
+        # ran on a pooled session instead of launching a browser of its own
+        self.assertIs(m_steps.call_args.kwargs["session"], self.session)
+        m_agent.assert_not_called()
+
+    @patch("hybrid_runner.run_browser_use_test_hybrid")
+    @patch("executor.run_test_steps")
+    def test_backend_prompt_with_story_description_goes_to_the_agent(self, m_steps, m_agent):
+        m_agent.return_value = ScenarioResult(scenario="Backpack", results=[], success=True)
+        step = "Add to cart on the Sauce Labs Backpack"
+        result = hybrid_runner.run_hybrid_test(f"{STORY_DESCRIPTION}\n\n{step}", step)
+        self.assertIs(result, m_agent.return_value)
+        m_steps.assert_not_called()
+
+    @patch("hybrid_runner.run_browser_use_test_hybrid")
+    @patch("executor.run_test_steps")
+    def test_failures_and_prose_go_to_the_agent(self, m_steps, m_agent):
+        m_steps.side_effect = lambda actions, scenario, deadline=None, session=None: [
+            reporter.TestStepResult(step=actions[0], status="failed", error="selector not found")
+        ]
+        m_agent.return_value = ScenarioResult(scenario="Cart", results=[], success=False)
+        deadline = time.monotonic() + 60
+        hybrid_runner.run_hybrid_test(_story_steps(), "Cart", deadline=deadline)
+        m_agent.assert_called_once_with(
+            _story_steps(), "Cart", on_step=None, deadline=deadline
+        )
+
+        m_steps.reset_mock()
+        hybrid_runner.run_hybrid_test("Users can checkout with a coupon.", "Coupon")
+        m_steps.assert_not_called()
+        self.assertEqual(m_agent.call_count, 2)
+
+    @patch("executor.replay_trace")
+    @patch("hybrid_runner.run_browser_use_test_hybrid")
+    def test_successful_agent_run_is_replayed(self, m_agent, m_replay):
+        prompt = "Users can checkout with a coupon."
+        trace = [{"op": "goto", "url": "https://shop.example.com"}]
+        m_agent.return_value = ScenarioResult(
+            scenario="Coupon", results=[], success=True, trace=trace
+        )
+        hybrid_runner.run_hybrid_test(prompt, "Coupon")
+        m_replay.assert_not_called()
+
+        m_replay.side_effect = lambda ops, scenario, deadline=None, session=None: [
+            reporter.TestStepResult(step=op, status="passed") for op in ops
+        ]
+        result = hybrid_runner.run_hybrid_test(prompt, "Coupon")
+        self.assertTrue(result.success)
+        self.assertEqual(result.results[0].step, "Replay: goto https://shop.example.com")
+        m_replay.assert_called_once_with(
+            trace, scenario="Coupon", deadline=None, session=self.session
+        )
+        self.assertEqual(m_agent.call_count, 1)
+
+    @patch("hybrid_runner.run_browser_use_test_hybrid")
+    def test_replay_with_missing_expected_text_fails(self, m_agent):
+        prompt = "Users can checkout with a coupon."
+        fingerprint = hybrid_runner.scenario_fingerprint("Coupon", prompt)
+        self.store.save_trace(
+            fingerprint,
+            "Coupon",
+            [
+                {"op": "goto", "url": "https://shop.example.com/cart"},
+                {"op": "click", "selectors": ["#apply"]},
+                {"op": "expect_text", "text": "SAVE10 applied"},
+            ],
+        )
+        page = MagicMock()
+        page.get_by_text.return_value.first.wait_for.side_effect = TimeoutError("not visible")
+
+        @contextmanager
+        def fake_page(session=None):
+            yield page
+
+        m_agent.return_value = ScenarioResult(scenario="Coupon", results=[], success=False)
+        with patch("executor.scenario_page", fake_page):
+            result = hybrid_runner.run_hybrid_test(prompt, "Coupon")
+
+        # every action replayed, but the outcome didn't match: no PASS from the replay
+        page.locator.return_value.first.click.assert_called_once()
+        page.get_by_text.assert_called_once_with("SAVE10 applied")
+        m_agent.assert_called_once()
+        self.assertFalse(result.success)
+
+    @patch("executor.replay_trace")
+    @patch("hybrid_runner.run_browser_use_test_hybrid")
+    def test_replay_fills_referenced_values_from_the_prompt(self, m_agent, m_replay):
+        prompt = "Log in with password: secret_sauce"
+        fingerprint = hybrid_runner.scenario_fingerprint("Login", prompt)
+        self.store.save_trace(
+            fingerprint,
+            "Login",
+            [{"op": "fill", "selectors": ["#pw"], "value_ref": {"token": 4}}],
+        )
+        m_replay.side_effect = lambda ops, scenario, deadline=None, session=None: [
+            reporter.TestStepResult(step=op, status="passed") for op in ops
+        ]
+        self.assertTrue(hybrid_runner.run_hybrid_test(prompt, "Login").success)
+        self.assertEqual(m_replay.call_args.args[0][0]["value"], "secret_sauce")
+        m_agent.assert_not_called()
+
+    @patch("executor.replay_trace")
+    @patch("hybrid_runner.run_browser_use_test_hybrid")
+    def test_diverged_replay_falls_back_to_agent(self, m_agent, m_replay):
+        prompt = "Users can checkout with a coupon."
+        fingerprint = hybrid_runner.scenario_fingerprint("Coupon", prompt)
+        self.store.save_trace(fingerprint, "Coupon", [{"op": "click", "selectors": ["#old"]}])
+        m_replay.side_effect = lambda ops, scenario, deadline=None, session=None: [
+            reporter.TestStepResult(step=ops[0], status="failed", error="No element matches")
+        ]
+        m_agent.return_value = ScenarioResult(scenario="Coupon", results=[], success=False)
+
+        result = hybrid_runner.run_hybrid_test(prompt, "Coupon")
+        self.assertIs(result, m_agent.return_value)
+        self.assertIsNone(self.store.trace(fingerprint))
+
+
+def _agent_step(url, actions, elements=(), results=()):
+    return types.SimpleNamespace(
+        state=types.SimpleNamespace(url=url, interacted_element=list(elements)),
+        model_output=types.SimpleNamespace(action=actions),
+        result=list(results),
+    )
+
+
+class TestTraceFromHistory(unittest.TestCase):
+    def test_records_navigation_and_element_selectors(self):
+        field = types.SimpleNamespace(attributes={"id": "coupon"}, css_selector=None, xpath="html/body/input")
+        button = types.SimpleNamespace(attributes={}, css_selector="button.apply", xpath="html/body/button")
+        history = types.SimpleNamespace(
+            history=[
+                _agent_step(
+                    "about:blank",
+                    [{"go_to_url": {"url": "https://shop.example.com"}}, {"wait": {"seconds": 3}}],
+                ),
+                _agent_step(
+                    "https://shop.example.com/cart",
+                    [{"input_text": {"index": 1, "text": "SAVE10"}}, {"click_element": {"index": 2}}],
+                    [field, button],
+                ),
+                _agent_step(
+                    "https://shop.example.com/cart",
+                    [{"extract_content": {"goal": "discount"}}],
+                    results=[
+                        types.SimpleNamespace(extracted_content='{"discount": "SAVE10 applied"}')
+                    ],
+                ),
+                _agent_step(
+                    "https://shop.example.com/cart",
+                    [{"done": {"text": 'The cart shows "Total: $18.00".'}}],
+                ),
+            ]
+        )
+        self.assertEqual(
+            trace_from_history(history),
+            [
+                {"op": "goto", "url": "https://shop.example.com"},
+                {"op": "expect_url", "url": "https://shop.example.com/cart"},
+                {"op": "fill", "selectors": ['[id="coupon"]', "xpath=/html/body/input"], "value": "SAVE10"},
+                {"op": "click", "selectors": ["button.apply", "xpath=/html/body/button"]},
+                {"op": "expect_url", "url": "https://shop.example.com/cart"},
+                {"op": "expect_text", "text": "SAVE10 applied"},
+                {"op": "expect_text", "text": "Total: $18.00"},
+            ],
+        )
+
+    def test_typed_secrets_are_not_stored(self):
+        prompt = "Log in at https://shop.example.com with user alice and password: 's3cr3t!'"
+        password = types.SimpleNamespace(
+            attributes={"id": "pw", "type": "password"}, css_selector=None, xpath=None
+        )
+        history = types.SimpleNamespace(
+            history=[
+                _agent_step("about:blank", [{"go_to_url": {}}]),
+                _agent_step(
+                    "https://shop.example.com/login",
+                    [{"input_text": {"index": 1, "text": "s3cr3t!"}}],
+                    [password],
+                ),
+            ]
+        )
+        trace = trace_from_history(history, prompt)
+        self.assertNotIn("s3cr3t!", json.dumps(trace))
+        fill = next(op for op in trace if op["op"] == "fill")
+        self.assertEqual(prompt_value(prompt, fill["value_ref"]), "s3cr3t!")
+        # the malformed navigation without a URL was skipped
+        self.assertNotIn("goto", [op["op"] for op in trace])
+
+        # a password the prompt doesn't contain can't be referenced: no trace
+        self.assertIsNone(trace_from_history(history, "Log in as alice"))
+
+    def test_run_without_checks_records_nothing(self):
+        history = types.SimpleNamespace(
+            history=[_agent_step("about:blank", [{"send_keys": {"keys": "Enter"}}])]
+        )
+        self.assertIsNone(trace_from_history(history))
+
+    def test_unreplayable_action_records_nothing(self):
+        history = types.SimpleNamespace(
+            history=[_agent_step("https://shop.example.com", [{"switch_tab": {"page_id": 1}}])]
+        )
+        self.assertIsNone(trace_from_history(history))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from issue_cache import IssueCache, get_issue, invalidate_issue, issue_cache_scope
+
+
+def _issue(key, labels=None):
+    issue = MagicMock()
+    issue.key = key
+    issue.fields.labels = labels or []
+    return issue
+
+
+class TestIssueCache(unittest.TestCase):
+    def test_scope_fetches_each_issue_once(self):
+        jira = MagicMock()
+        jira.issue.side_effect = lambda key, **kw: _issue(key)
+        with issue_cache_scope():
+            first = get_issue(jira, "ABC-1", fields=("labels",))
+            self.assertIs(get_issue(jira, "ABC-1", fields=("labels",)), first)
+            # a snapshot missing a requested field is fetched again
+            get_issue(jira, "ABC-1", fields=("labels", "status"))
+            invalidate_issue("ABC-1")
+            get_issue(jira, "ABC-1", fields=("labels",))
+        self.assertEqual(jira.issue.call_count, 3)
+
+        # outside a scope nothing is cached
+        get_issue(jira, "ABC-1")
+        get_issue(jira, "ABC-1")
+        self.assertEqual(jira.issue.call_count, 5)
+
+    @patch("issue_cache.time.monotonic")
+    def test_entries_expire_after_ttl(self, m_time):
+        cache = IssueCache(ttl=10)
+        m_time.return_value = 100.0
+        cache.put(_issue("ABC-1"))
+        m_time.return_value = 105.0
+        self.assertIsNotNone(cache.get("ABC-1"))
+        m_time.return_value = 111.0
+        self.assertIsNone(cache.get("ABC-1"))
+
+    @patch("subtask_manager.connect_to_jira")
+    def test_label_changes_use_cached_snapshot(self, mock_connect):
+        import subtask_manager
+
+        jira = MagicMock()
+        jira._options = {"server": "https://jira.example"}
+        mock_connect.return_value.__enter__.return_value = jira
+        jira.issue.return_value = _issue("ABC-1", ["scenarios-generated"])
+        with issue_cache_scope():
+            get_issue(jira, "ABC-1", fields=("labels",))
+            subtask_manager.add_label("ABC-1", "testing-in-progress")
+            # already applied according to the snapshot, so no request is sent
+            subtask_manager.add_label("ABC-1", "testing-in-progress")
+            subtask_manager.remove_label("ABC-1", "scenarios-generated")
+        jira.issue.assert_called_once()
+        self.assertEqual(jira._session.put.call_count, 2)
+        issue = jira.issue.return_value
+        self.assertEqual(issue.fields.labels, ["testing-in-progress"])
+
+    @patch("subtask_manager.connect_to_jira")
+    def test_update_labels_sends_one_delta(self, mock_connect):
+        import subtask_manager
+
+        jira = MagicMock()
+        jira._options = {"server": "https://jira.example"}
+        mock_connect.return_value.__enter__.return_value = jira
+        self.assertTrue(
+            subtask_manager.update_labels(
+                "ABC-1", add=["auto-tested"], remove=["testing-in-progress"]
+            )
+        )
+        jira.issue.assert_not_called()
+        jira._session.put.assert_called_once_with(
+            "https://jira.example/rest/api/3/issue/ABC-1",
+            json={
+                "update": {
+                    "labels": [
+                        {"add": "auto-tested"},
+                        {"remove": "testing-in-progress"},
+                    ]
+                }
+            },
+        )
+
+    @patch("subtask_manager.connect_to_jira")
+    def test_removal_is_sent_even_if_snapshot_lacks_label(self, mock_connect):
+        import subtask_manager
+
+        jira = MagicMock()
+        jira._options = {"server": "https://jira.example"}
+        mock_connect.return_value.__enter__.return_value = jira
+        jira.issue.return_value = _issue("ABC-1", [])
+        with issue_cache_scope():
+            # snapshot taken before another writer added the label
+            get_issue(jira, "ABC-1", fields=("labels",))
+            self.assertTrue(
+                subtask_manager.update_labels("ABC-1", remove=["testing-in-progress"])
+            )
+        jira._session.put.assert_called_once()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from issue_lock import IssueLocks
+
+
+class TestIssueLocks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "state.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_second_acquire_reports_holder(self):
+        locks = IssueLocks(self.path, ttl=60)
+        self.assertIsNone(locks.acquire("ABC-1", "run-tests", "job-1"))
+        # A second process sees the same lock through the shared database
+        other = IssueLocks(self.path, ttl=60)
+        holder = other.acquire("ABC-1", "run-tests", "job-2")
+        self.assertEqual(holder, {"kind": "run-tests", "job_id": "job-1"})
+
+    def test_release_and_expiry(self):
+        locks = IssueLocks(self.path, ttl=60)
+        locks.acquire("ABC-1", "run-tests", "job-1")
+        locks.release("ABC-1", "job-2")  # not the holder, no effect
+        self.assertIsNotNone(locks.acquire("ABC-1", "run-tests", "job-3"))
+        locks.release("ABC-1", "job-1")
+        self.assertIsNone(locks.acquire("ABC-1", "run-tests", "job-3"))
+
+        with patch("issue_lock.time.time", return_value=10**12):
+            self.assertIsNone(locks.acquire("ABC-1", "suggest-scenarios", "job-4"))
+
+    def test_holders_lists_live_locks_in_one_lookup(self):
+        locks = IssueLocks(self.path, ttl=60)
+        locks.acquire("ABC-1", "run-tests", "job-1")
+        locks.acquire("ABC-2", "suggest-scenarios", "job-2")
+        self.assertEqual(
+            locks.holders(["ABC-1", "ABC-3"]),
+            {"ABC-1": {"kind": "run-tests", "job_id": "job-1"}},
+        )
+        with patch("issue_lock.time.time", return_value=10**12):
+            self.assertEqual(locks.holders(["ABC-1", "ABC-2"]), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
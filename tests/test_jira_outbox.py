@@ -0,0 +1,126 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import closing
+from unittest.mock import MagicMock, patch
+
+import state_db
+from jira_outbox import JiraOutbox, merge_label_changes
+
+
+class TestJiraOutbox(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.outbox = JiraOutbox(
+            os.path.join(self.tmp.name, "state.db"), autostart=False
+        )
+        self.jira = MagicMock()
+        self.jira._options = {"server": "https://jira.example"}
+        self.jira._session.get.return_value.json.return_value = {"comments": []}
+        for target in ("async_jira.connect_to_jira", "subtask_manager.connect_to_jira"):
+            patcher = patch(target)
+            patcher.start().return_value.__enter__.return_value = self.jira
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_merge_label_changes_keeps_last_intent(self):
+        merged = merge_label_changes(
+            [{"add": ["a", "b"]}, {"remove": ["a", "c"]}, {"add": ["c"]}]
+        )
+        self.assertEqual(merged, {"add": ["b", "c"], "remove": ["a"]})
+
+    def test_adjacent_label_changes_are_sent_as_one_update(self):
+        self.outbox.update_labels("ABC-1", add=["testing-in-progress"])
+        self.outbox.update_labels(
+            "ABC-1", add=["auto-tested"], remove=["testing-in-progress"]
+        )
+        self.outbox.comment("ABC-2", "report")
+
+        self.assertEqual(self.outbox.drain(), 3)
+        self.jira._session.put.assert_called_once_with(
+            "https://jira.example/rest/api/3/issue/ABC-1",
+            json={
+                "update": {
+                    "labels": [
+                        {"add": "auto-tested"},
+                        {"remove": "testing-in-progress"},
+                    ]
+                }
+            },
+        )
+        self.jira._session.post.assert_called_once()
+        url = self.jira._session.post.call_args.args[0]
+        payload = self.jira._session.post.call_args.kwargs["json"]
+        self.assertEqual(url, "https://jira.example/rest/api/2/issue/ABC-2/comment")
+        self.assertEqual(payload["body"], "report")
+        self.assertEqual(payload["properties"][0]["key"], "jirai.outbox")
+        self.assertEqual(self.outbox.pending(), 0)
+
+    def test_failed_write_is_retried_in_order(self):
+        failures = [RuntimeError("503")]
+
+        def post(url, **kwargs):
+            if "ABC-2" in url and failures:
+                raise failures.pop()
+            return MagicMock()
+
+        self.jira._session.post.side_effect = post
+        self.outbox.comment("ABC-2", "report")
+        self.outbox.mention("ABC-2", " done")
+        self.outbox.comment("ABC-3", "other report")
+
+        # ABC-3 is unaffected; the mention on ABC-2 waits behind the failed comment
+        self.assertEqual(self.outbox.drain(), 1)
+        self.assertEqual(self.jira._session.post.call_count, 2)
+        self.assertEqual(self.outbox.pending(), 2)
+        self.assertEqual(self.outbox.drain(), 0)  # still backing off
+
+        with patch("jira_outbox.time.time", return_value=time.time() + 10):
+            self.assertEqual(self.outbox.drain(), 2)
+        posted = [c.kwargs["json"]["body"] for c in self.jira._session.post.call_args_list]
+        self.assertEqual(posted[2], "report")
+        self.assertEqual(len(posted), 4)
+        self.assertEqual(self.outbox.pending(), 0)
+
+    def test_comment_already_posted_before_a_crash_is_not_repeated(self):
+        row_id = self.outbox.comment("ABC-2", "report")
+        with self.outbox_db() as conn:
+            payload = conn.execute(
+                "SELECT payload FROM jira_outbox WHERE id = ?", (row_id,)
+            ).fetchone()["payload"]
+            # leased by a worker that died after posting
+            conn.execute("UPDATE jira_outbox SET locked_until = 1 WHERE id = ?", (row_id,))
+        marker = json.loads(payload)["marker"]
+        self.jira._session.get.return_value.json.return_value = {
+            "comments": [
+                {"properties": [{"key": "jirai.outbox", "value": {"marker": marker}}]}
+            ]
+        }
+
+        self.assertEqual(self.outbox.drain(), 1)
+        self.jira._session.post.assert_not_called()
+        self.assertEqual(self.outbox.pending(), 0)
+
+    def test_writes_need_an_issue_key(self):
+        with self.assertRaises(ValueError):
+            self.outbox.mention(None, "results are in")
+        self.assertEqual(self.outbox.pending(), 0)
+
+    def test_wait_returns_once_writes_are_applied(self):
+        ids = [self.outbox.update_labels("ABC-1", add=["auto-tested"])]
+        self.assertFalse(self.outbox.wait(ids, timeout=0))
+        drainer = threading.Timer(0.05, self.outbox.drain)
+        drainer.start()
+        self.assertTrue(self.outbox.wait(ids, timeout=5))
+        drainer.join()
+
+    def outbox_db(self):
+        return closing(state_db.connect(self.outbox.path))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from jira_pool import JiraClientPool
+
+
+class TestJiraClientPool(unittest.TestCase):
+    def test_checked_out_clients_are_exclusive_and_reused(self):
+        factory = MagicMock(side_effect=lambda: MagicMock())
+        pool = JiraClientPool(factory, size=2)
+        with pool.checkout() as first, pool.checkout() as second:
+            self.assertIsNot(first, second)
+        with pool.checkout() as again:
+            self.assertIn(again, (first, second))
+        self.assertEqual(factory.call_count, 2)
+
+    def test_checkout_waits_for_a_free_client(self):
+        pool = JiraClientPool(MagicMock(side_effect=lambda: MagicMock()), size=1)
+        got = []
+
+        def other():
+            with pool.checkout() as client:
+                got.append(client)
+
+        with pool.checkout() as held:
+            thread = threading.Thread(target=other)
+            thread.start()
+            thread.join(timeout=0.2)
+            # the only client is in use, so the other thread must wait
+            self.assertTrue(thread.is_alive())
+        thread.join(timeout=5)
+        self.assertEqual(got, [held])
+
+        pool.checkout_timeout = 0.05
+        with pool.checkout():
+            with self.assertRaises(TimeoutError):
+                with pool.checkout():
+                    pass
+
+    @patch("jira_pool.time.monotonic")
+    def test_only_idle_clients_are_health_checked(self, m_time):
+        stale = MagicMock()
+        stale.server_info.side_effect = Exception("connection reset")
+        fresh = MagicMock()
+        factory = MagicMock(side_effect=[stale, fresh])
+        pool = JiraClientPool(factory, size=1, health_check_interval=60)
+
+        m_time.return_value = 1000.0
+        with pool.checkout():
+            pass
+        # busy client: used again 50s after its last checkin, no probe
+        for now in (1050.0, 1100.0):
+            m_time.return_value = now
+            with pool.checkout() as client:
+                self.assertIs(client, stale)
+        stale.server_info.assert_not_called()
+
+        m_time.return_value = 1200.0
+        with pool.checkout() as client:
+            self.assertIs(client, fresh)
+        self.assertEqual(factory.call_count, 2)
+
+    def test_reset_drops_idle_and_checked_out_clients(self):
+        factory = MagicMock(side_effect=lambda: MagicMock())
+        pool = JiraClientPool(factory, size=1)
+        with pool.checkout() as old:
+            pool.reset()
+        with pool.checkout() as client:
+            self.assertIsNot(client, old)
+        self.assertEqual(factory.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
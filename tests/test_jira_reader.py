@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import jira_reader
+from issue_cache import issue_cache_scope
+
+
+class _Page(list):
+    def __init__(self, issues, total):
+        super().__init__(issues)
+        self.total = total
+
+
+def _issue(key):
+    issue = MagicMock()
+    issue.key = key
+    issue.fields.summary = f"Story {key}"
+    issue.fields.description = "Open https://example.com\nSteps\nClick buy"
+    issue.fields.labels = []
+    return issue
+
+
+class TestStoryFetch(unittest.TestCase):
+    @patch("jira_reader.connect_to_jira")
+    def test_paginates_with_projected_fields(self, mock_connect):
+        mock_jira = MagicMock()
+        mock_connect.return_value.__enter__.return_value = mock_jira
+        issues = [_issue(f"JAI-{i}") for i in range(5)]
+        mock_jira.search_issues.side_effect = [
+            _Page(issues[:2], 5),
+            _Page(issues[2:4], 5),
+            _Page(issues[4:], 5),
+        ]
+
+        stories = list(jira_reader.iter_stories_by_status("JAI", "QA", page_size=2))
+
+        self.assertEqual([s["key"] for s in stories], [f"JAI-{i}" for i in range(5)])
+        self.assertEqual(mock_jira.search_issues.call_count, 3)
+        kwargs = mock_jira.search_issues.call_args.kwargs
+        self.assertEqual(kwargs["startAt"], 4)
+        self.assertEqual(kwargs["fields"], "summary,description,labels,status,subtasks")
+
+    @patch("jira_reader.connect_to_jira")
+    def test_bulk_fetch_seeds_issue_cache(self, mock_connect):
+        mock_jira = MagicMock()
+        mock_connect.return_value.__enter__.return_value = mock_jira
+        mock_jira.search_issues.return_value = _Page([_issue("JAI-1")], 1)
+
+        with issue_cache_scope():
+            list(jira_reader.iter_stories_by_status("JAI", "QA"))
+            story = jira_reader.get_user_story("JAI-1")
+
+        self.assertEqual(story["customfields"]["url"], "Open https://example.com")
+        mock_jira.issue.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
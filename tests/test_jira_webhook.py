@@ -0,0 +1,110 @@
+import hashlib
+import hmac
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from webhook_events import SeenEvents
+
+try:
+    import jira_agent_backend as backend
+except Exception:  # pragma: no cover - flask or Jira client not installed
+    backend = None
+
+
+def _event(status="QA", key="ABC-1", subtask=False):
+    return {
+        "webhookEvent": "jira:issue_updated",
+        "timestamp": 1700000000000,
+        "issue": {"id": "10001", "key": key, "fields": {"issuetype": {"subtask": subtask}}},
+        "changelog": {"items": [{"field": "status", "toString": status}]},
+    }
+
+
+@unittest.skipIf(backend is None, "jira_agent_backend dependencies not installed")
+class TestJiraWebhook(unittest.TestCase):
+    secret = "s3cret"
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.seen = SeenEvents(os.path.join(tmp.name, "state.db"))
+        patches = [
+            patch.object(backend, "seen_events", self.seen),
+            patch.object(backend, "JIRA_WEBHOOK_SECRET", self.secret),
+            patch.object(backend, "JIRA_WEBHOOK_ALLOW_UNAUTHENTICATED", False),
+            patch.object(backend, "_start_job", return_value=({"status": "queued"}, 202)),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.start_job = backend._start_job
+        self.client = backend.app.test_client()
+
+    def post(self, event, headers=None, secret=None, signed=True):
+        body = json.dumps(event).encode()
+        headers = dict(headers or {})
+        if signed:
+            digest = hmac.new(self.secret.encode(), body, hashlib.sha256).hexdigest()
+            headers["X-Hub-Signature"] = f"sha256={digest}"
+        url = "/jira-webhook" + (f"?secret={secret}" if secret else "")
+        return self.client.post(
+            url, data=body, headers=headers, content_type="application/json"
+        )
+
+    def test_signature_or_url_secret_required(self):
+        self.assertEqual(self.post(_event(), signed=False).status_code, 401)
+        bad = self.post(_event(), headers={"X-Hub-Signature": "sha256=00"}, signed=False)
+        self.assertEqual(bad.status_code, 401)
+        self.assertEqual(self.post(_event(), signed=False, secret="wrong").status_code, 401)
+        ok = self.post(_event(key="ABC-2"), signed=False, secret=self.secret)
+        self.assertEqual(ok.status_code, 202)
+        self.start_job.assert_called_once()
+
+    def test_unset_secret_refuses_deliveries(self):
+        with patch.object(backend, "JIRA_WEBHOOK_SECRET", ""):
+            response = self.post(_event(), signed=False)
+            self.assertEqual(response.status_code, 503)
+            with patch.object(backend, "JIRA_WEBHOOK_ALLOW_UNAUTHENTICATED", True):
+                self.assertEqual(self.post(_event(), signed=False).status_code, 202)
+        self.start_job.assert_called_once()
+
+    def test_other_updates_and_subtasks_are_ignored(self):
+        other = _event()
+        other["changelog"]["items"] = [{"field": "assignee", "toString": "Ann"}]
+        for event in (other, _event(status="Done"), _event(subtask=True)):
+            response = self.post(event)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()["status"], "ignored")
+        self.start_job.assert_not_called()
+
+    def test_status_dispatches_workflow(self):
+        self.assertEqual(self.post(_event(status="In Progress")).status_code, 202)
+        self.assertEqual(self.post(_event(status="QA", key="ABC-2")).status_code, 202)
+        kinds = [c.args[0] for c in self.start_job.call_args_list]
+        self.assertEqual(kinds, ["suggest-scenarios", "run-tests"])
+        self.assertEqual(
+            self.start_job.call_args.args[1], {"issueKey": "ABC-2", "source": "webhook"}
+        )
+
+    def test_redelivery_is_a_duplicate(self):
+        headers = {"X-Atlassian-Webhook-Identifier": "evt-1"}
+        self.assertEqual(self.post(_event(), headers=headers).status_code, 202)
+        response = self.post(_event(), headers=headers)
+        self.assertEqual(response.get_json()["status"], "duplicate")
+        self.start_job.assert_called_once()
+
+    def test_event_not_recorded_when_queueing_fails(self):
+        headers = {"X-Atlassian-Webhook-Identifier": "evt-2"}
+        self.start_job.side_effect = RuntimeError("queue unavailable")
+        self.assertEqual(self.post(_event(), headers=headers).status_code, 500)
+        self.assertFalse(self.seen.seen("evt-2"))
+        self.start_job.side_effect = None
+        self.assertEqual(self.post(_event(), headers=headers).status_code, 202)
+        self.assertTrue(self.seen.seen("evt-2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
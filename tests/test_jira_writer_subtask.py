@@ -1,3 +1,7 @@
+import os
+import tempfile
+import threading
+import time
 import unittest
 from unittest.mock import MagicMock, patch
 import sys
@@ -16,13 +20,15 @@ sys.modules.setdefault('langchain_openai', types.SimpleNamespace(ChatOpenAI=obje
 sys.modules.setdefault('openai', types.SimpleNamespace(RateLimitError=Exception))
 
 import jira_writer
+from jira_outbox import JiraOutbox
+from results_store import ResultsStore
 
 
 class TestSubtaskHelpers(unittest.TestCase):
     @patch("jira_writer.connect_to_jira")
     def test_read_scenarios_from_subtask(self, mock_connect):
         mock_jira = MagicMock()
-        mock_connect.return_value = mock_jira
+        mock_connect.return_value.__enter__.return_value = mock_jira
         mock_issue = MagicMock()
         mock_issue.fields.description = (
             'test\n```json\n[{"scenario": "A", "steps": []}]\n```'
@@ -36,7 +42,7 @@ class TestSubtaskHelpers(unittest.TestCase):
     @patch("jira_writer.connect_to_jira")
     def test_create_subtask_with_scenarios(self, mock_connect):
         mock_jira = MagicMock()
-        mock_connect.return_value = mock_jira
+        mock_connect.return_value.__enter__.return_value = mock_jira
         mock_parent = MagicMock()
         mock_parent.fields.project.key = "PROJ"
         mock_jira.issue.return_value = mock_parent
@@ -50,6 +56,132 @@ class TestSubtaskHelpers(unittest.TestCase):
         self.assertEqual(key, "PROJ-2")
         mock_jira.create_issue.assert_called_once()
 
+    @patch("jira_writer.connect_to_jira")
+    @patch("jira_writer.get_results_store")
+    def test_previous_execution_checks_local_store_first(self, mock_store, mock_connect):
+        mock_store.return_value.has_runs.return_value = True
+        self.assertTrue(jira_writer.has_previous_test_execution("ABC-2"))
+        mock_connect.assert_not_called()
+
+        # Subtasks without local history fall back to the report comments
+        mock_store.return_value.has_runs.return_value = False
+        comment = MagicMock(body="Automated Test Execution Report ...")
+        jira = mock_connect.return_value.__enter__.return_value
+        jira.issue.return_value.fields.comment.comments = [comment]
+        self.assertTrue(jira_writer.has_previous_test_execution("ABC-2"))
+
+
+class TestResultReuse(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        store = ResultsStore(os.path.join(self.tmp.name, "state.db"))
+        for target, value in (
+            ("jira_writer.get_results_store", store),
+            ("jira_writer.get_outbox", MagicMock()),
+        ):
+            patcher = patch(target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, scenarios, runner, reuse_max_age=3600):
+        return jira_writer.format_test_results(
+            scenarios, runner, "ABC-2", "ABC-1", parallel=False, reuse_max_age=reuse_max_age
+        )
+
+    def test_only_changed_scenarios_are_rerun(self):
+        runner = MagicMock(
+            return_value=types.SimpleNamespace(success=True, results=[], final_result="ok")
+        )
+        scenarios = [
+            {"scenario": "Login", "steps": "https://shop.example\n\nLogin"},
+            {"scenario": "Checkout", "steps": "https://shop.example\n\nCheckout"},
+        ]
+        self._run(scenarios, runner)
+        self.assertEqual(runner.call_count, 2)
+
+        results = self._run(scenarios, runner)
+        self.assertEqual(runner.call_count, 2)
+        self.assertTrue(all(r["reused"] and r["passed"] for r in results))
+
+        scenarios[1]["steps"] = "https://shop.example\n\nCheckout with coupon"
+        results = self._run(scenarios, runner)
+        runner.assert_called_with(scenarios[1]["steps"], "Checkout")
+        self.assertEqual(runner.call_count, 3)
+        self.assertEqual([r.get("reused", False) for r in results], [True, False])
+
+        # Disabled reuse runs everything again
+        self._run(scenarios, runner, reuse_max_age=0)
+        self.assertEqual(runner.call_count, 5)
+
+    def test_failures_are_not_reused(self):
+        runner = MagicMock(
+            return_value=types.SimpleNamespace(success=False, results=[], final_result="no")
+        )
+        scenarios = [{"scenario": "Login", "steps": "https://shop.example\n\nLogin"}]
+        self._run(scenarios, runner)
+        self._run(scenarios, runner)
+        self.assertEqual(runner.call_count, 2)
+
+
+    def test_results_without_parent_issue_are_still_posted(self):
+        outbox = JiraOutbox(os.path.join(self.tmp.name, "state.db"), autostart=False)
+        runner = MagicMock(
+            return_value=types.SimpleNamespace(success=True, results=[], final_result="ok")
+        )
+        scenarios = [{"scenario": "Login", "steps": "https://shop.example\n\nLogin"}]
+        with patch("jira_writer.get_outbox", return_value=outbox):
+            results = jira_writer.format_test_results(
+                scenarios, runner, "ABC-2", None, parallel=False, reuse_max_age=0
+            )
+        self.assertTrue(results[0]["passed"])
+        self.assertEqual(outbox.pending(), 1)
+
+
+class TestStoryBudget(unittest.TestCase):
+    def test_deadline_reaches_runners_that_accept_it(self):
+        seen = {}
+
+        def runner(prompt, scenario_name, deadline=None):
+            seen[scenario_name] = deadline
+            return types.SimpleNamespace(success=True, results=[], final_result="ok")
+
+        _, result = jira_writer._execute_scenario(
+            runner, 1, 1, {"scenario": "Login", "steps": "s"}, deadline=10**9
+        )
+        self.assertTrue(result["passed"])
+        self.assertEqual(seen, {"Login": 10**9})
+
+        legacy = MagicMock(return_value=types.SimpleNamespace(success=True, results=[]))
+        jira_writer._execute_scenario(
+            lambda prompt, name: legacy(prompt, name),
+            1, 1, {"scenario": "Login", "steps": "s"}, deadline=10**9,
+        )
+        legacy.assert_called_once_with("s", "Login")
+
+    def test_waiting_for_a_browser_slot_stops_at_the_deadline(self):
+        runner = MagicMock()
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        with patch("jira_writer._browser_slots", slots):
+            _, result = jira_writer._execute_scenario(
+                runner, 1, 1, {"scenario": "Login", "steps": "s"},
+                deadline=time.monotonic() + 0.1,
+            )
+        runner.assert_not_called()
+        self.assertIn("budget", result["error"])
+
+    def test_scenarios_are_not_started_past_the_deadline(self):
+        runner = MagicMock()
+        _, result = jira_writer._execute_scenario(
+            runner, 1, 1, {"scenario": "Login", "steps": "s"}, deadline=0
+        )
+        runner.assert_not_called()
+        self.assertFalse(result["passed"])
+        self.assertIn("budget", result["error"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import time
+import unittest
+
+from job_queue import JobQueue, SqliteJobStore
+
+
+def _wait(job, timeout=2.0):
+    deadline = time.time() + timeout
+    while not job.done and time.time() < deadline:
+        time.sleep(0.01)
+
+
+class TestJobQueue(unittest.TestCase):
+    def test_job_completes_with_result_and_progress(self):
+        def work(job):
+            job.scenario_progress("Login", "running")
+            job.scenario_progress("Login", "passed")
+            return {"status": "completed"}
+
+        queue = JobQueue(workers=1)
+        job = queue.submit("run-tests", "ABC-1", work)
+        _wait(job)
+
+        snapshot = queue.get(job.id).to_dict()
+        self.assertEqual(snapshot["state"], "completed")
+        self.assertEqual(snapshot["result"], {"status": "completed"})
+        self.assertEqual(snapshot["scenarios"]["Login"]["state"], "passed")
+        self.assertIn("duration", snapshot["scenarios"]["Login"])
+        self.assertIn("run_seconds", snapshot)
+
+    def test_job_failure_is_recorded(self):
+        def work(job):
+            raise RuntimeError("boom")
+
+        queue = JobQueue(workers=1)
+        job = queue.submit("suggest-scenarios", "ABC-2", work)
+        _wait(job)
+
+        self.assertEqual(job.state, "failed")
+        self.assertEqual(job.error, "boom")
+
+    def test_store_finds_recently_completed_jobs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SqliteJobStore(os.path.join(tmp, "state.db"))
+            queue = JobQueue(workers=1, store=store, persist_interval=0.01)
+            done = queue.submit("run-tests", "ABC-1", lambda job: {"status": "completed"})
+            failed = queue.submit("run-tests", "ABC-2", lambda job: 1 / 0)
+            _wait(done)
+            _wait(failed)
+            self.assertTrue(queue.flush())
+
+            recent = store.completed_since(["ABC-1", "ABC-2", "ABC-3"], time.time() - 60)
+            self.assertEqual(list(recent), [("ABC-1", "run-tests")])
+            self.assertEqual(recent[("ABC-1", "run-tests")]["id"], done.id)
+            self.assertEqual(store.completed_since(["ABC-1"], time.time() + 60), {})
+
+    def test_step_updates_do_not_block_on_the_store(self):
+        saves = []
+
+        class SlowStore:
+            def save(self, job):
+                time.sleep(0.05)
+                saves.append(job.to_dict()["scenarios"]["Login"]["steps"])
+
+        queue = JobQueue(workers=1, store=SlowStore(), persist_interval=0.01)
+        started = time.monotonic()
+
+        def work(job):
+            for n in range(50):
+                job.scenario_step("Login", f"Step {n}", "passed")
+            return {"status": "completed"}
+
+        job = queue.submit("run-tests", "ABC-1", work)
+        _wait(job)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertTrue(queue.flush())
+        # steps were coalesced and the last snapshot has all of them
+        self.assertLess(len(saves), 10)
+        self.assertEqual(saves[-1], 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
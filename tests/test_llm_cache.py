@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from llm_cache import LLMCache, cache_key
+
+
+class TestLLMCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "state.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_depends_on_every_input(self):
+        base = cache_key("gpt-4", "system", "story", 0.2)
+        self.assertEqual(base, cache_key("gpt-4", "system", "story", 0.2))
+        self.assertNotEqual(base, cache_key("gpt-4o", "system", "story", 0.2))
+        self.assertNotEqual(base, cache_key("gpt-4", "system", "story v2", 0.2))
+        self.assertNotEqual(base, cache_key("gpt-4", "system", "story", 0.3))
+
+    def test_round_trip_and_ttl(self):
+        cache = LLMCache(self.path, ttl=60)
+        cache.put("k", [{"scenario": "A", "steps": "Open the page"}])
+        self.assertEqual(cache.get("k")[0]["scenario"], "A")
+        with patch("llm_cache.time.time", return_value=10**12):
+            self.assertIsNone(cache.get("k"))
+        self.assertIsNone(cache.get("k"))
+
+    def test_evicts_least_recently_used(self):
+        cache = LLMCache(self.path, ttl=10**12, max_entries=2)
+        with patch("llm_cache.time.time", side_effect=[1.0, 2.0, 3.0, 4.0]):
+            cache.put("a", [1])
+            cache.put("b", [2])
+            cache.get("a")
+            cache.put("c", [3])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), [1])
+        self.assertEqual(cache.get("c"), [3])
+
+
+if __name__ == "__main__":
+    unittest.main()
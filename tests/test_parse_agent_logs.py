@@ -1,4 +1,5 @@
 import unittest
+from unittest.mock import patch
 import sys
 import types
 
@@ -14,7 +15,42 @@ sys.modules.setdefault('browser_use', types.SimpleNamespace(Agent=object, Contro
 sys.modules.setdefault('langchain_openai', types.SimpleNamespace(ChatOpenAI=object))
 sys.modules.setdefault('openai', types.SimpleNamespace(RateLimitError=Exception))
 
-from browser_use_runner_lib import parse_agent_logs
+import logging
+import threading
+
+from browser_use_runner_lib import (
+    StreamingLogCapture,
+    parse_agent_logs,
+    results_from_history,
+)
+
+
+def _history_item(evaluation, actions, error=None):
+    model_output = types.SimpleNamespace(
+        current_state=types.SimpleNamespace(evaluation_previous_goal=evaluation),
+        action=actions,
+    )
+    return types.SimpleNamespace(
+        model_output=model_output,
+        result=[types.SimpleNamespace(error=error, is_done=False)],
+    )
+
+
+class _History:
+    def __init__(self, items, successful, final):
+        self.history = items
+        self._successful = successful
+        self._final = final
+
+    def is_done(self):
+        return True
+
+    def is_successful(self):
+        return self._successful
+
+    def final_result(self):
+        return self._final
+
 
 class TestParseAgentLogs(unittest.TestCase):
     def test_success_detection(self):
@@ -35,5 +71,89 @@ class TestParseAgentLogs(unittest.TestCase):
         self.assertFalse(success)
         self.assertEqual(final_result, "Failed to do thing")
 
+
+class TestStreamingLogCapture(unittest.TestCase):
+    def test_parses_records_live(self):
+        seen = []
+        log = logging.getLogger("browser_use.agent")
+        with StreamingLogCapture("scenario", on_step=lambda name, r: seen.append((name, r.step))) as capture:
+            log.info("👍 Eval: Success - Cart shows the backpack")
+            self.assertEqual(seen, [("scenario", "Verification: Cart shows the backpack")])
+            log.info("✅ Task completed successfully")
+            log.info("📄 Result: Backpack added")
+        # records emitted after the run are ignored
+        log.info("❌ Task failed")
+
+        results, final_result, success = capture.finish()
+        self.assertTrue(success)
+        self.assertEqual(final_result, "Backpack added")
+        self.assertEqual(len(results), 2)
+
+    def test_records_are_only_parsed_when_needed(self):
+        log = logging.getLogger("browser_use.agent")
+        with StreamingLogCapture("scenario") as capture:
+            with patch.object(capture.parser, "feed", wraps=capture.parser.feed) as feed:
+                log.info("✅ Task completed successfully")
+        # no live steps wanted: nothing is parsed unless the logs are used
+        feed.assert_not_called()
+        self.assertTrue(capture.finish()[2])
+
+    def test_ignores_records_of_other_runs(self):
+        log = logging.getLogger("browser_use.agent")
+        with StreamingLogCapture("outer") as outer:
+            with StreamingLogCapture("inner") as inner:
+                log.info("❌ Task failed")
+            log.info("✅ Task completed successfully")
+
+        self.assertFalse(inner.finish()[2])
+        self.assertTrue(outer.finish()[2])
+        self.assertEqual(len(outer.finish()[0]), 1)
+
+    def test_concurrent_runs_only_see_their_own_records(self):
+        log = logging.getLogger("browser_use.agent")
+        both_started = threading.Barrier(2)
+        verdicts = {}
+
+        def run(name, line):
+            with StreamingLogCapture(name) as capture:
+                both_started.wait(timeout=5)
+                log.info(line)
+                both_started.wait(timeout=5)
+            verdicts[name] = capture.finish()[2]
+
+        threads = [
+            threading.Thread(target=run, args=("passing", "✅ Task completed successfully")),
+            threading.Thread(target=run, args=("failing", "❌ Task failed")),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(verdicts, {"passing": True, "failing": False})
+
+
+class TestResultsFromHistory(unittest.TestCase):
+    def test_builds_steps_from_typed_history(self):
+        history = _History(
+            [
+                _history_item("Unknown - start", [{"go_to_url": {"url": "https://example.com"}}]),
+                _history_item("Failed - no button", [{"click_element": {"index": 3}}], error="Element not found"),
+                _history_item("Success - cart opened", [{"done": {"text": "ok"}}]),
+            ],
+            successful=False,
+            final="Cart is empty",
+        )
+        results, final_result, success = results_from_history(history, "scenario")
+        self.assertFalse(success)
+        self.assertEqual(final_result, "Cart is empty")
+        steps = [(r.step, r.status) for r in results]
+        self.assertIn(("Step 1: go_to_url", "passed"), steps)
+        self.assertIn(("Step 2: click_element", "failed"), steps)
+        self.assertIn(("Verification: Failed - no button", "failed"), steps)
+        self.assertEqual(steps[-1], ("Task completion", "failed"))
+
+    def test_returns_none_without_history(self):
+        self.assertIsNone(results_from_history("plain text", "scenario"))
+
 if __name__ == '__main__':
     unittest.main()
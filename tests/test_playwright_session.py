@@ -0,0 +1,109 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import playwright_session
+from playwright_session import PlaywrightSession, SessionPool, scenario_page
+
+
+def _fake_sync_playwright():
+    playwright = MagicMock()
+    playwright.chromium.launch.side_effect = lambda **kwargs: MagicMock()
+    factory = MagicMock()
+    factory.return_value.start.return_value = playwright
+    return factory, playwright
+
+
+class TestPlaywrightSession(unittest.TestCase):
+    def setUp(self):
+        self.factory, self.playwright = _fake_sync_playwright()
+        patcher = patch.object(playwright_session, "sync_playwright", self.factory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_one_browser_with_a_context_per_scenario(self):
+        with PlaywrightSession() as session:
+            with session.page():
+                pass
+            with session.page():
+                pass
+        self.factory.return_value.start.assert_called_once()
+        self.playwright.chromium.launch.assert_called_once()
+        self.playwright.stop.assert_called_once()
+
+    def test_contexts_are_closed_and_crashed_browser_replaced(self):
+        browsers = []
+
+        def launch(**kwargs):
+            browsers.append(MagicMock())
+            return browsers[-1]
+
+        self.playwright.chromium.launch.side_effect = launch
+        session = PlaywrightSession()
+        with session.page():
+            pass
+        context = browsers[0].new_context.return_value
+        context.close.assert_called_once()
+
+        browsers[0].is_connected.return_value = False
+        with session.page():
+            pass
+        self.assertEqual(len(browsers), 2)
+        session.close()
+        browsers[1].close.assert_called_once()
+
+    def test_session_is_bound_to_its_thread(self):
+        session = PlaywrightSession()
+        with session.page():
+            pass
+        errors = []
+
+        def use():
+            try:
+                with session.page():
+                    pass
+            except RuntimeError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=use)
+        thread.start()
+        thread.join()
+        self.assertEqual(len(errors), 1)
+        session.close()
+
+    def test_scenario_page_without_session_uses_its_own_browser(self):
+        with scenario_page():
+            pass
+        self.playwright.stop.assert_called_once()
+
+    def test_pool_runs_jobs_on_worker_sessions(self):
+        seen = []
+
+        def job(value, session=None):
+            with session.page():
+                seen.append((value, threading.get_ident()))
+            return value * 2
+
+        with SessionPool(workers=2) as pool:
+            futures = [pool.submit(job, n) for n in range(4)]
+            self.assertEqual([f.result(timeout=5) for f in futures], [0, 2, 4, 6])
+        self.assertNotIn(threading.get_ident(), {ident for _, ident in seen})
+        self.assertLessEqual(self.playwright.chromium.launch.call_count, 2)
+        # every worker that started Playwright stopped it again
+        self.assertEqual(
+            self.playwright.stop.call_count, self.factory.return_value.start.call_count
+        )
+
+    @patch.object(playwright_session, "_pool", None)
+    @patch("playwright_session.atexit.register")
+    def test_process_pool_is_shared_and_closed_at_exit(self, m_register):
+        pool = playwright_session.get_session_pool()
+        try:
+            self.assertIs(playwright_session.get_session_pool(), pool)
+            m_register.assert_called_once_with(pool.close)
+        finally:
+            pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import types
+import unittest
+from unittest.mock import MagicMock, patch
+
+from rate_limiter import RateLimiter, call_with_rate_limit, retry_delay
+
+
+class RateLimitError(Exception):
+    def __init__(self, headers=None):
+        super().__init__("rate limited")
+        self.response = types.SimpleNamespace(headers=headers or {})
+
+
+class TestRateLimiter(unittest.TestCase):
+    @patch("rate_limiter.time.monotonic", return_value=100.0)
+    def test_waits_once_budget_is_spent(self, m_time):
+        limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=1000)
+        self.assertEqual(limiter.reserve(100), 0.0)
+        self.assertEqual(limiter.reserve(100), 0.0)
+        # third request in the same instant waits for one request to refill (30s)
+        self.assertAlmostEqual(limiter.reserve(100), 30.0)
+        # token budget: 300 used, 900 more overdraws by 200 tokens -> 12s
+        self.assertAlmostEqual(limiter.tokens.reserve(900, 100.0), 12.0)
+
+    @patch("rate_limiter.time.monotonic", return_value=100.0)
+    def test_pause_holds_back_callers(self, m_time):
+        limiter = RateLimiter()
+        limiter.pause(5)
+        self.assertAlmostEqual(limiter.reserve(), 5.0)
+
+    def test_retry_delay_prefers_retry_after(self):
+        self.assertEqual(retry_delay(RateLimitError({"retry-after": "7"}), 0), 7.0)
+        self.assertEqual(retry_delay(RateLimitError({"retry-after-ms": "250"}), 3), 0.25)
+        self.assertLessEqual(retry_delay(RateLimitError(), 2, base=1.0), 4.0)
+
+    @patch("rate_limiter.time.sleep")
+    def test_call_retries_rate_limit_errors(self, m_sleep):
+        fn = MagicMock(side_effect=[RateLimitError({"retry-after": "1"}), "ok"])
+        limiter = RateLimiter(requests_per_minute=600)
+        self.assertEqual(call_with_rate_limit(fn, 1, tokens=10, limiter=limiter), "ok")
+        self.assertEqual(fn.call_count, 2)
+
+        failing = MagicMock(side_effect=ValueError("bad request"))
+        with self.assertRaises(ValueError):
+            call_with_rate_limit(failing, limiter=limiter)
+        self.assertEqual(failing.call_count, 1)
+
+    @patch("rate_limiter.time.sleep")
+    def test_call_retries_transient_errors(self, m_sleep):
+        class InternalServerError(Exception):
+            status_code = 502
+
+        class APIConnectionError(Exception):
+            pass
+
+        fn = MagicMock(side_effect=[InternalServerError(), APIConnectionError(), "ok"])
+        limiter = RateLimiter(requests_per_minute=600)
+        self.assertEqual(call_with_rate_limit(fn, limiter=limiter), "ok")
+        self.assertEqual(fn.call_count, 3)
+        # other callers are not held back by a transient failure
+        self.assertEqual(limiter.reserve(), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
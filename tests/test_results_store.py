@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from contextlib import closing
+from types import SimpleNamespace
+
+import state_db
+from results_store import ResultsStore, scenario_fingerprint
+
+
+def _result(scenario, passed, steps=()):
+    result_obj = SimpleNamespace(
+        final_result="done" if passed else "failed",
+        results=[SimpleNamespace(step=s, status=st, error=None) for s, st in steps],
+    )
+    return {"scenario": scenario, "passed": passed, "result_obj": result_obj, "duration": 1.5}
+
+
+class TestResultsStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ResultsStore(os.path.join(self.tmp.name, "state.db"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_records_runs_with_scenarios_and_steps(self):
+        self.assertFalse(self.store.has_runs("ABC-2"))
+        run_id = self.store.record_run(
+            "ABC-2",
+            [
+                _result("Login", True, [("Open page", "passed"), ("Log in", "passed")]),
+                {"scenario": "Checkout", "passed": False, "error": "timeout"},
+            ],
+            parent_issue_key="ABC-1",
+        )
+        self.assertTrue(self.store.has_runs("ABC-2"))
+
+        run = self.store.runs("ABC-2")[0]
+        self.assertEqual((run["id"], run["total"], run["passed_count"]), (run_id, 2, 1))
+        self.assertEqual(run["parent_issue_key"], "ABC-1")
+
+        login, checkout = self.store.run_results(run_id)
+        self.assertTrue(login["passed"])
+        self.assertEqual([s["step"] for s in login["steps"]], ["Open page", "Log in"])
+        self.assertEqual((checkout["error"], checkout["steps"]), ("timeout", []))
+
+    def test_scenario_history_is_newest_first(self):
+        self.store.record_run("ABC-2", [_result("Login", False)])
+        self.store.record_run("ABC-2", [_result("Login", True)])
+        self.store.record_run("XYZ-9", [_result("Login", True)])
+
+        history = self.store.scenario_history("Login", issue_key="ABC-2")
+        self.assertEqual([h["passed"] for h in history], [True, False])
+        self.assertEqual(len(self.store.scenario_history("Login")), 3)
+
+    def test_passed_fingerprint_is_reusable_until_it_expires(self):
+        fingerprint = scenario_fingerprint("Login", "steps", "https://shop.example")
+        self.store.record_run("ABC-2", [dict(_result("Login", True), fingerprint=fingerprint)])
+        self.assertIsNotNone(self.store.reusable_result("ABC-2", fingerprint, max_age=60))
+        self.assertIsNone(self.store.reusable_result("ABC-2", fingerprint, max_age=-1))
+
+    def test_deleting_a_run_deletes_its_results(self):
+        run_id = self.store.record_run("ABC-2", [_result("Login", True, [("Open page", "passed")])])
+        with closing(state_db.connect(self.store.path)) as conn:
+            conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM scenario_results").fetchone()[0], 0)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM step_results").fetchone()[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
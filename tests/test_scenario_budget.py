@@ -0,0 +1,147 @@
+import asyncio
+import concurrent.futures
+import logging
+import sys
+import time
+import types
+import unittest
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+
+class _DummyBaseModel:
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+
+sys.modules.setdefault('pydantic', types.SimpleNamespace(BaseModel=_DummyBaseModel))
+sys.modules.setdefault('browser_use', types.SimpleNamespace(Agent=object, Controller=object))
+sys.modules.setdefault('langchain_openai', types.SimpleNamespace(ChatOpenAI=object))
+sys.modules.setdefault('openai', types.SimpleNamespace(RateLimitError=Exception))
+
+import browser_use_runner_lib as lib
+import executor
+import hybrid_runner
+import reporter
+
+
+class TestScenarioBudget(unittest.TestCase):
+    @patch.object(lib, "MIN_ATTEMPT_SECONDS", 0.05)
+    @patch.object(lib, "AGENT_ATTEMPT_TIMEOUT_SECONDS", 0.2)
+    @patch.object(lib, "retry_delay", return_value=0)
+    def test_retries_stop_when_budget_is_spent(self, _delay):
+        timeouts = []
+
+        async def run_attempt(timeout):
+            timeouts.append(timeout)
+            await asyncio.sleep(timeout)
+            raise TimeoutError("hung")
+
+        started = time.monotonic()
+        result = asyncio.run(
+            lib._run_with_retries(run_attempt, "Login", time.time(), started + 0.3)
+        )
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertFalse(result.success)
+        # the second attempt only gets what is left of the budget
+        self.assertEqual(len(timeouts), 2)
+        self.assertAlmostEqual(timeouts[0], 0.2, places=2)
+        self.assertLess(timeouts[1], 0.11)
+        self.assertIn("Time budget exhausted", result.results[0].error)
+
+    def test_timed_out_agent_is_stopped(self):
+        agent = MagicMock()
+
+        async def run():
+            await asyncio.sleep(10)
+
+        agent.run = run
+        with self.assertRaises(TimeoutError):
+            asyncio.run(lib._run_agent(agent, "Login", timeout=0.05))
+        agent.stop.assert_called_once()
+
+    def test_logs_are_the_fallback_without_history(self):
+        agent = MagicMock()
+
+        async def run():
+            logging.getLogger("browser_use.agent").info("✅ Task completed successfully")
+            return "no typed history"
+
+        agent.run = run
+        results, _, success, trace = asyncio.run(
+            lib._run_agent(agent, "Login", timeout=5, structured=True)
+        )
+        self.assertTrue(success)
+        self.assertEqual(results[0].step, "Task completion")
+        self.assertIsNone(trace)
+
+    @patch.object(lib, "CANCEL_GRACE_SECONDS", 0.05)
+    def test_wrapper_cancels_run_past_deadline(self):
+        future = concurrent.futures.Future()
+        with patch.object(lib, "submit_browser_use_test", return_value=future):
+            result = lib.run_browser_use_test_hybrid(
+                "prompt", "Login", deadline=time.monotonic()
+            )
+        self.assertTrue(future.cancelled())
+        self.assertFalse(result.success)
+        self.assertIn("time budget", result.results[0].error)
+
+
+class TestDeterministicBudget(unittest.TestCase):
+    def setUp(self):
+        self.page = MagicMock()
+
+        @contextmanager
+        def fake_page(session=None):
+            yield self.page
+
+        patcher = patch("executor.scenario_page", fake_page)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("executor.get_registry")
+    def test_steps_are_bounded_by_the_deadline(self, m_registry):
+        registry = m_registry.return_value
+        registry.run.return_value = []
+        executor.run_test_steps(
+            [{"action": "view_cart"}], deadline=time.monotonic() + 2
+        )
+        timeout = self.page.set_default_timeout.call_args.args[0]
+        self.assertLessEqual(timeout, 2000)
+        self.assertEqual(registry.run.call_args.kwargs["timeout_ms"], timeout)
+
+        registry.run.reset_mock()
+        results = executor.run_test_steps(
+            [{"action": "view_cart"}, {"action": "verify_cart"}], deadline=time.monotonic() - 1
+        )
+        registry.run.assert_not_called()
+        self.assertTrue(all(r.status == "failed" and "budget" in r.error for r in results))
+
+    def test_replay_is_bounded_by_the_deadline(self):
+        trace = [{"op": "goto", "url": "https://shop.example.com"}]
+        executor.replay_trace(trace, deadline=time.monotonic() + 2)
+        self.assertLessEqual(self.page.goto.call_args.kwargs["timeout"], 2000)
+
+        results = executor.replay_trace(trace, deadline=time.monotonic() - 1)
+        self.assertEqual(results[0].status, "failed")
+        self.assertEqual(self.page.goto.call_count, 1)
+
+    @patch("hybrid_runner.run_browser_use_test_hybrid")
+    @patch("executor.run_test_steps")
+    @patch("playwright_session.get_session_pool")
+    def test_no_agent_fallback_past_the_deadline(self, m_pool, m_steps, m_agent):
+        m_pool.return_value.submit.side_effect = lambda fn, *args, **kwargs: MagicMock(
+            result=lambda: fn(*args, **kwargs)
+        )
+        m_steps.return_value = [
+            reporter.TestStepResult(step={"action": "go_to"}, status="failed", error="budget")
+        ]
+        prompt = "Go to https://www.saucedemo.com\nView the cart"
+        result = hybrid_runner.run_hybrid_test(prompt, "Cart", deadline=time.monotonic() - 1)
+        self.assertFalse(result.success)
+        m_agent.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
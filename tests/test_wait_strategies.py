@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import MagicMock
+
+from action_registry import SiteSelectors
+from wait_strategies import waiting
+
+
+class TestWaiting(unittest.TestCase):
+    def setUp(self):
+        self.page = MagicMock()
+        self.site = SiteSelectors({"cart_page": ".cart_list"}, {})
+
+    def test_response_is_armed_before_the_action(self):
+        calls = []
+        expectation = self.page.expect_response.return_value
+        expectation.__enter__.side_effect = lambda: calls.append("armed")
+        expectation.__exit__.side_effect = lambda *exc: calls.append("awaited")
+
+        waits = [{"for": "response", "url_contains": "/api/cart", "timeout_ms": 500}]
+        with waiting(self.page, waits, self.site) as timings:
+            calls.append("action")
+
+        self.assertEqual(calls, ["armed", "action", "awaited"])
+        self.assertEqual(self.page.expect_response.call_args.kwargs["timeout"], 500)
+        self.assertEqual(timings[0]["wait"], "response /api/cart")
+        self.assertGreaterEqual(timings[0]["seconds"], 0)
+
+    def test_failed_action_skips_waits(self):
+        waits = [
+            {"for": "response", "url_contains": "/api/cart"},
+            {"for": "selector", "target": "cart_page"},
+        ]
+        with self.assertRaises(RuntimeError):
+            with waiting(self.page, waits, self.site):
+                raise RuntimeError("click failed")
+        self.page.wait_for_selector.assert_not_called()
+        exit_args = self.page.expect_response.return_value.__exit__.call_args.args
+        self.assertIs(exit_args[0], RuntimeError)
+
+    def test_waits_run_in_order_with_timings(self):
+        waits = [
+            {"for": "url", "contains": "/cart"},
+            {"for": "selector", "target": "cart_page", "state": "attached"},
+            {"for": "load_state", "state": "domcontentloaded"},
+        ]
+        with waiting(self.page, waits, self.site, default_timeout_ms=2000) as timings:
+            pass
+        self.page.wait_for_selector.assert_called_once_with(
+            ".cart_list", state="attached", timeout=2000
+        )
+        self.page.wait_for_load_state.assert_called_once_with("domcontentloaded", timeout=2000)
+        self.assertEqual(
+            [t["wait"] for t in timings],
+            ["url /cart", "selector cart_page attached", "load_state domcontentloaded"],
+        )
+
+    def test_missing_selector_waits_for_navigation(self):
+        self.page.url = "https://shop.example.com/login"
+        waits = [{"for": "selector", "target": "account_page"}]
+        with waiting(self.page, waits, self.site) as timings:
+            self.page.url = "https://shop.example.com/account"
+        predicate = self.page.wait_for_url.call_args.args[0]
+        self.assertFalse(predicate("https://shop.example.com/login"))
+        self.assertTrue(predicate("https://shop.example.com/account"))
+        self.page.wait_for_load_state.assert_not_called()
+        self.assertEqual(timings[0]["wait"], "navigation")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from webhook_events import SeenEvents
+
+
+class TestSeenEvents(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "state.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_repeated_delivery_is_detected_across_processes(self):
+        self.assertTrue(SeenEvents(self.path).first_seen("evt-1"))
+        self.assertFalse(SeenEvents(self.path).first_seen("evt-1"))
+        self.assertTrue(SeenEvents(self.path).first_seen("evt-2"))
+
+    def test_seen_does_not_record(self):
+        events = SeenEvents(self.path)
+        self.assertFalse(events.seen("evt-1"))
+        self.assertFalse(events.seen("evt-1"))
+        events.first_seen("evt-1")
+        self.assertTrue(events.seen("evt-1"))
+
+    @patch("webhook_events.time.time")
+    def test_ids_are_forgotten_after_ttl(self, m_time):
+        events = SeenEvents(self.path, ttl=60)
+        m_time.return_value = 1000.0
+        events.first_seen("evt-1")
+        m_time.return_value = 1030.0
+        self.assertFalse(events.first_seen("evt-1"))
+        m_time.return_value = 1100.0
+        self.assertTrue(events.first_seen("evt-1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
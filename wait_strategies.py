@@ -0,0 +1,107 @@
+"""Event-driven waits for executor actions.
+
+An action in ``executor_actions.json`` lists the ``waits`` that tell when it
+has taken effect, instead of sleeping a fixed time:
+
+* ``{"for": "selector", "target": "cart_page", "state": "visible"}`` – an element
+  (logical name from the site's selector map) reaches ``state``. Sites without
+  that selector wait for the action to navigate (the URL to change) instead.
+* ``{"for": "response", "url_contains": "/api/cart"}`` – a response arrives;
+  armed before the action so a fast response isn't missed.
+* ``{"for": "url", "contains": "/inventory"}`` – the page URL changes.
+* ``{"for": "load_state", "state": "domcontentloaded"}`` – a load state.
+
+Each wait may set ``timeout_ms`` (default ``EXECUTOR_WAIT_TIMEOUT_MS``), and
+how long it actually took is reported back for the step result.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+EXECUTOR_WAIT_TIMEOUT_MS = int(os.getenv("EXECUTOR_WAIT_TIMEOUT_MS", "10000"))
+
+
+def _selector(page, wait, site, timeout_ms, url_before) -> str:
+    if not site.has(wait["target"]):
+        # The page is usually already loaded, so wait for the navigation itself
+        page.wait_for_url(lambda url: url != url_before, timeout=timeout_ms)
+        return "navigation"
+    state = wait.get("state", "visible")
+    page.wait_for_selector(site.get(wait["target"]), state=state, timeout=timeout_ms)
+    return f"selector {wait['target']} {state}"
+
+
+def _url(page, wait, site, timeout_ms, url_before) -> str:
+    page.wait_for_url(lambda url: wait["contains"] in url, timeout=timeout_ms)
+    return f"url {wait['contains']}"
+
+
+def _load_state(page, wait, site, timeout_ms, url_before) -> str:
+    state = wait.get("state", "load")
+    page.wait_for_load_state(state, timeout=timeout_ms)
+    return f"load_state {state}"
+
+
+STRATEGIES = {
+    "selector": _selector,
+    "url": _url,
+    "load_state": _load_state,
+    "response": None,  # armed before the action, see ``waiting``
+}
+
+
+def validate(waits: list[dict], action: str):
+    for wait in waits:
+        if wait.get("for") not in STRATEGIES:
+            raise ValueError(f"Action '{action}' uses unknown wait '{wait.get('for')}'")
+
+
+@contextmanager
+def waiting(
+    page,
+    waits: list[dict],
+    site,
+    default_timeout_ms: int = EXECUTOR_WAIT_TIMEOUT_MS,
+    max_timeout_ms: int | None = None,
+):
+    """Wrap an action; once it returns, block until each of ``waits`` is satisfied.
+
+    ``max_timeout_ms`` caps every wait, including ones with their own
+    ``timeout_ms``. Yields a list that is filled with ``{"wait", "seconds"}`` timings.
+    """
+
+    def timeout_of(wait):
+        timeout = wait.get("timeout_ms", default_timeout_ms)
+        return timeout if max_timeout_ms is None else min(timeout, max_timeout_ms)
+
+    timings = []
+    armed = []
+    url_before = page.url
+    for wait in waits:
+        if wait["for"] == "response":
+            expectation = page.expect_response(
+                lambda response, needle=wait["url_contains"]: needle in response.url,
+                timeout=timeout_of(wait),
+            )
+            expectation.__enter__()
+            armed.append(expectation)
+    try:
+        yield timings
+        for wait in waits:
+            started = time.monotonic()
+            if wait["for"] == "response":
+                armed.pop(0).__exit__(None, None, None)
+                description = f"response {wait['url_contains']}"
+            else:
+                description = STRATEGIES[wait["for"]](
+                    page, wait, site, timeout_of(wait), url_before
+                )
+            timings.append(
+                {"wait": description, "seconds": round(time.monotonic() - started, 3)}
+            )
+    except BaseException:
+        # Stop listening for responses that will no longer be awaited
+        for expectation in armed:
+            expectation.__exit__(*sys.exc_info())
+        raise
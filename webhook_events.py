@@ -0,0 +1,55 @@
+"""Record of Jira webhook deliveries already handled.
+
+Jira retries deliveries and can send the same event more than once, so each
+event id is stored in the shared state database and repeats are ignored by
+every server process. Ids are forgotten after a TTL.
+"""
+import os
+import time
+from contextlib import closing
+
+import state_db
+
+WEBHOOK_EVENT_TTL_SECONDS = float(os.getenv("WEBHOOK_EVENT_TTL_SECONDS", str(7 * 24 * 3600)))
+
+
+class SeenEvents:
+    """SQLite-backed set of recently handled event ids."""
+
+    def __init__(self, path: str | None = None, ttl: float = WEBHOOK_EVENT_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        with closing(state_db.connect(self.path)) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS webhook_events (
+                    event_id TEXT PRIMARY KEY,
+                    received_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS webhook_events_received "
+                "ON webhook_events(received_at)"
+            )
+
+    def seen(self, event_id: str) -> bool:
+        """Return True if ``event_id`` was already handled (without recording it)."""
+        with closing(state_db.connect(self.path)) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM webhook_events WHERE event_id = ? AND received_at >= ?",
+                (event_id, time.time() - self.ttl),
+            ).fetchone()
+        return row is not None
+
+    def first_seen(self, event_id: str) -> bool:
+        """Remember ``event_id`` and return True unless it was already handled."""
+        now = time.time()
+        with closing(state_db.connect(self.path)) as conn:
+            conn.execute(
+                "DELETE FROM webhook_events WHERE received_at < ?", (now - self.ttl,)
+            )
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO webhook_events VALUES (?, ?)", (event_id, now)
+            )
+        return cur.rowcount == 1